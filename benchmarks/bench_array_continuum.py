@@ -0,0 +1,97 @@
+"""
+Memory and throughput of the array-backed continuum (``ArrayContinuum``), compared with the default
+``Continuum`` (sorted sets of ``Unit`` objects), on large random continua : time to build them, memory
+they take, and time to convert them into the arrays used by the dissimilarities' kernels.
+
+Each backend is run in its own process, for its memory usage not to be hidden by the other one's : the
+peak memory is the max RSS minus the one measured before building the continuum, and the retained memory
+is the increase of the RSS once the continuum is built.
+
+Usage::
+
+    python benchmarks/bench_array_continuum.py --units 1000000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+from pyannote.core import Segment
+
+from pygamma_agreement import Continuum, ArrayContinuum, CombinedCategoricalDissimilarity
+
+
+def random_units(nb_annotators: int, nb_units: int, nb_categories: int, seed: int):
+    rng = np.random.default_rng(seed)
+    annotators = rng.integers(0, nb_annotators, nb_units)
+    starts = rng.uniform(0, nb_units, nb_units)
+    ends = starts + rng.uniform(1, 10, nb_units)
+    categories = rng.integers(0, nb_categories, nb_units)
+    return ([f"annotator_{annotator}" for annotator in annotators.tolist()],
+            starts, ends,
+            [f"category_{category}" for category in categories.tolist()])
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() / 2 ** 20
+
+
+def run(backend: str, nb_annotators: int, nb_units: int, nb_categories: int, seed: int):
+    annotators, starts, ends, annotations = random_units(nb_annotators, nb_units, nb_categories, seed)
+    dissimilarity = CombinedCategoricalDissimilarity()
+
+    max_rss_before, rss_before = max_rss_mb(), rss_mb()
+    start = time.perf_counter()
+    if backend == "array":
+        continuum = ArrayContinuum.from_arrays(annotators, starts, ends, annotations)
+    else:
+        continuum = Continuum()
+        for annotator, unit_start, unit_end, annotation in zip(annotators, starts.tolist(), ends.tolist(),
+                                                               annotations):
+            continuum.add(annotator, Segment(unit_start, unit_end), annotation)
+    build = time.perf_counter() - start
+    peak_memory, retained_memory = max_rss_mb() - max_rss_before, rss_mb() - rss_before
+
+    start = time.perf_counter()
+    dissimilarity._build_arrays_continuum(continuum)
+    conversion = time.perf_counter() - start
+
+    start = time.perf_counter()
+    continuum.category_weights, continuum.avg_length_unit, continuum.max_num_annotations_per_annotator
+    statistics = time.perf_counter() - start
+
+    print(f"{backend:>11} | {continuum.num_units:9d} units | build {build:7.2f} s | "
+          f"memory {retained_memory:7.1f} MB (peak {peak_memory:7.1f} MB) | "
+          f"to kernel arrays {conversion:7.3f} s | statistics {statistics:7.3f} s")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, default=1_000_000)
+    argparser.add_argument("--categories", type=int, default=10)
+    argparser.add_argument("--seed", type=int, default=4772)
+    argparser.add_argument("--backend", choices=["array", "sorted-sets"], help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.backend is not None:
+        run(args.backend, args.annotators, args.units, args.categories, args.seed)
+        return
+    for backend in ("sorted-sets", "array"):
+        subprocess.run([sys.executable, __file__, "--backend", backend,
+                        "--annotators", str(args.annotators),
+                        "--units", str(args.units),
+                        "--categories", str(args.categories),
+                        "--seed", str(args.seed)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
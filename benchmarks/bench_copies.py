@@ -0,0 +1,76 @@
+"""
+Memory allocated by the read paths of a continuum that used to copy its units : ``Continuum.copy``,
+``continuum[annotator]``, ``max_num_annotations_per_annotator``, and the fast-gamma (``get_fast_alignment``
+starts with a copy of the continuum, and ``compute_gamma(fast=True)`` calls it on each sample).
+
+Allocations are measured with ``tracemalloc`` : the peak is the maximum memory allocated by Python during the
+call (tracing slows the calls down, so their durations are only comparable with each other).
+
+Usage::
+
+    python benchmarks/bench_copies.py --units 2000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+from pyannote.core import Segment
+
+from pygamma_agreement import Continuum, CombinedCategoricalDissimilarity
+
+
+def random_continuum(nb_annotators: int, nb_units: int, nb_categories: int, seed: int) -> Continuum:
+    rng = np.random.default_rng(seed)
+    continuum = Continuum()
+    # Annotators annotate (shifted) versions of the same segments, as in real corpora
+    starts = np.cumsum(rng.uniform(1, 10, nb_units))
+    ends = starts + rng.uniform(1, 10, nb_units)
+    categories = rng.integers(0, nb_categories, nb_units)
+    for annotator in range(nb_annotators):
+        shifts = rng.uniform(-1, 1, nb_units)
+        for start, end, category in zip((starts + shifts).tolist(), (ends + shifts).tolist(), categories.tolist()):
+            continuum.add(f"annotator_{annotator}", Segment(start, end), f"category_{category}")
+    return continuum
+
+
+def measured(function, *args, **kwargs):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak / 2 ** 20
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, default=2000,
+                           help="number of units of each annotator")
+    argparser.add_argument("--categories", type=int, default=5)
+    argparser.add_argument("--samples", type=int, default=10)
+    argparser.add_argument("--seed", type=int, default=4772)
+    args = argparser.parse_args()
+
+    continuum = random_continuum(args.annotators, args.units, args.categories, args.seed)
+    dissimilarity = CombinedCategoricalDissimilarity()
+    continuum.compute_gamma(dissimilarity, n_samples=2, fast=True)  # compilation of the kernels
+    continuum.measure_best_window_size(dissimilarity)
+    window_size = continuum.best_window_size
+
+    for name, function, call_args, call_kwargs in (
+            ("copy()", continuum.copy, (), {}),
+            ("continuum[annotator]", continuum.__getitem__, ("annotator_0",), {}),
+            ("max_num_annotations_per_annotator", getattr, (continuum, "max_num_annotations_per_annotator"), {}),
+            ("get_fast_alignment", continuum.get_fast_alignment, (dissimilarity, window_size), {}),
+            (f"compute_gamma(fast=True), {args.samples} samples", continuum.compute_gamma, (dissimilarity,),
+             {"n_samples": args.samples, "fast": True})):
+        duration, peak = measured(function, *call_args, **call_kwargs)
+        print(f"{name:>40}: {duration:8.4f} s | peak allocated {peak:8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Memory and throughput of the enumeration of the possible unitary alignments on dense continua.
+
+Every annotator's units overlap each other, so that (nearly) every tuple of units is a possible
+unitary alignment: with 3 annotators of n units, (n + 1)^3 - 1 of them (27 millions for n = 300).
+Each size is run in its own process, for its peak memory usage (max RSS, minus the one measured
+before the enumeration) not to be hidden by the previous ones.
+
+Usage::
+
+    python benchmarks/bench_dense_enumeration.py --units 100 200 300
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+from pyannote.core import Segment
+
+from pygamma_agreement import Continuum, CombinedCategoricalDissimilarity
+
+
+def dense_continuum(nb_annotators: int, nb_units: int, seed: int) -> Continuum:
+    rng = np.random.default_rng(seed)
+    continuum = Continuum()
+    for annotator in range(nb_annotators):
+        for _ in range(nb_units):
+            start = rng.uniform(0, 1)
+            continuum.add(f"annotator_{annotator}", Segment(start, start + 10 + rng.uniform(0, 1)), "A")
+    return continuum
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(nb_annotators: int, nb_units: int, seed: int):
+    dissimilarity = CombinedCategoricalDissimilarity(alpha=1, beta=1)
+    dissimilarity.valid_alignments(dense_continuum(nb_annotators, 1, seed))  # warm-up (compilation)
+    continuum = dense_continuum(nb_annotators, nb_units, seed)
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    disorders, alignments = dissimilarity.valid_alignments(continuum)
+    duration = time.perf_counter() - start
+    output_size = (disorders.nbytes + alignments.nbytes) / 2 ** 20
+    print(f"{nb_units:6d} units/annotator | {len(disorders):11d} alignments | {duration:8.2f} s | "
+          f"{len(disorders) / duration / 1e6:6.2f} M/s | output {output_size:8.1f} MB | "
+          f"peak {max_rss_mb() - rss_before:8.1f} MB")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, nargs="+", default=[100, 200, 300])
+    argparser.add_argument("--seed", type=int, default=4772)
+    argparser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.child:
+        run(args.annotators, args.units[0], args.seed)
+        return
+    for nb_units in args.units:
+        subprocess.run([sys.executable, __file__, "--child",
+                        "--annotators", str(args.annotators),
+                        "--units", str(nb_units),
+                        "--seed", str(args.seed)],
+                       check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Enumeration time of the possible unitary alignments of a continuum
+(``AbstractDissimilarity.valid_alignments``), compared with the former enumeration that went
+through the whole cartesian product of units before filtering the tuples on their disorder.
+
+The cartesian product of large continua is too long to go through (about 10^10 tuples for
+5by100): past ``--max-reference-tuples``, the reference time is extrapolated from the time taken
+by its first tuples.
+
+With ``--threads``, the enumeration is also timed with the given numbers of numba threads.
+
+Usage::
+
+    python benchmarks/bench_enumeration.py tests/data/3by500.csv tests/data/5by100.csv --threads 2 4 8
+"""
+import argparse
+import time
+
+import numba as nb
+import numpy as np
+
+from pygamma_agreement import Continuum, CombinedCategoricalDissimilarity
+from pygamma_agreement.numba_utils import iter_tuples
+
+
+@nb.njit
+def cartesian_enumeration(unit_arrays, d_mat, delta_empty, max_tuples):
+    """
+    Reference enumeration : goes through every tuple of units (empty units included), and keeps
+    the ones whose disorder is lower than the criterium. Stops after `max_tuples` tuples.
+    """
+    nb_annotators = len(unit_arrays)
+    c2n = (nb_annotators * (nb_annotators - 1) // 2)
+    criterium = c2n * delta_empty * nb_annotators
+    sizes_with_null = np.empty(nb_annotators, dtype=np.int16)
+    for annotator_id in range(nb_annotators):
+        sizes_with_null[annotator_id] = len(unit_arrays[annotator_id]) + 1
+
+    precomputation = nb.typed.List([nb.typed.List([np.empty((0, 0), dtype=np.float32)] * i)
+                                    for i in range(nb_annotators)])
+    for annotator_a in range(nb_annotators):
+        for annotator_b in range(annotator_a):
+            nb_annot_a, nb_annot_b = sizes_with_null[annotator_a] - 1, sizes_with_null[annotator_b] - 1
+            matrix = np.full((nb_annot_a + 1, nb_annot_b + 1), delta_empty, dtype=np.float32)
+            for annot_a in range(nb_annot_a):
+                for annot_b in range(nb_annot_b):
+                    matrix[annot_a, annot_b] = d_mat(unit_arrays[annotator_a][annot_a],
+                                                     unit_arrays[annotator_b][annot_b])
+            precomputation[annotator_a][annotator_b] = matrix
+
+    nb_tuples, nb_chosen = 0, 0
+    for unitary_alignment in iter_tuples(sizes_with_null):
+        if nb_tuples == max_tuples:
+            break
+        nb_tuples += 1
+        disorder = 0
+        for annot_a in range(nb_annotators):
+            for annot_b in range(annot_a):
+                disorder += precomputation[annot_a][annot_b][unitary_alignment[annot_a],
+                                                             unitary_alignment[annot_b]]
+        if disorder <= criterium:
+            nb_chosen += 1
+    return nb_tuples, nb_chosen
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    res = function(*args)
+    return time.perf_counter() - start, res
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("csv", nargs="+", help="continua to enumerate (CSV files)")
+    argparser.add_argument("--max-reference-tuples", type=float, default=1e7)
+    argparser.add_argument("--threads", type=int, nargs="*", default=[])
+    args = argparser.parse_args()
+
+    dissimilarity = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    for path in args.csv:
+        continuum = Continuum.from_csv(path)
+        unit_arrays = dissimilarity._build_arrays_continuum(continuum)
+        nb_tuples = int(np.prod([len(units) + 1 for units in unit_arrays], dtype=np.float64))
+
+        dissimilarity.valid_alignments(continuum)  # warm-up (compilation)
+        duration, (disorders, _, counters) = timed(dissimilarity.valid_alignments, continuum, True)
+
+        max_tuples = int(min(nb_tuples, args.max_reference_tuples))
+        cartesian_enumeration(unit_arrays, dissimilarity.d_mat, dissimilarity.delta_empty, 1)  # warm-up
+        reference_duration, (nb_visited, nb_chosen) = timed(cartesian_enumeration, unit_arrays,
+                                                            dissimilarity.d_mat, dissimilarity.delta_empty,
+                                                            max_tuples)
+        extrapolated = nb_visited < nb_tuples
+        if extrapolated:
+            reference_duration *= nb_tuples / nb_visited
+        else:
+            assert nb_chosen == len(disorders) + 1  # the reference keeps the empty unitary alignment
+
+        print(f"{path}: {continuum.num_units} units, {nb_tuples:.3g} tuples, "
+              f"{len(disorders)} possible unitary alignments")
+        print(f"    cartesian product: {reference_duration:10.3f} s{' (extrapolated)' if extrapolated else ''}")
+        print(f"    reachable tuples : {duration:10.3f} s (x{reference_duration / duration:.0f}), "
+              f"{counters['visited']} (partial) tuples visited, {counters['pruned']} pruned")
+        for n_threads in args.threads:
+            dissimilarity.valid_alignments(continuum, n_threads=n_threads)  # warm-up
+            parallel_duration, _ = timed(dissimilarity.valid_alignments, continuum, False, n_threads)
+            print(f"    {n_threads:3d} threads      : {parallel_duration:10.3f} s")
+
+
+if __name__ == '__main__':
+    main()
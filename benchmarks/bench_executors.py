@@ -0,0 +1,74 @@
+"""
+Scaling of ``Continuum.compute_gamma`` with the number of workers of its executor : thread pools against
+(spawned) process pools of 1, 2, 4... workers, up to the number of CPUs.
+
+The process pools are created once and warmed up before being measured, so that the timings don't include
+the startup of the worker processes (which import pygamma-agreement and load the compiled kernels).
+
+Usage::
+
+    python benchmarks/bench_executors.py --units 50 --samples 30
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+from pyannote.core import Segment
+
+from pygamma_agreement import Continuum, CombinedCategoricalDissimilarity
+
+
+def random_continuum(nb_annotators: int, nb_units: int, nb_categories: int, seed: int) -> Continuum:
+    rng = np.random.default_rng(seed)
+    continuum = Continuum()
+    # Annotators annotate (shifted) versions of the same segments, as in real corpora
+    starts = np.cumsum(rng.uniform(1, 10, nb_units))
+    ends = starts + rng.uniform(1, 10, nb_units)
+    categories = rng.integers(0, nb_categories, nb_units)
+    for annotator in range(nb_annotators):
+        shifts = rng.uniform(-1, 1, nb_units)
+        for start, end, category in zip((starts + shifts).tolist(), (ends + shifts).tolist(), categories.tolist()):
+            continuum.add(f"annotator_{annotator}", Segment(start, end), f"category_{category}")
+    return continuum
+
+
+def workers_counts():
+    count = 1
+    while count < os.cpu_count():
+        yield count
+        count *= 2
+    yield os.cpu_count()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, default=50,
+                           help="number of units of each annotator")
+    argparser.add_argument("--categories", type=int, default=5)
+    argparser.add_argument("--samples", type=int, default=30)
+    argparser.add_argument("--fast", action="store_true", help="compute the fast-gamma")
+    argparser.add_argument("--seed", type=int, default=4772)
+    args = argparser.parse_args()
+
+    continuum = random_continuum(args.annotators, args.units, args.categories, args.seed)
+    dissimilarity = CombinedCategoricalDissimilarity()
+    continuum.compute_gamma(dissimilarity, n_samples=2, fast=args.fast)  # compilation of the kernels
+
+    for workers in workers_counts():
+        for name, pool in (("threads", ThreadPoolExecutor(max_workers=workers)),
+                           ("processes", ProcessPoolExecutor(max_workers=workers,
+                                                             mp_context=multiprocessing.get_context("spawn")))):
+            with pool:
+                continuum.compute_gamma(dissimilarity, n_samples=workers, fast=args.fast, executor=pool)
+                start = time.perf_counter()
+                continuum.compute_gamma(dissimilarity, n_samples=args.samples, fast=args.fast, executor=pool)
+                duration = time.perf_counter() - start
+            print(f"{workers:3d} {name:>9}: {duration:8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
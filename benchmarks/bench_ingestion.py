@@ -0,0 +1,108 @@
+"""
+Time taken to load large annotation dumps into a continuum : unit by unit (``Continuum.add``), in bulk
+(``Continuum.from_arrays``, for both continuum backends), and from CSV and RTTM files (``from_csv`` and
+``from_rttm``), compared with reading them line by line (``csv.reader`` and pyannote's ``load_rttm``) and
+adding their units one at a time, and from the binary format of ``Continuum.save`` (``load``).
+
+Usage::
+
+    python benchmarks/bench_ingestion.py --rows 2000000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import numpy as np
+from pyannote.core import Segment
+from pyannote.database.util import load_rttm
+
+from pygamma_agreement import Continuum, ArrayContinuum
+
+
+def random_rows(nb_annotators: int, nb_rows: int, nb_categories: int, seed: int):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(0, nb_rows, nb_rows)
+    return ([f"annotator_{annotator}" for annotator in rng.integers(0, nb_annotators, nb_rows).tolist()],
+            starts.tolist(),
+            (starts + rng.uniform(1, 10, nb_rows)).tolist(),
+            [f"category_{category}" for category in rng.integers(0, nb_categories, nb_rows).tolist()])
+
+
+def add_loop(annotators, starts, ends, annotations) -> Continuum:
+    continuum = Continuum()
+    for annotator, start, end, annotation in zip(annotators, starts, ends, annotations):
+        continuum.add(annotator, Segment(start, end), annotation)
+    return continuum
+
+
+def line_by_line_csv(path: str) -> Continuum:
+    continuum = Continuum()
+    with open(path) as csv_file:
+        for row in csv.reader(csv_file):
+            continuum.add(row[0], Segment(float(row[2]), float(row[3])), row[1])
+    return continuum
+
+
+def line_by_line_rttm(path: str) -> Continuum:
+    continuum = Continuum()
+    for uri, annotation in load_rttm(path).items():
+        for segment, _, label in annotation.itertracks(yield_label=True):
+            continuum.add(uri, segment, label)
+    return continuum
+
+
+def write_rttm(continuum: Continuum, path: str):
+    with open(path, "w") as rttm_file:
+        for annotator, unit in continuum:
+            rttm_file.write(f"SPEAKER {annotator} 1 {unit.segment.start!r} {unit.segment.duration!r} "
+                            f"<NA> <NA> {unit.annotation} <NA> <NA>\n")
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--rows", type=int, default=500_000)
+    argparser.add_argument("--categories", type=int, default=10)
+    argparser.add_argument("--seed", type=int, default=4772)
+    args = argparser.parse_args()
+
+    rows = random_rows(args.annotators, args.rows, args.categories, args.seed)
+    reference_duration, reference = timed(add_loop, *rows)
+    print(f"{'Continuum.add (per unit)':>28}: {reference_duration:7.2f} s")
+    for cls in (Continuum, ArrayContinuum):
+        duration, continuum = timed(cls.from_arrays, *rows)
+        assert continuum == reference
+        print(f"{cls.__name__ + '.from_arrays':>28}: {duration:7.2f} s (x{reference_duration / duration:.1f})")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path, rttm_path = os.path.join(tmp_dir, "rows.csv"), os.path.join(tmp_dir, "rows.rttm")
+        reference.to_csv(csv_path)
+        write_rttm(reference, rttm_path)
+        for file_format, path, line_by_line, loader in (("csv", csv_path, line_by_line_csv, "from_csv"),
+                                                        ("rttm", rttm_path, line_by_line_rttm, "from_rttm")):
+            reference_duration, continuum = timed(line_by_line, path)
+            assert continuum.num_units == reference.num_units
+            print(f"{file_format + ' line by line':>28}: {reference_duration:7.2f} s")
+            for cls in (Continuum, ArrayContinuum):
+                duration, continuum = timed(getattr(cls, loader), path)
+                assert continuum.num_units == reference.num_units
+                print(f"{cls.__name__ + '.' + loader:>28}: {duration:7.2f} s (x{reference_duration / duration:.1f})")
+
+        binary_path = os.path.join(tmp_dir, "rows.continuum")
+        ArrayContinuum.from_continuum(reference).save(binary_path)
+        for mmap in (False, True):
+            duration, continuum = timed(ArrayContinuum.load, binary_path, mmap)
+            assert continuum.num_units == reference.num_units
+            print(f"{f'ArrayContinuum.load(mmap={mmap})':>28}: {duration:7.4f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Throughput of the pairwise dissimilarity precomputation, with the dissimilarity function passed to a
+generic kernel as a first-class function (``numba.types.FunctionType``, one indirect call per couple of
+units), compared with the kernels specialized for each dissimilarity (``AbstractDissimilarity.kernels``),
+where it is inlined. The specialized kernels are also timed when they only evaluate the couples of units within
+temporal reach of each other (see ``AbstractDissimilarity.temporal_reach``).
+
+Usage::
+
+    python benchmarks/bench_kernels.py tests/data/3by500.csv
+"""
+import argparse
+import time
+
+import numba as nb
+import numpy as np
+from sortedcontainers import SortedSet
+
+from pygamma_agreement import (Continuum,
+                               CombinedCategoricalDissimilarity,
+                               PositionalSporadicDissimilarity,
+                               LevenshteinCategoricalDissimilarity,
+                               OrdinalCategoricalDissimilarity,
+                               PrecomputedCategoricalDissimilarity)
+from pygamma_agreement.numba_utils import matrices_offsets, append_row, SparseMatricesType
+
+
+@nb.njit(SparseMatricesType(
+    nb.types.ListType(nb.float32[:, ::1]),
+    nb.types.FunctionType(nb.float32(nb.float32[:], nb.float32[:])),
+    nb.float64))
+def generic_precompute_matrices(unit_arrays, d_mat, criterium):
+    nb_annotators = len(unit_arrays)
+    sizes = np.empty(nb_annotators, dtype=np.int32)
+    for annotator_id in range(nb_annotators):
+        sizes[annotator_id] = len(unit_arrays[annotator_id])
+    offsets, nb_rows = matrices_offsets(sizes)
+    indptr = np.zeros(nb_rows + 1, dtype=np.int64)
+    indices = np.empty(nb_rows, dtype=np.int32)
+    values = np.empty(nb_rows, dtype=np.float32)
+    for annotator_a in range(nb_annotators):
+        for annotator_b in range(annotator_a):
+            units_a, units_b = unit_arrays[annotator_a], unit_arrays[annotator_b]
+            row_columns = np.arange(sizes[annotator_b]).astype(np.int32)
+            row_values = np.empty(sizes[annotator_b], dtype=np.float32)
+            for annot_a in range(sizes[annotator_a]):
+                for annot_b in range(sizes[annotator_b]):
+                    row_values[annot_b] = d_mat(units_a[annot_a], units_b[annot_b])
+                row = offsets[annotator_a, annotator_b] + annot_a
+                indices, values = append_row(indptr, indices, values, row, row_columns, row_values, criterium)
+    nb_entries = indptr[nb_rows]
+    return indptr, indices[:nb_entries].copy(), values[:nb_entries].copy(), offsets, sizes
+
+
+def best_time(function, *args, repeat: int = 5) -> float:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("csv", help="continuum (CSV file)")
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    continuum = Continuum.from_csv(args.csv)
+    categories = continuum.categories
+    nb_categories = len(categories)
+    dissimilarities = {
+        "positional": PositionalSporadicDissimilarity(),
+        "combined (absolute)": CombinedCategoricalDissimilarity(alpha=3, beta=1),
+        "combined (levenshtein)": CombinedCategoricalDissimilarity(
+            cat_dissim=LevenshteinCategoricalDissimilarity(categories)),
+        "combined (ordinal)": CombinedCategoricalDissimilarity(
+            cat_dissim=OrdinalCategoricalDissimilarity(categories)),
+        "combined (precomputed)": CombinedCategoricalDissimilarity(
+            cat_dissim=PrecomputedCategoricalDissimilarity(SortedSet(categories),
+                                                           np.ones((nb_categories, nb_categories))
+                                                           - np.eye(nb_categories))),
+    }
+
+    for name, dissimilarity in dissimilarities.items():
+        unit_arrays = dissimilarity._build_arrays_continuum(continuum)
+        sizes = [len(units) for units in unit_arrays]
+        criterium = float(len(sizes) * (len(sizes) - 1) // 2 * dissimilarity.delta_empty * len(sizes))
+        nb_pairs = sum(sizes[a] * sizes[b] for a in range(len(sizes)) for b in range(a))
+
+        start = time.perf_counter()
+        kernels = dissimilarity.kernels
+        compilation = time.perf_counter() - start
+
+        generic_result = generic_precompute_matrices(unit_arrays, dissimilarity.d_mat, criterium)
+        specialized_result = kernels.precompute_matrices(unit_arrays, criterium, np.inf)
+        reach = dissimilarity.temporal_reach(criterium)
+        bounded_result = kernels.precompute_matrices(unit_arrays, criterium, reach)
+        assert all(np.array_equal(generic, specialized) and np.array_equal(generic, bounded)
+                   for generic, specialized, bounded in zip(generic_result, specialized_result, bounded_result))
+
+        generic = best_time(generic_precompute_matrices, unit_arrays, dissimilarity.d_mat, criterium,
+                            repeat=args.repeat)
+        specialized = best_time(kernels.precompute_matrices, unit_arrays, criterium, np.inf, repeat=args.repeat)
+        bounded = best_time(kernels.precompute_matrices, unit_arrays, criterium, reach, repeat=args.repeat)
+        print(f"{name:>24}: generic {nb_pairs / generic / 1e6:8.1f} M pairs/s | "
+              f"specialized {nb_pairs / specialized / 1e6:8.1f} M pairs/s (x{generic / specialized:.1f}) | "
+              f"time-bounded x{generic / bounded:.1f} | "
+              f"compilation {compilation:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
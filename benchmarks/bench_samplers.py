@@ -0,0 +1,66 @@
+"""
+Generation of the random samples used for the expected disorder : ``StatisticalContinuumSampler.sample``
+(one sample at a time, unit by unit) against ``StatisticalContinuumSampler.sample_many`` (all the samples at
+once, in vectorized form), and ``ShuffleContinuumSampler.sample`` (the reference's annotators shifted as whole
+arrays).
+
+Usage::
+
+    python benchmarks/bench_samplers.py --units 1000 --samples 1000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pygamma_agreement import ArrayContinuum, ShuffleContinuumSampler, StatisticalContinuumSampler
+
+
+def random_continuum(nb_annotators: int, nb_units: int, nb_categories: int, seed: int) -> ArrayContinuum:
+    rng = np.random.default_rng(seed)
+    starts = np.cumsum(rng.uniform(1, 10, (nb_annotators, nb_units)), axis=1)
+    ends = starts + rng.uniform(1, 10, (nb_annotators, nb_units))
+    annotators = np.repeat([f"annotator_{annotator}" for annotator in range(nb_annotators)], nb_units)
+    categories = rng.integers(0, nb_categories, nb_annotators * nb_units).astype(str)
+    return ArrayContinuum.from_arrays(annotators, starts.ravel(), ends.ravel(), categories)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, default=1000,
+                           help="number of units of each annotator")
+    argparser.add_argument("--categories", type=int, default=5)
+    argparser.add_argument("--samples", type=int, default=1000)
+    argparser.add_argument("--sequential-samples", type=int, default=20,
+                           help="number of samples drawn one by one (their time is extrapolated)")
+    argparser.add_argument("--seed", type=int, default=4772)
+    args = argparser.parse_args()
+
+    continuum = random_continuum(args.annotators, args.units, args.categories, args.seed)
+    rng = np.random.default_rng(args.seed)
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling(continuum)
+
+    start = time.perf_counter()
+    for _ in range(args.sequential_samples):
+        sampler.sample(rng)
+    sequential = (time.perf_counter() - start) * args.samples / args.sequential_samples
+    start = time.perf_counter()
+    sampler.sample_many(args.samples, rng)
+    vectorized = time.perf_counter() - start
+    print(f"{args.samples} samples of {args.annotators} x {args.units} units | "
+          f"sample: {sequential:8.3f} s (extrapolated) | sample_many: {vectorized:8.3f} s")
+
+    sampler = ShuffleContinuumSampler()
+    sampler.init_sampling(continuum)
+    start = time.perf_counter()
+    for _ in range(args.samples):
+        sampler.sample(rng)
+    shuffled = time.perf_counter() - start
+    print(f"{args.samples} samples of {args.annotators} x {args.units} units | "
+          f"ShuffleContinuumSampler.sample: {shuffled:8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Per-window solve latency of the best alignment linear solvers.
+
+The windows are the ones used by fast-gamma (see ``Continuum.get_first_window``) on a
+randomly generated continuum. Only the solving step is timed: the possible unitary
+alignments and the constraints matrix are computed once per window beforehand.
+
+Usage::
+
+    python benchmarks/bench_solvers.py --annotators 3 --units 200 --window 3
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pygamma_agreement import (CombinedCategoricalDissimilarity,
+                               StatisticalContinuumSampler)
+from pygamma_agreement.numba_utils import build_A
+from pygamma_agreement.solver import get_solver
+
+
+def windows(continuum, dissimilarity, window_size, nb_windows):
+    continuum = continuum.copy()
+    for _ in range(nb_windows):
+        if not continuum:
+            break
+        window, x_limit = continuum.get_first_window(dissimilarity, window_size)
+        yield window
+        for annotator, unit in list(window):
+            if unit.segment.end <= x_limit:
+                continuum.remove(annotator, unit)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("--annotators", type=int, default=3)
+    argparser.add_argument("--units", type=int, default=200)
+    argparser.add_argument("--window", type=int, default=3)
+    argparser.add_argument("--nb-windows", type=int, default=50)
+    argparser.add_argument("--solvers", nargs="+", default=["highs", "cvxpy"])
+    argparser.add_argument("--seed", type=int, default=4772)
+    args = argparser.parse_args()
+
+    np.random.seed(args.seed)
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling_custom(annotators=[f"annotator_{i}" for i in range(args.annotators)],
+                                 avg_num_units_per_annotator=args.units, std_num_units_per_annotator=0,
+                                 avg_duration=10, std_duration=3,
+                                 avg_gap=5, std_gap=5,
+                                 categories=np.array(["A", "B", "C", "D"]))
+    continuum = sampler.sample_from_continuum
+    dissimilarity = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+
+    problems = []
+    for window in windows(continuum, dissimilarity, args.window, args.nb_windows):
+        sizes = np.array([len(units) for units in window._annotations.values()], dtype=np.int32)
+        disorders, alignments = dissimilarity.valid_alignments(window)
+        problems.append((disorders, build_A(alignments, sizes)))
+    print(f"{len(problems)} windows, "
+          f"{np.mean([len(d) for d, _ in problems]):.0f} possible unitary alignments per window on average")
+
+    for name in args.solvers:
+        solver = get_solver(name)
+        solver.solve(*problems[0])  # warm-up
+        latencies = []
+        for disorders, A in problems:
+            start = time.perf_counter()
+            solver.solve(disorders, A)
+            latencies.append(time.perf_counter() - start)
+        latencies = np.array(latencies) * 1000
+        print(f"{name:>8}: mean {latencies.mean():8.2f} ms | median {np.median(latencies):8.2f} ms | "
+              f"max {latencies.max():8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Startup latency: time taken by a new process to import ``pygamma_agreement`` and to compute its
+first gamma agreement, with an empty numba cache (every kernel is compiled) and then with the
+on-disk cache written by the first process.
+
+Each measure is run in its own process, using a temporary ``NUMBA_CACHE_DIR``.
+
+Usage::
+
+    python benchmarks/bench_startup.py tests/data/AlexPaulSuzan.csv
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def child(csv: str):
+    start = time.perf_counter()
+    from pygamma_agreement import Continuum, CombinedCategoricalDissimilarity
+    imported = time.perf_counter()
+    continuum = Continuum.from_csv(csv)
+    continuum.compute_gamma(CombinedCategoricalDissimilarity(), n_samples=2)
+    print(f"import {imported - start:7.2f} s | first gamma {time.perf_counter() - imported:7.2f} s | "
+          f"total {time.perf_counter() - start:7.2f} s")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__)
+    argparser.add_argument("csv", help="continuum (CSV file)")
+    argparser.add_argument("--runs", type=int, default=2, help="number of runs with a warm cache")
+    argparser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.child:
+        child(args.csv)
+        return
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, NUMBA_CACHE_DIR=cache_dir)
+        for run in range(args.runs + 1):
+            print("cold cache: " if run == 0 else "warm cache: ", end="", flush=True)
+            subprocess.run([sys.executable, __file__, "--child", args.csv], env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
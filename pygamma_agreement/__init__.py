@@ -26,13 +26,16 @@
 # AUTHORS
 # Rachid RIAD, Hadrien TITEUX, Léopold FAVRE
 
-from .continuum import Continuum, GammaResults, Unit
+from .continuum import Continuum, GammaResults, Unit, warmup
+from .array_continuum import ArrayContinuum, ContinuumArrays
 from .alignment import Alignment, UnitaryAlignment
 from .dissimilarity import *
 from .sampler import (AbstractContinuumSampler,
                       ShuffleContinuumSampler,
                       StatisticalContinuumSampler)
 from .cst import CorpusShufflingTool
+from .solver import AbstractSolver, HighsSolver, CvxpySolver, MatchingSolver
+from .disorder_cache import DisorderCache
 
 try:
     from .notebook import show_continuum, show_alignment
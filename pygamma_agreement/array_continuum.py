@@ -0,0 +1,608 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2020-2021 CoML
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# AUTHORS
+# Rachid RIAD, Hadrien TITEUX, Léopold FAVRE
+"""
+##########
+Array continuum
+##########
+
+Columnar form of the units of a continuum (`ContinuumArrays`), and the continuum that stores its units in
+that form (`ArrayContinuum`). The helpers of this module build, sort, merge and convert units in columnar
+form, and read and write them in pygamma-agreement's binary continuum format (see ``Continuum.save``).
+"""
+import csv
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Optional, Tuple, List, Union, TYPE_CHECKING, Iterable, NamedTuple
+
+import numba as nb
+import numpy as np
+from pyannote.core import Segment
+from pyannote.core import segment as pyannote_segment
+from sortedcontainers import SortedDict, SortedSet
+
+from .continuum import Continuum, Unit, Annotator, CropMode, _UnitsStatistics, _sorted_set
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from .alignment import UnitaryAlignment
+
+
+class ContinuumArrays(NamedTuple):
+    """
+    Columnar form of the units of a continuum. Units are grouped by annotator (in alphabetical order), and
+    sorted like in a `Continuum` within each group : the units of the i-th annotator are at indexes
+    ``indptr[i]:indptr[i + 1]`` of the other arrays.
+    """
+    annotators: Tuple[Annotator, ...]
+    indptr: np.ndarray  # int64, of length len(annotators) + 1
+    starts: np.ndarray  # float64
+    ends: np.ndarray  # float64
+    category_codes: np.ndarray  # int32, index of the units' annotation in the categories, -1 if there is none
+
+
+def _read_only(*arrays: np.ndarray):
+    for array in arrays:
+        array.flags.writeable = False
+
+
+def _units_sorted(annotator_codes: np.ndarray,
+                  starts: np.ndarray,
+                  ends: np.ndarray,
+                  category_codes: np.ndarray) -> bool:
+    """Returns whether units given in columnar form are already in the order of `_sort_units` (which is much
+    cheaper to check than to sort them again)."""
+    previous, following = slice(None, -1), slice(1, None)
+    same_annotator = annotator_codes[following] == annotator_codes[previous]
+    same_start = same_annotator & (starts[following] == starts[previous])
+    same_end = same_start & (ends[following] == ends[previous])
+    return not ((annotator_codes[following] < annotator_codes[previous]).any()
+                or (same_annotator & (starts[following] < starts[previous])).any()
+                or (same_start & (ends[following] < ends[previous])).any()
+                or (same_end & (category_codes[following] < category_codes[previous])).any())
+
+
+def _sort_units(annotator_codes: np.ndarray,
+                starts: np.ndarray,
+                ends: np.ndarray,
+                category_codes: np.ndarray,
+                nb_annotators: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sorts units given in columnar form (with their annotators and categories as codes) in the order of a
+    `Continuum`, and only keeps one of each duplicated unit. Returns the (read-only) arrays of a `ContinuumArrays`.
+    """
+    # Annotations are sorted like their codes, units without annotation (-1) first
+    if not _units_sorted(annotator_codes, starts, ends, category_codes):
+        order = np.lexsort((category_codes, ends, starts, annotator_codes))
+        annotator_codes, starts, ends, category_codes = (annotator_codes[order], starts[order],
+                                                         ends[order], category_codes[order])
+    kept = np.ones(len(starts), dtype=bool)
+    kept[1:] = ((annotator_codes[1:] != annotator_codes[:-1]) | (starts[1:] != starts[:-1])
+                | (ends[1:] != ends[:-1]) | (category_codes[1:] != category_codes[:-1]))
+    if not kept.all():
+        annotator_codes, starts, ends, category_codes = (annotator_codes[kept], starts[kept],
+                                                         ends[kept], category_codes[kept])
+
+    indptr = np.zeros(nb_annotators + 1, dtype=np.int64)
+    np.cumsum(np.bincount(annotator_codes, minlength=nb_annotators), out=indptr[1:])
+    _read_only(indptr, starts, ends, category_codes)
+    return indptr, starts, ends, category_codes
+
+
+def sorted_units_arrays(annotators: Union[Annotator, Iterable[Annotator]],
+                        starts: Iterable[float],
+                        ends: Iterable[float],
+                        annotations: Optional[Iterable[Optional[str]]],
+                        discard_invalid_rows: bool) -> Tuple[ContinuumArrays, SortedSet]:
+    """
+    Validates units given in columnar form (as `Continuum.add` does, but in vectorized form), and sorts them
+    in a `ContinuumArrays`, along with the set of their categories. Duplicated units are only kept once.
+
+    Parameters
+    ----------
+    annotators: str or array-like of str
+        annotator of each unit (or of all the units)
+    starts, ends: array-like of float
+        start and end of the segment of each unit
+    annotations: array-like of str (or None), optional
+        annotation of each unit, if any.
+    discard_invalid_rows: bool
+        If set, units of duration 0.0 are ignored. Otherwise, a ValueError is raised.
+
+    Returns
+    -------
+    (ContinuumArrays, SortedSet):
+        the sorted (read-only) units, and the categories their codes index.
+    """
+    starts = np.array(starts, dtype=np.float64)
+    ends = np.array(ends, dtype=np.float64)
+    if isinstance(annotators, str):
+        annotators = np.full(len(starts), annotators)
+    annotators = np.asarray(annotators, dtype=str)
+    if annotations is None:
+        annotations = np.full(len(starts), None, dtype=object)
+    elif not isinstance(annotations, np.ndarray):
+        annotations = np.array(annotations, dtype=object)
+    if not len(annotators) == len(starts) == len(ends) == len(annotations):
+        raise ValueError("Annotators, starts, ends and annotations must have the same length.")
+
+    annotator_names, annotator_codes = np.unique(annotators, return_inverse=True)
+    category_codes = np.full(len(annotations), -1, dtype=np.int32)
+    if annotations.dtype == object:
+        annotated = np.not_equal(annotations, None)
+        category_names, category_codes[annotated] = np.unique(annotations[annotated], return_inverse=True)
+    else:
+        category_names, category_codes[:] = np.unique(annotations, return_inverse=True)
+    return coded_units_arrays(annotator_names.tolist(), annotator_codes, starts, ends,
+                              category_names.tolist(), category_codes, discard_invalid_rows)
+
+
+def used_codes(names: List, codes: np.ndarray) -> Tuple[List, np.ndarray]:
+    """Removes the names that aren't indexed by any (non-negative) code, and codes the others again."""
+    used = np.bincount(codes[codes >= 0], minlength=len(names)) > 0
+    if used.all():
+        return names, codes
+    new_codes = np.append(np.cumsum(used) - 1, -1).astype(codes.dtype)  # -1 stays -1
+    return [name for name, is_used in zip(names, used) if is_used], new_codes[codes]
+
+
+def coded_units_arrays(annotator_names: List[Annotator],
+                       annotator_codes: np.ndarray,
+                       starts: np.ndarray,
+                       ends: np.ndarray,
+                       category_names: List[str],
+                       category_codes: np.ndarray,
+                       discard_invalid_rows: bool) -> Tuple[ContinuumArrays, SortedSet]:
+    """
+    Same as `sorted_units_arrays`, for units whose annotators and annotations are given as codes, that index
+    sorted lists of names (annotation code -1 standing for units without annotation). The names that aren't
+    used by any valid unit are dropped.
+    """
+    if pyannote_segment.AUTO_ROUND_TIME:  # Same rounding as pyannote's Segment
+        precision = pyannote_segment.SEGMENT_PRECISION
+        starts = np.trunc(starts / precision + 0.5) * precision
+        ends = np.trunc(ends / precision + 0.5) * precision
+    invalid = ~(ends - starts > pyannote_segment.SEGMENT_PRECISION)  # i.e. Segment.duration == 0.0
+    if invalid.any():
+        if not discard_invalid_rows:
+            raise ValueError(f"Tried adding {np.count_nonzero(invalid)} segment(s) of duration 0.0")
+        logging.warning(f"Discarded {np.count_nonzero(invalid)} segment(s) of duration 0.0")
+        valid = ~invalid
+        annotator_codes, starts, ends, category_codes = (annotator_codes[valid], starts[valid],
+                                                         ends[valid], category_codes[valid])
+        annotator_names, annotator_codes = used_codes(annotator_names, annotator_codes)
+        category_names, category_codes = used_codes(category_names, category_codes)
+
+    indptr, starts, ends, category_codes = _sort_units(annotator_codes, starts, ends, category_codes,
+                                                       len(annotator_names))
+    return (ContinuumArrays(tuple(annotator_names), indptr, starts, ends, category_codes),
+            SortedSet(category_names))
+
+
+class CodedColumns:
+    """
+    Accumulates the chunks of units read by the file parsers in compact form : annotators and annotations are
+    stored as codes (in the order they're first met), along with the name of each code.
+    """
+
+    def __init__(self):
+        self.annotators = {}
+        self.categories = {}
+        self.chunks = []
+
+    @staticmethod
+    def _encode(names: dict, values: 'pd.Series') -> np.ndarray:
+        import pandas as pd
+        codes, uniques = pd.factorize(values)  # missing values are coded -1
+        names_codes = np.array([names.setdefault(value, len(names)) for value in uniques] + [-1], dtype=np.int32)
+        return names_codes[codes]
+
+    def add_chunk(self, annotators: 'pd.Series', starts: 'pd.Series', ends: 'pd.Series', annotations: 'pd.Series'):
+        self.chunks.append((self._encode(self.annotators, annotators),
+                            np.asarray(starts, dtype=np.float64),
+                            np.asarray(ends, dtype=np.float64),
+                            self._encode(self.categories, annotations)))
+
+    def units_arrays(self, discard_invalid_rows: bool) -> Tuple[ContinuumArrays, SortedSet]:
+        def sorted_codes(names: dict, codes: np.ndarray) -> Tuple[List, np.ndarray]:
+            names = list(names)
+            order = sorted(range(len(names)), key=names.__getitem__)
+            ranks = np.empty(len(names) + 1, dtype=np.int32)
+            ranks[order] = np.arange(len(names))
+            ranks[-1] = -1
+            return [names[i] for i in order], ranks[codes]
+
+        if self.chunks:
+            annotator_codes, starts, ends, category_codes = map(np.concatenate, zip(*self.chunks))
+        else:
+            annotator_codes, category_codes = np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32)
+            starts, ends = np.empty(0), np.empty(0)
+        self.chunks = []
+        annotator_names, annotator_codes = sorted_codes(self.annotators, annotator_codes)
+        category_names, category_codes = sorted_codes(self.categories, category_codes)
+        return coded_units_arrays(annotator_names, annotator_codes, starts, ends,
+                                  category_names, category_codes, discard_invalid_rows)
+
+
+def merge_units_arrays(arrays_a: ContinuumArrays, categories_a: SortedSet,
+                       arrays_b: ContinuumArrays, categories_b: SortedSet) -> Tuple[ContinuumArrays, SortedSet]:
+    """
+    Merges the units (and the categories) of two continua in columnar form.
+    """
+    annotators = SortedSet(arrays_a.annotators)
+    annotators.update(arrays_b.annotators)
+    categories = SortedSet(categories_a)
+    categories.update(categories_b)
+
+    columns = []
+    for arrays, arrays_categories in ((arrays_a, categories_a), (arrays_b, categories_b)):
+        annotators_map = np.array([annotators.index(annotator) for annotator in arrays.annotators], dtype=np.int64)
+        # code -1 (no annotation) is mapped by the last element
+        categories_map = np.array([categories.index(category) for category in arrays_categories] + [-1],
+                                  dtype=np.int32)
+        columns.append((np.repeat(annotators_map, np.diff(arrays.indptr)), arrays.starts, arrays.ends,
+                        categories_map[arrays.category_codes]))
+    indptr, starts, ends, category_codes = _sort_units(*map(np.concatenate, zip(*columns)), len(annotators))
+    return ContinuumArrays(tuple(annotators), indptr, starts, ends, category_codes), categories
+
+
+def units_sets(arrays: ContinuumArrays, categories: SortedSet) -> SortedDict:
+    """
+    Sorted sets of units of a continuum, from its columnar form.
+    """
+    labels = list(categories) + [None]  # code -1 is the last label
+    starts, ends, codes = arrays.starts.tolist(), arrays.ends.tolist(), arrays.category_codes.tolist()
+    return SortedDict({annotator: _sorted_set([Unit(Segment(starts[i], ends[i]), labels[codes[i]])
+                                               for i in range(start, stop)])
+                       for annotator, start, stop in zip(arrays.annotators, arrays.indptr[:-1].tolist(),
+                                                         arrays.indptr[1:].tolist())})
+
+
+def annotations_arrays(annotations: SortedDict, categories: SortedSet) -> ContinuumArrays:
+    """
+    Columnar form of the units of a continuum, from its sorted sets of units.
+    """
+    codes = {category: code for code, category in enumerate(categories)}
+    codes[None] = -1
+    nb_units = sum(len(units) for units in annotations.values())
+    indptr = np.zeros(len(annotations) + 1, dtype=np.int64)
+    np.cumsum([len(units) for units in annotations.values()], out=indptr[1:])
+    starts = np.fromiter((unit.segment.start for units in annotations.values() for unit in units),
+                         dtype=np.float64, count=nb_units)
+    ends = np.fromiter((unit.segment.end for units in annotations.values() for unit in units),
+                       dtype=np.float64, count=nb_units)
+    category_codes = np.fromiter((codes[unit.annotation] for units in annotations.values() for unit in units),
+                                 dtype=np.int32, count=nb_units)
+    _read_only(indptr, starts, ends, category_codes)
+    return ContinuumArrays(tuple(annotations.keys()), indptr, starts, ends, category_codes)
+
+
+# Binary continuum format (Continuum.save) : magic string, length of the JSON header (uint64), JSON header,
+# then the arrays of a ContinuumArrays, each one starting at a multiple of ARRAYS_ALIGNMENT bytes.
+CONTINUUM_FILE_MAGIC = b"PYGAMMA\x01"
+ARRAYS_ALIGNMENT = 64
+_SAVED_ARRAYS = (("indptr", "<i8"), ("starts", "<f8"), ("ends", "<f8"), ("category_codes", "<i4"))
+
+
+def write_arrays(path: Union[str, Path], arrays: ContinuumArrays, categories: SortedSet, header: dict):
+    """Writes units in columnar form in the binary continuum format, along with the given header."""
+    header = dict(header, version=1, annotators=list(arrays.annotators), categories=list(categories),
+                  num_units=len(arrays.starts))
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_offset = len(CONTINUUM_FILE_MAGIC) + 8 + len(header_bytes)
+    with open(path, "wb") as file:
+        file.write(CONTINUUM_FILE_MAGIC)
+        file.write(np.array([len(header_bytes)], dtype="<u8").tobytes())
+        file.write(header_bytes)
+        offset = data_offset
+        for name, dtype in _SAVED_ARRAYS:
+            padding = -offset % ARRAYS_ALIGNMENT
+            file.write(b"\0" * padding)
+            data = np.ascontiguousarray(getattr(arrays, name), dtype=dtype).tobytes()
+            file.write(data)
+            offset += padding + len(data)
+
+
+def read_arrays(path: Union[str, Path], mmap: bool) -> Tuple[dict, ContinuumArrays, SortedSet]:
+    """
+    Reads a file in the binary continuum format. Returns its header, the (read-only) units in columnar form
+    and their categories.
+    """
+    with open(path, "rb") as file:
+        if file.read(len(CONTINUUM_FILE_MAGIC)) != CONTINUUM_FILE_MAGIC:
+            raise ValueError(f"{path} is not a continuum saved with Continuum.save")
+        header_length = int(np.frombuffer(file.read(8), dtype="<u8")[0])
+        header = json.loads(file.read(header_length).decode("utf-8"))
+    offset = len(CONTINUUM_FILE_MAGIC) + 8 + header_length
+    columns = {}
+    for name, dtype in _SAVED_ARRAYS:
+        length = len(header["annotators"]) + 1 if name == "indptr" else header["num_units"]
+        offset += -offset % ARRAYS_ALIGNMENT
+        if length == 0:
+            column = np.empty(0, dtype=dtype)
+        elif mmap:
+            column = np.asarray(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(length,)))
+        else:
+            column = np.fromfile(path, dtype=dtype, count=length, offset=offset)
+        # Arrays are used in the native byte order (a no-op on little-endian machines)
+        columns[name] = column.astype(np.dtype(dtype).newbyteorder("="), copy=False)
+        offset += length * np.dtype(dtype).itemsize
+    _read_only(*columns.values())
+    return (header, ContinuumArrays(tuple(header["annotators"]), **columns),
+            SortedSet(header["categories"]))
+
+
+class ArrayContinuum(Continuum):
+    """
+    Continuum whose units are stored in contiguous numpy arrays (see `ContinuumArrays`) rather than in sorted
+    sets of `Unit` objects, which makes it much lighter and faster to build for large corpora. It has the same
+    API as `Continuum`, with a few differences :
+
+    - it is built in vectorized form, with ``ArrayContinuum.from_arrays`` (or from another continuum with
+      ``ArrayContinuum.from_continuum``).
+    - its units are handed to the dissimilarities' kernels without any conversion, and its statistics
+      (number of units, bounds, category weights...) are computed on the arrays.
+    - `Unit` objects are only created when they are asked for (iteration, indexing...).
+
+    Modifying it (``add``, ``remove``...) switches it to sorted sets of units, like a `Continuum`. Its arrays
+    are then built again the next time they are needed.
+    """
+
+    def __init__(self, uri: Optional[str] = None):
+        self._arrays: Optional[ContinuumArrays] = None
+        self._units: Optional[SortedDict] = None
+        # Units in the form used by the dissimilarities' kernels, along with the categories they're indexed in
+        self._kernel_units: Optional[Tuple[SortedSet, nb.typed.List]] = None
+        # Statistics of the units, computed from the arrays the first time they are needed
+        self._units_statistics: Optional[_UnitsStatistics] = None
+        super().__init__(uri)
+
+    @classmethod
+    def from_continuum(cls, continuum: Continuum) -> 'ArrayContinuum':
+        """
+        Builds the array-backed version of the given continuum.
+        """
+        array_continuum = cls(continuum.uri)
+        if isinstance(continuum, ArrayContinuum):
+            arrays = continuum.arrays
+        else:
+            arrays = annotations_arrays(continuum._annotations, continuum.categories)
+        array_continuum._set_arrays(arrays, SortedSet(continuum.categories))
+        array_continuum.bound_inf, array_continuum.bound_sup = continuum.bound_inf, continuum.bound_sup
+        array_continuum.best_window_size = continuum.best_window_size
+        return array_continuum
+
+    def _set_arrays(self, arrays: ContinuumArrays, categories: SortedSet):
+        self._arrays = arrays
+        self._categories = categories
+        self._units = None
+        self._shared_units.clear()
+        self._views.clear()
+        self._kernel_units = None
+        self._units_statistics = None
+        self._time_indexes = {}
+
+    @property
+    def arrays(self) -> ContinuumArrays:
+        """Units of the continuum, in columnar form (the arrays are read-only)."""
+        if self._arrays is None:
+            self._arrays = annotations_arrays(self._units, self._categories)
+        return self._arrays
+
+    @property
+    def _annotations(self) -> SortedDict:
+        if self._units is None:
+            self._units = units_sets(self._arrays, self._categories)
+        return self._units
+
+    @_annotations.setter
+    def _annotations(self, annotations: SortedDict):
+        self._units = annotations
+        self._arrays = None
+        self._kernel_units = None
+        self._time_indexes = {}
+
+    @property
+    def _statistics(self) -> _UnitsStatistics:
+        if self._units_statistics is None:
+            arrays = self.arrays
+            self._units_statistics = _UnitsStatistics()
+            self._units_statistics.add_arrays(arrays.starts, arrays.ends, arrays.category_codes, self._categories)
+        return self._units_statistics
+
+    @_statistics.setter
+    def _statistics(self, statistics: _UnitsStatistics):
+        self._units_statistics = statistics
+
+    def _units_durations(self) -> float:
+        arrays = self.arrays
+        return math.fsum((arrays.ends - arrays.starts).tolist())
+
+    def _invalidate_arrays(self):
+        # Units and their statistics are created from the arrays (if they weren't already) before the arrays
+        # are dropped, so that the statistics are then updated along with the units
+        self._units_statistics = self._statistics
+        self._annotations = self._annotations
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_kernel_units"] = None
+        state["_shared_units"] = set()
+        state["_views"] = {}
+        state["_time_indexes"] = {}
+        if self._arrays is not None:  # units are built again from the arrays if needed
+            state["_units"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def copy(self) -> 'ArrayContinuum':
+        """
+        Makes a copy of the current continuum (the arrays, which are read-only, are shared).
+
+        Returns
+        -------
+        continuum: ArrayContinuum
+        """
+        return ArrayContinuum.from_continuum(self)
+
+    def add_annotator(self, annotator: Annotator):
+        self._invalidate_arrays()
+        super().add_annotator(annotator)
+
+    def add(self, annotator: Annotator, segment: Segment, annotation: Optional[str] = None):
+        self._invalidate_arrays()
+        super().add(annotator, segment, annotation)
+
+    def _add_arrays(self, added: ContinuumArrays, added_categories: SortedSet):
+        if self.num_annotators > 0 or self._categories:
+            self._set_arrays(*merge_units_arrays(self.arrays, self._categories, added, added_categories))
+        else:
+            self._set_arrays(added, added_categories)
+        self._extend_bounds(added)
+
+    def remove(self, annotator: Annotator, unit: Unit):
+        self._invalidate_arrays()
+        super().remove(annotator, unit)
+
+    def __bool__(self):
+        return len(self.arrays.starts) > 0
+
+    def __len__(self):
+        return len(self.arrays.annotators)
+
+    @property
+    def num_annotators(self) -> int:
+        return len(self.arrays.annotators)
+
+    @property
+    def annotators(self) -> SortedSet:
+        return SortedSet(self.arrays.annotators)
+
+    @property
+    def max_num_annotations_per_annotator(self):
+        return int(np.max(np.diff(self.arrays.indptr), initial=0))
+
+    def reset_bounds(self):
+        arrays = self.arrays
+        not_empty = np.diff(arrays.indptr) > 0
+        if not np.any(not_empty):
+            self.bound_inf, self.bound_sup = 0.0, 0.0
+            return
+        # Same bounds as a Continuum's : first unit's start and last unit's end of each annotator
+        self.bound_inf = float(np.min(arrays.starts[arrays.indptr[:-1][not_empty]]))
+        self.bound_sup = float(np.max(arrays.ends[arrays.indptr[1:][not_empty] - 1]))
+
+    def _units_sizes(self) -> np.ndarray:
+        return np.diff(self.arrays.indptr).astype(np.int32)
+
+    def _time_index(self, annotator: Annotator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        index = self._time_indexes.get(annotator)
+        if index is None:
+            arrays = self.arrays
+            i = arrays.annotators.index(annotator)
+            start, stop = arrays.indptr[i], arrays.indptr[i + 1]
+            ends = arrays.ends[start:stop]
+            index = self._time_indexes[annotator] = (arrays.starts[start:stop], ends, np.maximum.accumulate(ends))
+        return index
+
+    def crop(self, support: Segment, mode: CropMode = "intersection") -> 'ArrayContinuum':
+        if mode not in ("intersection", "loose", "strict"):
+            raise ValueError(f"Unknown crop mode '{mode}' : must be 'intersection', 'loose' or 'strict'.")
+        arrays = self.arrays
+        indexes = [start + self._cropped_indexes(annotator, support, mode)
+                   for annotator, start in zip(arrays.annotators, arrays.indptr[:-1].tolist())]
+        annotator_codes = np.repeat(np.arange(len(indexes)), [len(annotator_indexes) for annotator_indexes in indexes])
+        indexes = np.concatenate(indexes) if indexes else np.empty(0, dtype=np.int64)
+        starts, ends = arrays.starts[indexes], arrays.ends[indexes]
+        if mode == "intersection":
+            starts, ends = np.maximum(starts, support.start), np.minimum(ends, support.end)
+        category_names, category_codes = used_codes(list(self._categories), arrays.category_codes[indexes])
+        cropped = type(self)(self.uri)
+        cropped.bound_inf, cropped.bound_sup = support.start, support.end
+        cropped._add_arrays(*coded_units_arrays(list(arrays.annotators), annotator_codes, starts, ends,
+                                                category_names, category_codes, discard_invalid_rows=True))
+        return cropped
+
+    def _units_starts(self) -> np.ndarray:
+        return self.arrays.starts
+
+    def _unit_arrays(self, categories: SortedSet) -> nb.typed.List:
+        if self._kernel_units is not None and self._kernel_units[0] == categories:
+            return self._kernel_units[1]
+        arrays = self.arrays
+        codes = arrays.category_codes
+        if np.any(codes < 0):
+            raise ValueError("Units without annotation cannot be indexed in the categories.")
+        if categories != self._categories:
+            codes = np.array([categories.index(category) for category in self._categories], dtype=np.int32)[codes]
+        units = np.empty((len(codes), 4), dtype=np.float32)
+        units[:, 0] = arrays.starts
+        units[:, 1] = arrays.ends
+        units[:, 2] = arrays.ends - arrays.starts
+        units[:, 3] = codes
+        # Each annotator's units are a (C-contiguous) view of the same array
+        unit_arrays = nb.typed.List()
+        for start, stop in zip(arrays.indptr[:-1], arrays.indptr[1:]):
+            unit_arrays.append(units[start:stop])
+        self._kernel_units = (SortedSet(categories), unit_arrays)
+        return unit_arrays
+
+    def _build_unitary_alignments(self,
+                                  chosen_alignments: np.ndarray,
+                                  alignments_disorders: np.ndarray) -> Tuple[List['UnitaryAlignment'], np.ndarray]:
+        if self._units is not None:
+            return super()._build_unitary_alignments(chosen_alignments, alignments_disorders)
+        # Only the units of the chosen unitary alignments are created
+        from .alignment import UnitaryAlignment
+        arrays = self.arrays
+        labels = list(self._categories) + [None]
+        set_unitary_alignements = []
+        for alignment_id, alignment in enumerate(chosen_alignments.tolist()):
+            u_align_tuple = []
+            for annotator_id, unit_id in enumerate(alignment):
+                annotator = arrays.annotators[annotator_id]
+                start, stop = arrays.indptr[annotator_id], arrays.indptr[annotator_id + 1]
+                if unit_id < stop - start:
+                    i = start + unit_id
+                    u_align_tuple.append((annotator, Unit(Segment(float(arrays.starts[i]), float(arrays.ends[i])),
+                                                          labels[arrays.category_codes[i]])))
+                else:  # it's a "null unit"
+                    u_align_tuple.append((annotator, None))
+            unitary_alignment = UnitaryAlignment(u_align_tuple)
+            unitary_alignment.disorder = alignments_disorders[alignment_id]
+            set_unitary_alignements.append(unitary_alignment)
+        return set_unitary_alignements, alignments_disorders
+
+    def to_csv(self, path: Union[str, Path], delimiter=","):
+        arrays = self.arrays
+        annotators = np.repeat(np.array(arrays.annotators, dtype=object), np.diff(arrays.indptr))
+        labels = np.array(list(self._categories) + [None], dtype=object)[arrays.category_codes]
+        with open(path, "w") as csv_file:
+            writer = csv.writer(csv_file, delimiter=delimiter)
+            writer.writerows(zip(annotators.tolist(), labels.tolist(),
+                                 arrays.starts.tolist(), arrays.ends.tolist()))
@@ -40,7 +40,8 @@ from pygamma_agreement import (Continuum,
                                LevenshteinCategoricalDissimilarity,
                                NumericalCategoricalDissimilarity,
                                ShuffleContinuumSampler,
-                               CombinedCategoricalDissimilarity)
+                               CombinedCategoricalDissimilarity,
+                               DisorderCache)
 
 
 class RawAndDefaultArgumentFormatter(RawTextHelpFormatter,
@@ -105,6 +106,10 @@ argparser.add_argument("-n", "--n-samples",
                        help="Number of random continuua to be sampled for the \n"
                             "gamma computation. Warning : additionnal continuua \n"
                             "will be sampled if precision level is not satisfied.\n")
+argparser.add_argument("--n-threads",
+                       default=None, type=int,
+                       help="Number of threads used to enumerate the possible \n"
+                            "unitary alignments of each continuum.")
 argparser.add_argument("-d", "--cat-dissim", type=str, choices={"absolute", "numerical", "levenshtein"},
                        default="absolute",
                        help="Categorical dissimilarity to use for measuring \n"
@@ -123,10 +128,22 @@ argparser.add_argument("-m", "--mathet-sampler",
                        action="store_true",
                        help="Set the expected dissimilarity sampler to the one \n"
                             "chosen by Mathet et Al.")
+argparser.add_argument("--solver", type=str, choices=["highs", "cvxpy", "cbc", "glpk", "matching"],
+                       default=None,
+                       help="Linear solver used to find the best alignments. \n"
+                            "Defaults to cvxpy (CBC or GLPK). 'matching' solves the \n"
+                            "alignments of two annotators as bipartite matchings.")
+argparser.add_argument("--disorder-cache", type=Path,
+                       default=None,
+                       help="Directory of a cache of the samples' disorders, \n"
+                            "reused by files with similar statistics. \n"
+                            "With --gamma-cat or --gamma-k, the samples' disorders \n"
+                            "are only added to the cache.")
 
 
 def pygamma_cmd():
     args = argparser.parse_args()
+    disorder_cache = None if args.disorder_cache is None else DisorderCache(args.disorder_cache)
     logging.getLogger().setLevel(logging.INFO if args.verbose else logging.ERROR)
 
     input_files: List[Path] = []
@@ -181,7 +198,11 @@ def pygamma_cmd():
                                         precision_level=args.precision_level,
                                         fast=True,
                                         sampler=sampler,
-                                        n_samples=args.n_samples)
+                                        n_samples=args.n_samples,
+                                        solver=args.solver,
+                                        disorder_cache=disorder_cache,
+                                        need_alignments=args.gamma_cat or args.gamma_k,
+                                        n_threads=args.n_threads)
         logging.info(f"Finished computing best alignment & gamma in {(time.time() - start) * 1000} ms")
         # start = time.time()
 
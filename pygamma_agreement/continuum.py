@@ -29,34 +29,51 @@ Continuum and corpus
 """
 import csv
 import logging
+import math
+import multiprocessing
 import os
-from concurrent.futures import ThreadPoolExecutor
-from copy import deepcopy
-from dataclasses import dataclass
+import pickle
+import uuid
+import weakref
+from collections import OrderedDict, deque
+from collections.abc import Sequence, Set
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from functools import total_ordering
 from pathlib import Path
-from typing import Optional, Tuple, List, Union, TYPE_CHECKING, Generator
+from typing import Optional, Tuple, List, Union, TYPE_CHECKING, Generator, Iterable, Callable
 
-import cvxpy as cp
+import numba as nb
 import numpy as np
 from pyannote.core import Annotation, Segment, Timeline
-from pyannote.database.util import load_rttm
 from sortedcontainers import SortedDict, SortedSet
 from typing_extensions import Literal
 
 from .dissimilarity import AbstractDissimilarity
-from .numba_utils import build_A
+from .numba_utils import build_A, split_components
+from .solver import get_solver, MatchingSolver
 
 if TYPE_CHECKING:
     from .alignment import UnitaryAlignment, Alignment, SoftAlignment
     from .sampler import AbstractContinuumSampler, StatisticalContinuumSampler
+    from .solver import AbstractSolver, SolverName
+    from .disorder_cache import DisorderCache
+    from .array_continuum import ContinuumArrays
 
 CHUNK_SIZE = (10**6) // os.cpu_count()
+# Number of lines of a file parsed at once by Continuum.from_csv and Continuum.from_rttm
+READ_CHUNK_SIZE = 10**6
+# Number of samples submitted by Continuum.compute_gamma beyond the currently required number, when a precision
+# level is set (the required number usually grows as the estimation of the expected disorder is refined)
+SAMPLES_LOOK_AHEAD = 2
 
 # defining Annotator type
 Annotator = str
 PivotType = Literal["float_pivot", "int_pivot"]
 PrecisionLevel = Literal["high", "medium", "low"]
+CropMode = Literal["intersection", "loose", "strict"]
+ExecutorType = Literal["threads", "processes"]
 
 # percentages for the precision
 PRECISION_LEVEL = {
@@ -97,6 +114,140 @@ class Unit:
             return self.segment < other.segment
 
 
+def _sorted_set(units: List[Unit]) -> SortedSet:
+    """
+    Sorted set of already sorted and distinct units. Building it through ``SortedSet(units)`` would sort them
+    again, in the (arbitrary) order of a set, with as many comparisons of units.
+    """
+    sorted_set = SortedSet()
+    sorted_set._set.update(units)
+    sorted_set._list.update(units)  # linear for a sorted list
+    return sorted_set
+
+
+class UnitsView(Set, Sequence):
+    """
+    Read-only view of the sorted set of units of an annotator, returned by ``Continuum.__getitem__``. It behaves
+    like a `SortedSet` that can't be modified, and isn't affected by later modifications of the continuum (which
+    copies the set of units it modifies while a view of it exists).
+    """
+    __slots__ = ("_units", "__weakref__")
+
+    def __init__(self, units: SortedSet):
+        self._units = units
+
+    @classmethod
+    def _from_iterable(cls, iterable) -> SortedSet:
+        # Results of set operations (&, |, -...) are new sorted sets
+        return SortedSet(iterable)
+
+    def __getitem__(self, index):
+        return self._units[index]
+
+    def __len__(self):
+        return len(self._units)
+
+    def __iter__(self):
+        return iter(self._units)
+
+    def __reversed__(self):
+        return reversed(self._units)
+
+    def __contains__(self, unit):
+        return unit in self._units
+
+    def __eq__(self, other):
+        if isinstance(other, UnitsView):
+            other = other._units
+        return self._units == other
+
+    __hash__ = None
+
+    def index(self, unit, start=None, stop=None) -> int:
+        return self._units.index(unit, start, stop)
+
+    def count(self, unit) -> int:
+        return self._units.count(unit)
+
+    def copy(self) -> SortedSet:
+        """Modifiable (shallow) copy of the units."""
+        return _sorted_set(self._units)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({list(self._units)!r})"
+
+
+class _UnitsStatistics:
+    """
+    Statistics of the units of a continuum (number of units, sum of their durations, number of units of each
+    category), updated as units are added to and removed from the continuum.
+
+    The sum of the durations is compensated (Neumaier's summation) as units are added. Removing units marks it
+    as stale instead : the continuum then computes it again from all its units (with ``math.fsum``) the next
+    time it is needed.
+    """
+    __slots__ = ("num_units", "durations", "durations_error", "durations_stale", "category_counts")
+
+    def __init__(self):
+        self.num_units = 0
+        self.durations = 0.0
+        self.durations_error = 0.0
+        self.durations_stale = False
+        self.category_counts = {}  # annotation (or None) -> number of units
+
+    def copy(self) -> '_UnitsStatistics':
+        statistics = _UnitsStatistics()
+        statistics.num_units = self.num_units
+        statistics.durations, statistics.durations_error = self.durations, self.durations_error
+        statistics.durations_stale = self.durations_stale
+        statistics.category_counts = dict(self.category_counts)
+        return statistics
+
+    @property
+    def durations_sum(self) -> float:
+        return self.durations + self.durations_error
+
+    def set_durations(self, durations_sum: float):
+        self.durations, self.durations_error, self.durations_stale = durations_sum, 0.0, False
+
+    def _add_duration(self, duration: float):
+        total = self.durations + duration
+        if abs(self.durations) >= abs(duration):
+            self.durations_error += (self.durations - total) + duration
+        else:
+            self.durations_error += (duration - total) + self.durations
+        self.durations = total
+
+    def _count(self, annotation: Optional[str], count: int):
+        count += self.category_counts.get(annotation, 0)
+        if count:
+            self.category_counts[annotation] = count
+        else:
+            del self.category_counts[annotation]
+
+    def add_unit(self, unit: Unit):
+        self.num_units += 1
+        self._add_duration(unit.segment.duration)
+        self._count(unit.annotation, 1)
+
+    def remove_unit(self, unit: Unit):
+        self.num_units -= 1
+        self.durations_stale = True
+        self._count(unit.annotation, -1)
+
+    def add_units(self, units: List[Unit]):
+        for unit in units:
+            self.add_unit(unit)
+
+    def add_arrays(self, starts: np.ndarray, ends: np.ndarray, category_codes: np.ndarray, categories: SortedSet):
+        self.num_units += len(starts)
+        self._add_duration(math.fsum((ends - starts).tolist()))
+        labels = [None] + list(categories)  # code -1 is the first label
+        counts = np.bincount(category_codes + 1, minlength=len(labels))
+        for code in np.flatnonzero(counts).tolist():
+            self._count(labels[code], int(counts[code]))
+
+
 class Continuum:
     """
     Representation of a continuum, i.e a set of annotated segments by multiple annotators.
@@ -119,8 +270,18 @@ class Continuum:
             name of annotated resource (e.g. audio or video file)
         """
         self.uri = uri
+        # Time index of the units of each annotator, see Continuum._time_index
+        self._time_indexes: dict = {}
         # Structure {annotator -> SortedSet}
         self._annotations: SortedDict = SortedDict()
+        # Annotators whose sorted set of units is shared with a copy of the continuum, and must be copied
+        # before being modified
+        self._shared_units: set = set()
+        # Last `UnitsView` of each annotator's units (weak references) : the units are also copied before being
+        # modified while that view is alive
+        self._views: dict = {}
+        # Statistics of the units, kept up to date by the methods that add or remove units
+        self._statistics = _UnitsStatistics()
         self._categories: SortedSet = SortedSet()
         self.bound_inf = 0.0
         self.bound_sup = 0.0
@@ -132,7 +293,8 @@ class Continuum:
     def from_csv(cls,
                  path: Union[str, Path],
                  discard_invalid_rows=True,
-                 delimiter: str = ","):
+                 delimiter: str = ",",
+                 chunk_size: int = READ_CHUNK_SIZE):
         """
         Load annotations from a CSV file , with structure
         annotator, category, segment_start, segment_end.
@@ -149,6 +311,9 @@ class Continuum:
             If set, every invalid row is ignored when parsing the file.
         delimiter: str
             CSV columns delimiter. Defaults to ','
+        chunk_size: int
+            Number of rows parsed at once. Parsed rows are kept in compact form, so that the memory
+            used for parsing the file doesn't grow with its size.
 
         Returns
         -------
@@ -156,25 +321,27 @@ class Continuum:
             New continuum object loaded from the CSV
 
         """
-        if isinstance(path, str):
-            path = Path(path)
-
+        import pandas as pd
+        from .array_continuum import CodedColumns
+        columns = CodedColumns()
+        try:
+            with pd.read_csv(path, sep=delimiter, header=None, usecols=range(4),
+                             dtype={0: str, 1: str, 2: np.float64, 3: np.float64},
+                             keep_default_na=False, float_precision="round_trip",
+                             chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    columns.add_chunk(chunk[0], chunk[2], chunk[3], chunk[1])
+        except pd.errors.EmptyDataError:
+            pass
         continuum = cls()
-        with open(path) as csv_file:
-            reader = csv.reader(csv_file, delimiter=delimiter)
-            for row in reader:
-                seg = Segment(float(row[2]), float(row[3]))
-                try:
-                    continuum.add(row[0], seg, row[1])
-                except ValueError as e:
-                    if discard_invalid_rows:
-                        print(f"Discarded invalid segment : {str(e)}")
-                    else:
-                        raise e
+        continuum._add_arrays(*columns.units_arrays(discard_invalid_rows))
         return continuum
 
     @classmethod
-    def from_rttm(cls, path: Union[str, Path]) -> 'Continuum':
+    def from_rttm(cls,
+                  path: Union[str, Path],
+                  discard_invalid_rows: bool = True,
+                  chunk_size: int = READ_CHUNK_SIZE) -> 'Continuum':
         """
         Load annotations from a RTTM file. The file name field will be used
         as an annotation's annotator
@@ -183,16 +350,66 @@ class Continuum:
         ----------
         path: Path or str
             Path to the RTTM file storing annotations
+        discard_invalid_rows: bool
+            If set (the default), turns of duration 0.0 are ignored, as pyannote's ``Annotation`` does.
+            Otherwise, a ValueError is raised.
+        chunk_size: int
+            Number of lines parsed at once (see ``Continuum.from_csv``).
 
         Returns
         -------
         continuum : Continuum
             New continuum object loaded from the RTTM file
         """
-        annotations = load_rttm(str(path))
+        import pandas as pd
+        from .array_continuum import CodedColumns
+        columns = CodedColumns()
+        # Same parsing as pyannote.database's load_rttm : only "SPEAKER" lines are kept
+        try:
+            with pd.read_csv(path, sep=r"\s+", header=None, names=range(10), usecols=[0, 1, 3, 4, 7],
+                             dtype={0: str, 1: str, 3: np.float64, 4: np.float64, 7: str},
+                             float_precision="round_trip", chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    chunk = chunk[chunk[0] == "SPEAKER"]
+                    columns.add_chunk(chunk[1], chunk[3], chunk[3] + chunk[4], chunk[7])
+        except pd.errors.EmptyDataError:
+            pass
         continuum = cls()
-        for uri, annot in annotations.items():
-            continuum.add_annotation(uri, annot)
+        continuum._add_arrays(*columns.units_arrays(discard_invalid_rows))
+        return continuum
+
+    @classmethod
+    def from_arrays(cls,
+                    annotators: Union[Annotator, Iterable[Annotator]],
+                    starts: Iterable[float],
+                    ends: Iterable[float],
+                    annotations: Optional[Iterable[Optional[str]]] = None,
+                    uri: Optional[str] = None,
+                    discard_invalid_rows: bool = False) -> 'Continuum':
+        """
+        Builds a continuum from its units in columnar form : the i-th unit is annotated by ``annotators[i]``,
+        on ``Segment(starts[i], ends[i])``, with ``annotations[i]``. See ``Continuum.add_many``.
+
+        Parameters
+        ----------
+        annotators: str or array-like of str
+            annotator of each unit (or of all the units)
+        starts, ends: array-like of float
+            start and end of the segment of each unit
+        annotations: array-like of str (or None), optional
+            annotation of each unit, if any.
+        uri: optional str
+            name of annotated resource (e.g. audio or video file)
+        discard_invalid_rows: bool
+            If set, units of duration 0.0 are ignored. Otherwise, a ValueError is raised.
+
+        Returns
+        -------
+        Continuum:
+            New continuum object (of the class this method is called on) holding the given units.
+        """
+        continuum = cls(uri)
+        continuum.add_many(annotators, starts, ends, annotations, discard_invalid_rows)
         return continuum
 
     def copy_flush(self) -> 'Continuum':
@@ -213,11 +430,32 @@ class Continuum:
         continuum: Continuum
         """
         continuum = Continuum(self.uri)
-        continuum._annotations = deepcopy(self._annotations)
+        # Units are immutable : the sorted sets of units are shared, and copied by the first continuum to modify them
+        continuum._annotations = SortedDict(self._annotations)
+        continuum._shared_units = set(self._annotations)
+        self._shared_units.update(self._annotations)
+        continuum._categories = SortedSet(self._categories)
+        continuum._statistics = self._statistics.copy()
+        continuum._time_indexes = dict(self._time_indexes)
         continuum.bound_inf, continuum.bound_sup = self.bound_inf, self.bound_sup
         continuum.best_window_size = self.best_window_size
         return continuum
 
+    def __getstate__(self):
+        # Units are pickled in columnar form, which is much more compact (and faster) than sorted sets of units
+        from .array_continuum import annotations_arrays
+        state = self.__dict__.copy()
+        state["_annotations"] = annotations_arrays(self._annotations, self._categories)
+        state["_shared_units"] = set()
+        state["_views"] = {}
+        state["_time_indexes"] = {}
+        return state
+
+    def __setstate__(self, state):
+        from .array_continuum import units_sets
+        self.__dict__.update(state)
+        self._annotations = units_sets(state["_annotations"], self._categories)
+
     def __bool__(self):
         """Truthiness, basically tests for emptiness
 
@@ -258,7 +496,7 @@ class Continuum:
     @property
     def num_units(self) -> int:
         """Total number of units in the continuum."""
-        return sum(len(units) for units in self._annotations.values())
+        return self._statistics.num_units
 
     @property
     def categories(self) -> SortedSet:
@@ -271,17 +509,9 @@ class Continuum:
         Returns a dictionary where the keys are the categories in the continuum, and a key's value
         is the proportion of occurrence of the category in the continuum.
         """
-        weights = SortedDict()
-        nb_units = 0
-        for _, unit in self:
-            nb_units += 1
-            if unit.annotation not in weights:
-                weights[unit.annotation] = 1
-            else:
-                weights[unit.annotation] += 1
-        for annotation in weights.keys():
-            weights[annotation] /= nb_units
-        return weights
+        nb_units = self.num_units
+        return SortedDict({annotation: count / nb_units
+                           for annotation, count in self._statistics.category_counts.items()})
 
     @property
     def bounds(self) -> Tuple[float, float]:
@@ -303,17 +533,19 @@ class Continuum:
     def max_num_annotations_per_annotator(self):
         """The maximum number of annotated segments an annotator has
         in this continuum"""
-        max_num_annotations_per_annotator = 0
-        for annotator in self._annotations:
-            max_num_annotations_per_annotator = np.max(
-                [max_num_annotations_per_annotator,
-                 len(self[annotator])])
-        return max_num_annotations_per_annotator
+        return max((len(units) for units in self._annotations.values()), default=0)
 
     @property
     def avg_length_unit(self) -> float:
         """Mean of the annotated segments' durations"""
-        return sum(unit.segment.duration for _, unit in self) / self.num_units
+        statistics = self._statistics
+        if statistics.durations_stale:  # units were removed
+            statistics.set_durations(self._units_durations())
+        return statistics.durations_sum / self.num_units
+
+    def _units_durations(self) -> float:
+        """Sum of the durations of all the units."""
+        return math.fsum(unit.segment.duration for units in self._annotations.values() for unit in units)
 
     def add_annotator(self,  annotator: Annotator):
         """
@@ -342,10 +574,158 @@ class Continuum:
             self._annotations[annotator] = SortedSet()
         if annotation is not None:
             self._categories.add(annotation)
-        self._annotations[annotator].add(Unit(segment, annotation))
+        unit = Unit(segment, annotation)
+        units = self._writable_units(annotator)
+        nb_units = len(units)
+        units.add(unit)
+        if len(units) > nb_units:  # the unit wasn't already there
+            self._statistics.add_unit(unit)
         self.bound_inf = min(self.bound_inf, segment.start)
         self.bound_sup = max(self.bound_sup, segment.end)
 
+    def add_many(self,
+                 annotators: Union[Annotator, Iterable[Annotator]],
+                 starts: Iterable[float],
+                 ends: Iterable[float],
+                 annotations: Optional[Iterable[Optional[str]]] = None,
+                 discard_invalid_rows: bool = False):
+        """
+        Adds many units to the continuum at once, given in columnar form : the i-th unit is annotated by
+        ``annotators[i]``, on ``Segment(starts[i], ends[i])``, with ``annotations[i]``. It is equivalent to
+        calling ``Continuum.add`` for each unit, but the units are validated and sorted in vectorized form,
+        and the bounds and categories of the continuum are only updated once.
+
+        Parameters
+        ----------
+        annotators: str or array-like of str
+            annotator of each unit (or of all the units)
+        starts, ends: array-like of float
+            start and end of the segment of each unit
+        annotations: array-like of str (or None), optional
+            annotation of each unit, if any.
+        discard_invalid_rows: bool
+            If set, units of duration 0.0 are ignored. Otherwise, a ValueError is raised (and no unit is added).
+        """
+        from .array_continuum import sorted_units_arrays
+        self._add_arrays(*sorted_units_arrays(annotators, starts, ends, annotations, discard_invalid_rows))
+
+    def _add_arrays(self, arrays: 'ContinuumArrays', categories: SortedSet):
+        """Adds units given in their (sorted) columnar form, along with their categories."""
+        from .array_continuum import units_sets
+        added = np.ones(len(arrays.annotators), dtype=bool)  # annotators whose units are all added
+        for i, (annotator, units) in enumerate(units_sets(arrays, categories).items()):
+            if self._annotations.get(annotator):
+                annotated = self._annotations[annotator]
+                self._statistics.add_units([unit for unit in units if unit not in annotated])
+                self._writable_units(annotator).update(units)
+                added[i] = False
+            else:
+                self._annotations[annotator] = units
+                self._time_indexes.pop(annotator, None)
+        added_units = np.repeat(added, np.diff(arrays.indptr))
+        self._statistics.add_arrays(arrays.starts[added_units], arrays.ends[added_units],
+                                    arrays.category_codes[added_units], categories)
+        self._categories.update(categories)
+        self._extend_bounds(arrays)
+
+    def _view(self, annotator: Annotator) -> Optional[UnitsView]:
+        """Live `UnitsView` of the current units of the annotator, if there is one."""
+        view_ref = self._views.get(annotator)
+        view = None if view_ref is None else view_ref()
+        if view is None or view._units is not self._annotations[annotator]:
+            return None
+        return view
+
+    def _writable_units(self, annotator: Annotator) -> SortedSet:
+        """Sorted set of units of the annotator, copied first if it is shared (copy-on-write)."""
+        units = self._annotations[annotator]
+        if annotator in self._shared_units or self._view(annotator) is not None:
+            units = self._annotations[annotator] = _sorted_set(units)
+            self._shared_units.discard(annotator)
+        self._views.pop(annotator, None)  # existing views keep the previous units
+        self._time_indexes.pop(annotator, None)  # the units are about to be modified
+        return units
+
+    def _time_index(self, annotator: Annotator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Time index of the units of the annotator : arrays of their starts, of their ends, and of the running
+        maximum of their ends, which are both sorted (like the units). It is built the first time it is needed,
+        and dropped when the annotator's units are modified.
+        """
+        index = self._time_indexes.get(annotator)
+        if index is None:
+            units = self._annotations[annotator]
+            starts = np.fromiter((unit.segment.start for unit in units), dtype=np.float64, count=len(units))
+            ends = np.fromiter((unit.segment.end for unit in units), dtype=np.float64, count=len(units))
+            index = self._time_indexes[annotator] = (starts, ends, np.maximum.accumulate(ends))
+        return index
+
+    def _cropped_indexes(self, annotator: Annotator, support: Segment, mode: CropMode) -> np.ndarray:
+        """
+        Indexes of the units of the annotator that ``Continuum.crop`` keeps. They are found by bisection in the
+        time index, which only leaves to check the ends of units between the found bounds.
+        """
+        starts, ends, max_ends = self._time_index(annotator)
+        stop = np.searchsorted(starts, support.end, side="left")
+        if mode == "strict":
+            first = np.searchsorted(starts, support.start, side="left")
+            kept = ends[first:stop] <= support.end
+        else:
+            first = np.searchsorted(max_ends, support.start, side="right")
+            kept = ends[first:stop] > support.start
+        return first + np.flatnonzero(kept)
+
+    def crop(self, support: Segment, mode: CropMode = "intersection") -> 'Continuum':
+        """
+        Returns the sub-continuum of the units that are in the given time range (for all the annotators,
+        even those without any unit in that range). Units are found by bisection in a time index of each
+        annotator's units (built when first needed), in :math:`O(log(n) + k)` for :math:`k` units found.
+
+        Parameters
+        ----------
+        support: Segment
+            time range of the sub-continuum.
+        mode: "intersection", "loose" or "strict"
+            As in ``pyannote.core.Annotation.crop`` : with "loose", units that overlap the support are kept
+            as they are. With "strict", only the units fully included in the support are kept. With
+            "intersection" (the default), units that overlap the support are cut to fit in it.
+
+        Returns
+        -------
+        Continuum:
+            New continuum (of the same class), whose bounds are those of the support (extended to the units
+            in "loose" mode).
+        """
+        if mode not in ("intersection", "loose", "strict"):
+            raise ValueError(f"Unknown crop mode '{mode}' : must be 'intersection', 'loose' or 'strict'.")
+        cropped = type(self)(self.uri)
+        annotators, starts, ends, annotations = [], [], [], []
+        for annotator, units in self._annotations.items():
+            cropped.add_annotator(annotator)
+            indexes = self._cropped_indexes(annotator, support, mode)
+            if not len(indexes):
+                continue
+            first = int(indexes[0])
+            selected = list(units.islice(first, int(indexes[-1]) + 1))
+            annotators += [annotator] * len(indexes)
+            annotations += [selected[i].annotation for i in (indexes - first).tolist()]
+            unit_starts, unit_ends, _ = self._time_index(annotator)
+            starts.append(unit_starts[indexes])
+            ends.append(unit_ends[indexes])
+        starts = np.concatenate(starts) if starts else np.empty(0)
+        ends = np.concatenate(ends) if ends else np.empty(0)
+        if mode == "intersection":
+            starts, ends = np.maximum(starts, support.start), np.minimum(ends, support.end)
+        cropped.bound_inf, cropped.bound_sup = support.start, support.end
+        cropped.add_many(annotators, starts, ends, annotations, discard_invalid_rows=True)
+        return cropped
+
+    def _extend_bounds(self, arrays: 'ContinuumArrays'):
+        """Grows the bounds of the continuum to include the given units."""
+        if len(arrays.starts):
+            self.bound_inf = min(self.bound_inf, float(np.min(arrays.starts)))
+            self.bound_sup = max(self.bound_sup, float(np.max(arrays.ends)))
+
     def add_annotation(self, annotator: Annotator, annotation: Annotation):
         """
         Add a full pyannote annotation to the continuum.
@@ -358,8 +738,11 @@ class Continuum:
             A pyannote `Annotation` object. If a label is present for a given
             segment, it will be considered as that label's annotation.
         """
-        for segment, _, label in annotation.itertracks(yield_label=True):
-            self.add(annotator, segment, label)
+        tracks = list(annotation.itertracks(yield_label=True))
+        self.add_many(annotator,
+                      [segment.start for segment, _, _ in tracks],
+                      [segment.end for segment, _, _ in tracks],
+                      [label for _, _, label in tracks])
 
     def add_timeline(self, annotator: Annotator, timeline: Timeline):
         """
@@ -373,8 +756,9 @@ class Continuum:
             A pyannote `Annotation` object. No annotation will be attached to
             segments.
         """
-        for segment in timeline:
-            self.add(annotator, segment)
+        self.add_many(annotator,
+                      [segment.start for segment in timeline],
+                      [segment.end for segment in timeline])
 
     def reset_bounds(self):
         """
@@ -408,6 +792,7 @@ class Continuum:
         """
         from textgrid import TextGrid, IntervalTier
         tg = TextGrid.fromFile(str(tg_path))
+        starts, ends, annotations = [], [], []
         for tier_name in tg.getNames():
             if selected_tiers is not None and tier_name not in selected_tiers:
                 continue
@@ -415,15 +800,10 @@ class Continuum:
             for interval in tier:
                 if not interval.mark:
                     continue
-
-                if use_tier_as_annotation:
-                    self.add(annotator,
-                             Segment(interval.minTime, interval.maxTime),
-                             tier_name)
-                else:
-                    self.add(annotator,
-                             Segment(interval.minTime, interval.maxTime),
-                             interval.mark)
+                starts.append(interval.minTime)
+                ends.append(interval.maxTime)
+                annotations.append(tier_name if use_tier_as_annotation else interval.mark)
+        self.add_many(annotator, starts, ends, annotations)
 
     def add_elan(self,
                  annotator: Annotator,
@@ -447,14 +827,15 @@ class Continuum:
         """
         from pympi import Eaf
         eaf = Eaf(eaf_path)
+        starts, ends, annotations = [], [], []
         for tier_name in eaf.get_tier_names():
             if selected_tiers is not None and tier_name not in selected_tiers:
                 continue
             for start, end, value in eaf.get_annotation_data_for_tier(tier_name):
-                if use_tier_as_annotation:
-                    self.add(annotator, Segment(start, end), tier_name)
-                else:
-                    self.add(annotator, Segment(start, end), value)
+                starts.append(start)
+                ends.append(end)
+                annotations.append(tier_name if use_tier_as_annotation else value)
+        self.add_many(annotator, starts, ends, annotations)
 
     def merge(self, continuum: 'Continuum', in_place: bool = False) -> Optional['Continuum']:
         """
@@ -479,8 +860,11 @@ class Continuum:
             # ensure all annotators are added to the continuum,
             # even those who do not have any annotated Units
             current_cont.add_annotator(annotator)
-        for annotator, unit in continuum:
-            current_cont.add(annotator, unit.segment, unit.annotation)
+        units = list(continuum)
+        current_cont.add_many([annotator for annotator, _ in units],
+                              [unit.segment.start for _, unit in units],
+                              [unit.segment.end for _, unit in units],
+                              [unit.annotation for _, unit in units])
         if not in_place:
             return current_cont
 
@@ -495,31 +879,44 @@ class Continuum:
         """
         return self.merge(other, in_place=False)
 
-    def __getitem__(self, keys: Union[str, Tuple[str, int]]) -> Union[SortedSet, Unit]:
+    def __getitem__(self, keys: Union[str, Tuple[str, int], slice]) -> Union[UnitsView, Unit, 'Continuum']:
         """Get the set of annotations from an annotator, or a specific annotation.
-        (Deep copies are returned to ensure some constraints cannot be violated)
+        The set of annotations is a read-only view (see `UnitsView`), that isn't affected by
+        later modifications of the continuum. A time slice returns the sub-continuum cropped
+        to that time range (see ``Continuum.crop``).
 
         >>> continuum['Alex']
-        SortedSet([Unit(segment=<Segment(2, 9)>, annotation='1'), Unit(segment=<Segment(11, 17)>, ...
+        UnitsView([Unit(segment=<Segment(2, 9)>, annotation='1'), Unit(segment=<Segment(11, 17)>, ...
         >>> continuum['Alex', 0]
         Unit(segment=<Segment(2, 9)>, annotation='1')
+        >>> continuum[5:12]
+        <pygamma_agreement.continuum.Continuum object at ...>
 
         Parameters
         ----------
-        keys: Annotator or Annotator,int
+        keys: Annotator or Annotator,int or slice
 
 
         Raises
         ------
         KeyError
         """
+        if isinstance(keys, slice):
+            if keys.step is not None:
+                raise ValueError("Continuum time slices don't have a step")
+            return self.crop(Segment(self.bound_inf if keys.start is None else keys.start,
+                                     self.bound_sup if keys.stop is None else keys.stop))
         try:
             if isinstance(keys, str):
-                return deepcopy(self._annotations[keys])
+                view = self._view(keys)
+                if view is None:
+                    view = UnitsView(self._annotations[keys])
+                    self._views[keys] = weakref.ref(view)
+                return view
             else:
                 annotator, idx = keys
                 try:
-                    return deepcopy(self._annotations[annotator][idx])
+                    return self._annotations[annotator][idx]  # units are immutable
                 except IndexError:
                     raise IndexError(f'index {idx} of annotations by {annotator} is out of range')
         except KeyError:
@@ -554,8 +951,10 @@ class Continuum:
         KeyError
             if the unit is not from the annotator's annotations.
         """
-        annotations: SortedSet = self._annotations[annotator]
-        annotations.remove(unit)
+        if unit not in self._annotations[annotator]:
+            raise KeyError(unit)
+        self._writable_units(annotator).remove(unit)
+        self._statistics.remove_unit(unit)
 
     @property
     def annotators(self) -> SortedSet:
@@ -575,36 +974,83 @@ class Continuum:
         """
         return iter(self._annotations[annotator])
 
-    def get_best_soft_alignment(self,  dissimilarity: AbstractDissimilarity) -> 'SoftAlignment':
-        assert len(self.annotators) >= 2 and self, "Disorder cannot be computed with less than two annotators, or " \
-                                                   "without annotations."
-
+    def _units_sizes(self) -> np.ndarray:
+        """Number of units of each annotator (in alphabetical order)."""
         sizes = np.empty(self.num_annotators, dtype=np.int32)
         for i, units in enumerate(self._annotations.values()):
             sizes[i] = len(units)
+        return sizes
 
-        disorders, possible_unitary_alignments = dissimilarity.valid_alignments(self)
-        # Definition of the integer linear program
-        n = len(disorders)
-        # Constraints matrix ("every unit must appear once and only once")
-        A = build_A(possible_unitary_alignments, sizes)
+    def _units_starts(self) -> np.ndarray:
+        """Starts of all the units, in the order of iteration of the continuum."""
+        return np.fromiter((unit.segment.start for _, unit in self), dtype=np.float64, count=self.num_units)
 
-        x = cp.Variable(shape=(n,), boolean=True)
-        try:
-            import cylp
-            cp.Problem(cp.Minimize(disorders.T @ x), [A @ x >= 1]).solve(solver=cp.CBC)
-        except (ImportError, cp.SolverError):
-            logging.warning("CBC solver not installed. Using GLPK.")
-            cp.Problem(cp.Minimize(disorders.T @ x), [A @ x >= 1]).solve(solver=cp.GLPK_MI)
-        assert x.value is not None, "The linear solver couldn't find an alignment with minimal disorder " \
-                                    "(likely because the amount of possible unitary alignments was too high)"
-        # compare with 0.9 as cvxpy returns 1.000 or small values i.e. 10e-14
-        chosen_alignments_ids, = np.where(x.value > 0.9)
+    def _unit_arrays(self, categories: SortedSet) -> nb.typed.List:
+        """
+        Array-shaped representation of the continuum used by the dissimilarities' kernels (see
+        `AbstractDissimilarity._build_arrays_continuum`), with the units' categories indexed in `categories`.
+        """
+        unit_arrays = nb.typed.List()
+        for annotator_id, (annotator, units) in enumerate(self._annotations.items()):
+            # dim x : segment
+            # dim y : (start, end, dur, annotation)
+            unit_array = np.empty((len(units), 4), dtype=np.float32)
+            for unit_id, unit in enumerate(units):
+                unit_array[unit_id][0] = unit.segment.start
+                unit_array[unit_id][1] = unit.segment.end
+                unit_array[unit_id][2] = unit.segment.duration
+                unit_array[unit_id][3] = categories.index(unit.annotation)
+            unit_arrays.append(unit_array)
+        return unit_arrays
+
+    def _solve_best_alignment(self,
+                              dissimilarity: AbstractDissimilarity,
+                              solver: Union[None, 'SolverName', 'AbstractSolver'],
+                              soft: bool,
+                              n_threads: Optional[int] = None) -> Tuple[List['UnitaryAlignment'], np.ndarray]:
+        """
+        Solves the integer linear program of the best (soft) alignment, and returns the chosen unitary
+        alignments along with their disorders.
+        """
+        assert len(self.annotators) >= 2 and self, "Disorder cannot be computed with less than two annotators, or " \
+                                                   "without annotations."
+
+        sizes = self._units_sizes()
 
-        chosen_alignments: np.ndarray = possible_unitary_alignments[chosen_alignments_ids]
-        alignments_disorders: np.ndarray = disorders[chosen_alignments_ids]
+        disorders, possible_unitary_alignments = dissimilarity.valid_alignments(self, n_threads=n_threads)
 
-        from .alignment import UnitaryAlignment, SoftAlignment
+        solver = get_solver(solver)
+        if len(sizes) == 2 and not soft and isinstance(solver, MatchingSolver):
+            # With two annotators, the best alignment is an assignment problem, solved exactly in polynomial time
+            chosen_alignments_ids = solver.solve_matching(disorders, possible_unitary_alignments, sizes)
+            return self._build_unitary_alignments(possible_unitary_alignments[chosen_alignments_ids],
+                                                  disorders[chosen_alignments_ids])
+
+        # Sparse constraints matrix ("every unit must appear once and only once")
+        A = build_A(possible_unitary_alignments, sizes)
+
+        # Independent sub-problems are found by sweeping the units in chronological order
+        starts = self._units_starts()
+        units_ranks = np.empty(len(starts), dtype=np.int64)
+        units_ranks[np.argsort(starts, kind="stable")] = np.arange(len(starts))
+        alignments_components, units_components, nb_components = split_components(possible_unitary_alignments,
+                                                                                  sizes, units_ranks)
+        chosen_alignments_ids = solver.solve_components(disorders, A,
+                                                        alignments_components,
+                                                        units_components,
+                                                        nb_components,
+                                                        soft=soft)
+
+        return self._build_unitary_alignments(possible_unitary_alignments[chosen_alignments_ids],
+                                              disorders[chosen_alignments_ids])
+
+    def _build_unitary_alignments(self,
+                                  chosen_alignments: np.ndarray,
+                                  alignments_disorders: np.ndarray) -> Tuple[List['UnitaryAlignment'], np.ndarray]:
+        """
+        Builds the unitary alignments objects from their matricial form (tuples of units indexes).
+        """
+        from .alignment import UnitaryAlignment
 
         set_unitary_alignements = []
         for alignment_id, alignment in enumerate(chosen_alignments):
@@ -619,6 +1065,29 @@ class Continuum:
             unitary_alignment = UnitaryAlignment(list(u_align_tuple))
             unitary_alignment.disorder = alignments_disorders[alignment_id]
             set_unitary_alignements.append(unitary_alignment)
+        return set_unitary_alignements, alignments_disorders
+
+    def get_best_soft_alignment(self,
+                                dissimilarity: AbstractDissimilarity,
+                                solver: Union[None, 'SolverName', 'AbstractSolver'] = None,
+                                n_threads: Optional[int] = None) -> 'SoftAlignment':
+        """
+        Returns the best soft alignment of the continuum for the given dissimilarity, i.e. a set of unitary
+        alignments of minimal disorder where each unit appears at least once.
+
+        Parameters
+        ----------
+        dissimilarity: AbstractDissimilarity
+            the dissimilarity that will be used to compute unit-to-unit disorder.
+        solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+            the linear solver used to find the best alignment. Defaults to cvxpy (CBC or GLPK).
+        n_threads: int, optional
+            number of threads used to enumerate the possible unitary alignments (see
+            ``AbstractDissimilarity.valid_alignments``). Defaults to a single thread.
+        """
+        from .alignment import SoftAlignment
+        set_unitary_alignements, alignments_disorders = self._solve_best_alignment(dissimilarity, solver,
+                                                                                   soft=True, n_threads=n_threads)
         return SoftAlignment(set_unitary_alignements,
                              continuum=self,
                              check_validity=False,
@@ -679,9 +1148,27 @@ class Continuum:
                 index += 1
         return window, x_limit
 
-    def get_fast_alignment(self, dissimilarity: AbstractDissimilarity, window_size: int) -> 'Alignment':
+    def get_fast_alignment(self,
+                           dissimilarity: AbstractDissimilarity,
+                           window_size: int,
+                           solver: Union[None, 'SolverName', 'AbstractSolver'] = None,
+                           n_threads: Optional[int] = None) -> 'Alignment':
         """Returns an 'approximation' of the best alignment (Very likely to be the actual best alignment for
-         continua with limited overlapping)"""
+        continua with limited overlapping)
+
+        Parameters
+        ----------
+        dissimilarity: AbstractDissimilarity
+            the dissimilarity that will be used to compute unit-to-unit disorder.
+        window_size: int
+            number of units of each annotator in the windows whose best alignments are computed.
+        solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+            the linear solver used to find the best alignment of each window.
+        n_threads: int, optional
+            number of threads used to enumerate the possible unitary alignments of each window (see
+            ``AbstractDissimilarity.valid_alignments``). Defaults to a single thread.
+        """
+        solver = get_solver(solver)
         from .alignment import Alignment
         copy = self.copy()
         unitary_alignments = []
@@ -692,7 +1179,7 @@ class Continuum:
             # Window contains each annotator's first annotations
             # We retain only the leftmost unitary alignment in the best alignment of the window,
             # as it is the most likely to be in the global best alignment
-            best_alignment = window.get_best_alignment(dissimilarity)
+            best_alignment = window.get_best_alignment(dissimilarity, solver, n_threads=n_threads)
             for chosen in best_alignment.take_until_limit(x_limit):
                 unitary_alignments.append(chosen)
                 disorders.append(chosen.disorder)
@@ -704,13 +1191,15 @@ class Continuum:
                          check_validity=False,  # Validity has been thoroughly tested
                          disorder=np.sum(disorders) / self.avg_num_annotations_per_annotator)
 
-    def measure_best_window_size(self, dissimilarity: AbstractDissimilarity):
+    def measure_best_window_size(self,
+                                 dissimilarity: AbstractDissimilarity,
+                                 solver: Union[None, 'SolverName', 'AbstractSolver'] = None):
         """
         Sets the best window size for computing the fast-gamma of this continuum, by using the
         sampling the computing complexity function.
         """
         smallest_window, _ = self.get_first_window(dissimilarity, 1)
-        smallest_window.get_best_alignment(dissimilarity)
+        smallest_window.get_best_alignment(dissimilarity, solver)
 
         s = smallest_window.max_num_annotations_per_annotator
         n = int(self.avg_num_annotations_per_annotator)
@@ -739,7 +1228,10 @@ class Continuum:
         else:
             logging.warning("Fast-gamma disadvantageous, using normal gamma.")
 
-    def get_best_alignment(self, dissimilarity: AbstractDissimilarity) -> 'Alignment':
+    def get_best_alignment(self,
+                           dissimilarity: AbstractDissimilarity,
+                           solver: Union[None, 'SolverName', 'AbstractSolver'] = None,
+                           n_threads: Optional[int] = None) -> 'Alignment':
         """
         Returns the best alignment of the continuum for the given dissimilarity. This alignment comes
         with the associated disorder, so you can obtain it in constant time with alignment.disorder.
@@ -751,51 +1243,17 @@ class Continuum:
         ----------
         dissimilarity: AbstractDissimilarity
             the dissimilarity that will be used to compute unit-to-unit disorder.
+        solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+            the linear solver used to find the best alignment. Defaults to cvxpy (CBC or GLPK).
+            With exactly two annotators, no linear solver is needed: the best alignment is then found
+            as a minimum weight bipartite matching.
+        n_threads: int, optional
+            number of threads used to enumerate the possible unitary alignments (see
+            ``AbstractDissimilarity.valid_alignments``). Defaults to a single thread.
         """
-        assert len(self.annotators) >= 2 and self, "Disorder cannot be computed with less than two annotators, or " \
-                                                   "without annotations."
-
-        sizes = np.empty(self.num_annotators, dtype=np.int32)
-        for i, units in enumerate(self._annotations.values()):
-            sizes[i] = len(units)
-
-        disorders, possible_unitary_alignments = dissimilarity.valid_alignments(self)
-        # Definition of the integer linear program
-        n = len(disorders)
-        # Constraints matrix ("every unit must appear once and only once")
-        A = build_A(possible_unitary_alignments, sizes)
-
-        x = cp.Variable(shape=(n,), boolean=True)
-        try:
-            import cylp
-            cp.Problem(cp.Minimize(disorders.T @ x), [A @ x == 1]).solve(solver=cp.CBC)
-        except (ImportError, cp.SolverError):
-            logging.warning("CBC solver not installed. Using GLPK.")
-            matmul = A @ x
-            cp.Problem(cp.Minimize(disorders.T @ x), [1 <= matmul, matmul <= 1]).solve(solver=cp.GLPK_MI)
-        assert x.value is not None, "The linear solver couldn't find an alignment with minimal disorder " \
-                                    "(likely because the amount of possible unitary alignments was too high)"
-        # compare with 0.9 as cvxpy returns 1.000 or small values i.e. 10e-14
-        chosen_alignments_ids, = np.where(x.value > 0.9)
-
-        chosen_alignments: np.ndarray = possible_unitary_alignments[chosen_alignments_ids]
-        alignments_disorders: np.ndarray = disorders[chosen_alignments_ids]
-
-        from .alignment import UnitaryAlignment, Alignment
-
-        set_unitary_alignements = []
-        for alignment_id, alignment in enumerate(chosen_alignments):
-            u_align_tuple = []
-            for annotator_id, unit_id in enumerate(alignment):
-                annotator, units = self._annotations.peekitem(annotator_id)
-                try:
-                    unit = units[unit_id]
-                    u_align_tuple.append((annotator, unit))
-                except IndexError:  # it's a "null unit"
-                    u_align_tuple.append((annotator, None))
-            unitary_alignment = UnitaryAlignment(list(u_align_tuple))
-            unitary_alignment.disorder = alignments_disorders[alignment_id]
-            set_unitary_alignements.append(unitary_alignment)
+        from .alignment import Alignment
+        set_unitary_alignements, alignments_disorders = self._solve_best_alignment(dissimilarity, solver,
+                                                                                   soft=False, n_threads=n_threads)
         return Alignment(set_unitary_alignements,
                          continuum=self,
                          # Validity of results from get_best_alignments have been thoroughly tested :
@@ -809,7 +1267,14 @@ class Continuum:
                       ground_truth_annotators: Optional[SortedSet] = None,
                       sampler: 'AbstractContinuumSampler' = None,
                       fast: bool = False,
-                      soft: bool = False) -> 'GammaResults':
+                      soft: bool = False,
+                      solver: Union[None, 'SolverName', 'AbstractSolver'] = None,
+                      executor: Union[None, ExecutorType, Executor] = None,
+                      seed: Union[None, int, np.random.SeedSequence] = None,
+                      max_samples: Optional[int] = None,
+                      disorder_cache: Optional['DisorderCache'] = None,
+                      need_alignments: bool = False,
+                      n_threads: Optional[int] = None) -> 'GammaResults':
         """
 
         Parameters
@@ -819,11 +1284,12 @@ class Continuum:
             to the combined categorical dissimilarity with parameters taken from the java implementation.
         n_samples: optional int
             number of random continuum sampled from this continuum  used to
-            estimate the gamma measure
+            estimate the gamma measure (the minimum number of samples if a precision level is set)
         precision_level: optional float or "high", "medium", "low"
             error percentage of the gamma estimation. If a literal
             precision level is passed (e.g. "medium"), the corresponding numerical
-            value will be used (high: 1%, medium: 2%, low : 5%)
+            value will be used (high: 1%, medium: 2%, low : 5%). Samples are then drawn until the
+            confidence interval of the expected disorder, updated with each new sample, is narrow enough.
         ground_truth_annotators: SortedSet of str
             if set, the random continuua will only be sampled from these
             annotators. This should be used when you want to compare a prediction
@@ -839,6 +1305,40 @@ class Continuum:
             Activate soft-gamma, an alternative measure that uses a slighlty different definition of an
             alignment. For further information, please consult the 'Soft-Gamma' section of the documentation.
             Incompatible with fast-gamma : raises an error if both 'fast' and 'soft' are set to True.
+        solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+            Linear solver backend used for finding the best alignments. Defaults to cvxpy (using CBC or GLPK).
+            "highs" skips the cvxpy modeling layer, which is significantly faster for fast-gamma's small windows.
+        executor: "threads", "processes" or concurrent.futures.Executor, optional
+            Pool in which the best alignments of the continuum and of the samples are computed. Defaults to
+            "threads", a thread pool with as many threads as CPUs. Part of the computation of an alignment holds
+            the GIL : "processes" (a process pool with as many processes as CPUs) scales better on many cores,
+            at the cost of sending the continua (and receiving their alignments) between processes. The sampler
+            (and the dissimilarity) are sent once to each of its processes, when they start, and the samples' jobs
+            only send their seeds. Its processes are spawned (they import pygamma-agreement again), so scripts that
+            use it must protect their entry point with ``if __name__ == "__main__":``. A given executor is used as
+            is, and isn't shut down. With a given ``ProcessPoolExecutor``, the sampler can't be sent to its
+            processes beforehand : it is pickled once, but its bytes are sent along with every sample's job (each
+            process only unpickles it once).
+        seed: int or np.random.SeedSequence, optional
+            Seed of the random samples. Each sample is drawn by the worker that aligns it, with its own
+            random generator spawned from this seed, so that the samples (and the gamma) only depend on the
+            seed, and not on the executor or its number of workers. If not set, the seed is drawn from
+            numpy's global random state (which ``np.random.seed`` makes reproducible).
+        max_samples: int, optional
+            maximum number of samples drawn to reach the precision level. Unlimited if not set.
+        disorder_cache: DisorderCache, optional
+            Persistent cache of the samples' disorders. If the samples only depend on statistics of the continuum
+            (as with the default sampler), the disorders cached for (nearly) the same statistics and the same
+            dissimilarity are used before new samples are drawn, and the new samples' disorders are added to the
+            cache. The alignments of the cached samples aren't available : unless ``need_alignments`` is set,
+            the gamma-cat and gamma-k of results that used cached disorders can't be computed.
+        need_alignments: bool, optional
+            If set, the disorders of the ``disorder_cache`` aren't used (the new samples' are still added to it),
+            so that the gamma, gamma-cat and gamma-k of the results are all computed from the same samples.
+        n_threads: int, optional
+            Number of numba threads used by each job to enumerate the possible unitary alignments (see
+            `AbstractDissimilarity.valid_alignments`). Mostly useful when the executor has fewer workers than
+            there are cores, e.g. for a single large continuum.
         """
         from .dissimilarity import CombinedCategoricalDissimilarity
         if dissimilarity is None:
@@ -848,6 +1348,11 @@ class Continuum:
             from .sampler import StatisticalContinuumSampler
             sampler = StatisticalContinuumSampler()
         sampler.init_sampling(self, ground_truth_annotators)
+        solver = get_solver(solver)
+        if not isinstance(seed, np.random.SeedSequence):
+            if seed is None:
+                seed = np.random.randint(2 ** 32, size=4, dtype=np.uint64)
+            seed = np.random.SeedSequence(seed)
 
         job = _compute_best_alignment_job
         if soft and fast:
@@ -857,62 +1362,104 @@ class Continuum:
         # Multiprocessed computation of sample disorder
         if fast:
             job = _compute_fast_alignment_job
-            self.measure_best_window_size(dissimilarity)
-
-        # Multithreaded computation of sample disorder
-        with ThreadPoolExecutor(max_workers=os.cpu_count()) as p:
+            self.measure_best_window_size(dissimilarity, solver)
+
+        if precision_level is not None:
+            if isinstance(precision_level, str):
+                precision_level = PRECISION_LEVEL[precision_level]
+            assert 0 < precision_level < 1.0
+
+        disorders = _RunningMoments()
+
+        def target_samples() -> int:
+            if precision_level is None:
+                return n_samples
+            # If the variation of the disorders of the samples is too high, others are generated, until
+            # the estimation of the expected disorder is precise enough (subsection 5.3 of the original paper).
+            required_samples = max(n_samples, disorders.required_samples(precision_level))
+            return required_samples if max_samples is None else min(required_samples, max_samples)
+
+        cache_key = None
+        cached_disorders: List[float] = []
+        if disorder_cache is not None:
+            cache_key = disorder_cache.key(sampler, dissimilarity, "fast" if fast else "soft" if soft else "best")
+            if cache_key is None:
+                logging.info("The samples' disorders can't be cached with this sampler and dissimilarity.")
+            else:
+                available_disorders = disorder_cache.get(cache_key)
+                for disorder in available_disorders.tolist():
+                    if need_alignments or disorders.count >= target_samples():
+                        break
+                    disorders.add(disorder)
+                    cached_disorders.append(disorder)
+                logging.info(f"Using {len(cached_disorders)} cached samples' disorders.")
+                # New samples aren't drawn with the seeds of the cached ones
+                seed.spawn(len(available_disorders))
+
+        # The rest of the context of the samples' jobs (with the sampler, and thus the reference continuum) is
+        # pickled once, and kept by the workers : the jobs of our own pool only get their seed (the workers got
+        # the context from the initializer), those of a given pool also carry the pickled context.
+        own_process_pool = isinstance(executor, str) and executor == "processes"
+        context_token, context_payload = None, None
+        if own_process_pool or isinstance(executor, ProcessPoolExecutor):
+            context_token = uuid.uuid4().hex
+            context_payload = pickle.dumps((job, dissimilarity, sampler, solver, n_threads),
+                                           protocol=pickle.HIGHEST_PROTOCOL)
+        initializer, initargs = (_install_sample_context, (context_token, context_payload)) if own_process_pool \
+            else (None, ())
+
+        # Parallel computation of sample disorder
+        with _gamma_executor(executor, initializer, initargs) as p:
             # Launching jobs
             logging.info(f"Starting computation for the best alignment and a batch of {n_samples} random samples...")
             best_alignment_task = p.submit(job,
-                                           *(dissimilarity, self))
-
-            result_pool = [
-                # Step one : computing the disorders of a batch of random samples from the continuum (done in parallel)
-                p.submit(job,
-                         *(dissimilarity, sampler.sample_from_continuum))
-                for _ in range(n_samples)
-            ]
+                                           *(dissimilarity, self, solver, n_threads))
+
+            def submit_sample() -> Future:
+                sample_seed = seed.spawn(1)[0]
+                if own_process_pool:  # the workers got the context from the initializer
+                    return p.submit(_compute_worker_sample_alignment_job, context_token, None, sample_seed)
+                if context_token is not None:
+                    return p.submit(_compute_worker_sample_alignment_job, context_token, context_payload, sample_seed)
+                return p.submit(_compute_sample_alignment_job,
+                                *(job, dissimilarity, sampler, sample_seed, solver, n_threads))
+
+            # Step one : computing the disorders of a batch of random samples from the continuum (done in parallel)
+            result_pool = deque(submit_sample() for _ in range(target_samples() - disorders.count))
             chance_best_alignments: List[Alignment] = []
-            chance_disorders: List[float] = []
 
             # Obtaining results
             best_alignment = best_alignment_task.result()
             logging.info("Best alignment obtained")
-            for i, result in enumerate(result_pool):
-                chance_best_alignments.append(result.result())
-                logging.info(f"finished computation of random sample dissimilarity {i + 1}/{n_samples}")
-                chance_disorders.append(chance_best_alignments[-1].disorder)
-            logging.info("done.")
-
-            if precision_level is not None:
-                if isinstance(precision_level, str):
-                    precision_level = PRECISION_LEVEL[precision_level]
-                assert 0 < precision_level < 1.0
-                # If the variation of the disorders of the samples si too high, others are generated.
-                # taken from subsection 5.3 of the original paper
-                # confidence at 95%, i.e., 1.96
-                variation_coeff = np.std(chance_disorders) / np.mean(chance_disorders)
-                confidence = 1.96
-                required_samples = np.ceil((variation_coeff * confidence / precision_level) ** 2).astype(np.int32)
-                if required_samples > n_samples:
-                    logging.info(f"Computing second batch of {required_samples - n_samples} "
-                                 f"because variation was too high.")
-                    result_pool = [
-                        p.submit(job,
-                                 *(dissimilarity, sampler.sample_from_continuum))
-                        for _ in range(required_samples - n_samples)
-                    ]
-                    for i, result in enumerate(result_pool):
-                        chance_best_alignments.append(result.result())
-                        logging.info(f"finished computation of additionnal random sample dissimilarity "
-                                     f"{i + 1}/{required_samples - n_samples}")
-                    logging.info("done.")
+            # Results are used in the order of the samples, so that the samples used only depend on the seed.
+            while disorders.count < target_samples():
+                if precision_level is not None:
+                    # Keeps the workers busy with the next samples while the estimation is refined, without
+                    # submitting many more samples than the estimation currently requires
+                    look_ahead = min(os.cpu_count(), target_samples() - disorders.count + SAMPLES_LOOK_AHEAD)
+                    if max_samples is not None:
+                        look_ahead = min(look_ahead, max_samples - disorders.count)
+                    while len(result_pool) < look_ahead:
+                        result_pool.append(submit_sample())
+                chance_best_alignments.append(result_pool.popleft().result())
+                disorders.add(chance_best_alignments[-1].disorder)
+                logging.info(f"finished computation of random sample dissimilarity {disorders.count}")
+            # The samples that are already being aligned can't be cancelled : they are waited for, so that no job
+            # outlives this call (in a given executor)
+            for result in result_pool:
+                result.cancel()
+            wait(result_pool)
+            logging.info(f"done ({disorders.count} samples).")
+
+        if cache_key is not None and chance_best_alignments:
+            disorder_cache.add(cache_key, np.array([alignment.disorder for alignment in chance_best_alignments]))
 
         return GammaResults(
             best_alignment=best_alignment,
             chance_alignments=chance_best_alignments,
             precision_level=precision_level,
-            dissimilarity=dissimilarity
+            dissimilarity=dissimilarity,
+            cached_disorders=cached_disorders
         )
 
     def to_csv(self, path: Union[str, Path], delimiter=","):
@@ -924,6 +1471,61 @@ class Continuum:
                 writer.writerow([annotator, unit.annotation,
                                  unit.segment.start, unit.segment.end])
 
+    def save(self, path: Union[str, Path]):
+        """
+        Saves the continuum in pygamma-agreement's binary format : a small JSON header (uri, bounds,
+        annotators and categories) followed by the raw arrays of its units in columnar form (see
+        `ContinuumArrays`). Files saved this way are loaded back with ``Continuum.load``.
+
+        Parameters
+        ----------
+        path: Path or str
+            Path of the saved file
+        """
+        from .array_continuum import ArrayContinuum, annotations_arrays, write_arrays
+        if isinstance(self, ArrayContinuum):
+            arrays = self.arrays
+        else:
+            arrays = annotations_arrays(self._annotations, self._categories)
+        write_arrays(path, arrays, self._categories, {
+            "uri": self.uri,
+            "bounds": [self.bound_inf, self.bound_sup],
+            "best_window_size": None if np.isinf(self.best_window_size) else int(self.best_window_size),
+        })
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> 'Continuum':
+        """
+        Loads a continuum saved with ``Continuum.save``.
+
+        Loaded in an ``ArrayContinuum`` with ``mmap`` set, the units are not read from the file : its arrays
+        are memory-mapped (read-only), so that loading is almost instantaneous, and processes loading the same
+        file share a single copy of its units in memory.
+
+        Parameters
+        ----------
+        path: Path or str
+            Path of the file to load
+        mmap: bool
+            If set, the units' arrays are memory-mapped instead of being read into memory.
+
+        Returns
+        -------
+        Continuum:
+            New continuum object (of the class this method is called on) holding the saved units.
+        """
+        from .array_continuum import ArrayContinuum, read_arrays
+        header, arrays, categories = read_arrays(path, mmap)
+        continuum = cls(header["uri"])
+        if isinstance(continuum, ArrayContinuum):
+            continuum._set_arrays(arrays, categories)  # the (memory-mapped) arrays are used as they are
+        else:
+            continuum._add_arrays(arrays, categories)
+        continuum.bound_inf, continuum.bound_sup = header["bounds"]
+        if header["best_window_size"] is not None:
+            continuum.best_window_size = header["best_window_size"]
+        return continuum
+
     def _repr_png_(self):
         """IPython notebook support
 
@@ -946,11 +1548,13 @@ class GammaResults:
     chance_alignments: List['Alignment']
     dissimilarity: AbstractDissimilarity
     precision_level: Optional[float] = None
+    # disorders of samples taken from a DisorderCache, whose alignments aren't available
+    cached_disorders: List[float] = field(default_factory=list)
 
     @property
     def n_samples(self):
         """Number of samples used for computation of the expected disorder."""
-        return len(self.chance_alignments)
+        return len(self.chance_alignments) + len(self.cached_disorders)
 
     @property
     def alignments_nb(self):
@@ -967,7 +1571,7 @@ class GammaResults:
     def expected_disorder(self) -> float:
         """Returns the expected disagreement for computed random samples, i.e.,
         the mean of the sampled continuua's disorders"""
-        return float(np.mean([align.disorder for align in self.chance_alignments]))
+        return float(np.mean([align.disorder for align in self.chance_alignments] + self.cached_disorders))
 
 
     @property
@@ -990,9 +1594,16 @@ class GammaResults:
             return 1
         return 1 - observed_disorder / self.expected_disorder
 
+    def _check_chance_alignments(self):
+        if self.cached_disorders:
+            raise ValueError("The disorders of some samples were taken from the cache : gamma-cat and gamma-k "
+                             "need the alignments of all the samples (see the 'need_alignments' parameter "
+                             "of 'Continuum.compute_gamma').")
+
     @property
     def gamma_cat(self) -> float:
         """Returns the gamma-cat value"""
+        self._check_chance_alignments()
         with ThreadPoolExecutor(max_workers=os.cpu_count()) as p:
 
             observed_disorder_job = p.submit(_compute_gamma_k_job,
@@ -1013,6 +1624,7 @@ class GammaResults:
 
     def gamma_k(self, category: str) -> float:
         """Returns the gamma-k value for the given category"""
+        self._check_chance_alignments()
         with ThreadPoolExecutor(max_workers=os.cpu_count()) as p:
             observed_disorder_job = p.submit(_compute_gamma_k_job,
                                              *(self.dissimilarity, self.best_alignment, category))
@@ -1030,30 +1642,165 @@ class GammaResults:
         return 1 - observed_disorder / expected_disorder
 
 
+@contextmanager
+def _gamma_executor(executor: Union[None, ExecutorType, Executor],
+                    initializer: Optional[Callable] = None,
+                    initargs: tuple = ()) -> Generator[Executor, None, None]:
+    """Executor used by ``Continuum.compute_gamma`` (see its ``executor`` parameter). The initializer is run by
+    each worker of the process pools it creates."""
+    if isinstance(executor, Executor):
+        yield executor
+        return
+    if executor is None or executor == "threads":
+        pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+    elif executor == "processes":
+        # Forking a process whose compiled kernels or solvers have started threads can deadlock the workers
+        pool = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=initializer, initargs=initargs)
+    else:
+        raise ValueError(f"Unknown executor '{executor}' : must be 'threads', 'processes' or an Executor.")
+    with pool:
+        yield pool
+
+
+class _RunningMoments:
+    """
+    Mean and standard deviation of the disorders of the samples, updated one sample at a time (Welford's algorithm).
+    """
+    __slots__ = ("count", "mean", "_squares")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._squares = 0.0  # sum of the squared differences to the mean
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._squares += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self._squares / self.count) if self.count else 0.0
+
+    def required_samples(self, precision_level: float) -> int:
+        """Number of samples for the mean to be within ``precision_level`` of the expected value,
+        with a confidence of 95% (i.e., 1.96)."""
+        if self.mean == 0:
+            return 0
+        variation_coeff = self.std / self.mean
+        return math.ceil((variation_coeff * 1.96 / precision_level) ** 2)
+
+
+def _compute_sample_alignment_job(job: Callable,
+                                  dissimilarity: AbstractDissimilarity,
+                                  sampler: 'AbstractContinuumSampler',
+                                  seed: np.random.SeedSequence,
+                                  solver: 'AbstractSolver',
+                                  n_threads: Optional[int] = None):
+    """
+    Function used to launch a multiprocessed job for drawing a random sample of a continuum (with its own random
+    generator) and calculating its alignment with the given alignment job.
+    """
+    return job(dissimilarity, sampler.sample(np.random.default_rng(seed)), solver, n_threads)
+
+
+# Contexts of the samples' jobs (alignment job, dissimilarity, sampler, solver and number of threads) kept by the
+# worker processes, keyed by a token identifying the ``compute_gamma`` call they were sent by.
+_worker_sample_contexts: 'OrderedDict[str, tuple]' = OrderedDict()
+_MAX_WORKER_SAMPLE_CONTEXTS = 4
+
+
+def _install_sample_context(token: str, payload: bytes) -> tuple:
+    """
+    Unpickles the (pickled) context of the samples' jobs in a worker process, unless it is already there, and
+    returns it. Only the last few contexts are kept.
+    """
+    context = _worker_sample_contexts.get(token)
+    if context is None:
+        context = _worker_sample_contexts[token] = pickle.loads(payload)
+        while len(_worker_sample_contexts) > _MAX_WORKER_SAMPLE_CONTEXTS:
+            _worker_sample_contexts.popitem(last=False)
+    return context
+
+
+def _compute_worker_sample_alignment_job(token: str,
+                                         payload: Optional[bytes],
+                                         seed: np.random.SeedSequence):
+    """
+    Same as `_compute_sample_alignment_job`, in a worker process that keeps the context of the samples' jobs.
+    The context is either sent once to each worker by the pool's initializer (``payload`` is then None), or
+    sent along with every job, already pickled, and only unpickled by the first job of each worker.
+    """
+    if payload is None:
+        job, dissimilarity, sampler, solver, n_threads = _worker_sample_contexts[token]
+    else:
+        job, dissimilarity, sampler, solver, n_threads = _install_sample_context(token, payload)
+    return _compute_sample_alignment_job(job, dissimilarity, sampler, seed, solver, n_threads)
+
+
 def _compute_best_alignment_job(dissimilarity: AbstractDissimilarity,
-                                continuum: Continuum):
+                                continuum: Continuum,
+                                solver: 'AbstractSolver',
+                                n_threads: Optional[int] = None):
     """
     Function used to launch a multiprocessed job for calculating the best aligment of a continuum
     using the given dissimilarity.
     """
-    return continuum.get_best_alignment(dissimilarity)
+    return continuum.get_best_alignment(dissimilarity, solver, n_threads)
 
 
 def _compute_fast_alignment_job(dissimilarity: AbstractDissimilarity,
-                                continuum: Continuum):
+                                continuum: Continuum,
+                                solver: 'AbstractSolver',
+                                n_threads: Optional[int] = None):
     """
     Function used to launch a multiprocessed job for calculating an approximation of
     the best aligment of a continuum, using the given dissimilarity.
     """
     if continuum.best_window_size == np.inf:  # window size is set to infinity when normal gamma is better.
-        return continuum.get_best_alignment(dissimilarity)
-    return continuum.get_fast_alignment(dissimilarity, continuum.best_window_size)
+        return continuum.get_best_alignment(dissimilarity, solver, n_threads)
+    return continuum.get_fast_alignment(dissimilarity, continuum.best_window_size, solver, n_threads)
 
 def _compute_soft_alignment_job(dissimilarity: AbstractDissimilarity,
-                                continuum: Continuum):
-    return continuum.get_best_soft_alignment(dissimilarity)
+                                continuum: Continuum,
+                                solver: 'AbstractSolver',
+                                n_threads: Optional[int] = None):
+    return continuum.get_best_soft_alignment(dissimilarity, solver, n_threads)
 
 def _compute_gamma_k_job(dissimilarity: AbstractDissimilarity,
                          alignment: 'Alignment',
                          category: Optional[str]):
     return alignment.gamma_k_disorder(dissimilarity, category)
+
+
+def warmup(dissimilarity: Optional[AbstractDissimilarity] = None,
+           solver: Union[None, 'SolverName', 'AbstractSolver'] = None) -> None:
+    """
+    Compiles (or loads from numba's on-disk cache) everything the computation of the gamma agreement needs,
+    by computing the gamma of tiny continua with three and two annotators : the dissimilarity's specialized
+    kernels, the (sequential and parallel) enumerations of the possible unitary alignments and the linear
+    solver. Calling it once at startup (for instance in a server or a batch job) takes the JIT compilation
+    out of the first real computation.
+
+    Parameters
+    ----------
+    dissimilarity: AbstractDissimilarity, optional
+        dissimilarity whose kernels are compiled. Defaults to the combined categorical dissimilarity
+        used by ``Continuum.compute_gamma``.
+    solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+        linear solver backend to load, as in ``Continuum.compute_gamma``.
+    """
+    from .dissimilarity import CombinedCategoricalDissimilarity
+    if dissimilarity is None:
+        dissimilarity = CombinedCategoricalDissimilarity()
+    categories = getattr(dissimilarity, "categories", None) or ("A", "B")
+    for nb_annotators in (3, 2):
+        continuum = Continuum()
+        for shift in range(nb_annotators):
+            for i, category in enumerate(categories[:2]):
+                continuum.add(f"annotator_{shift + 1}", Segment(10 * i + shift, 10 * i + shift + 5), category)
+        continuum.compute_gamma(dissimilarity, n_samples=2, solver=solver)
+        # The multithreaded enumeration is a kernel of its own
+        continuum.get_best_alignment(dissimilarity, solver, n_threads=2)
@@ -203,8 +203,10 @@ class CorpusShufflingTool:
                            self.SPLIT_FACTOR *
                            self._reference_continuum.avg_num_annotations_per_annotator)):
             for annotator in continuum.annotators:
-                units = continuum._annotations[annotator]
-                to_split = units.pop(numpy.random.randint(0, len(units)))
+                # The unit is picked by index, without a view of the units (which would make the removal copy them)
+                nb_units = len(continuum._annotations[annotator])
+                to_split = continuum[annotator, numpy.random.randint(0, nb_units)]
+                continuum.remove(annotator, to_split)
                 security = (to_split.segment.end - to_split.segment.start) * 0.01
                 cut = numpy.random.uniform(to_split.segment.start + security, to_split.segment.end)
 
@@ -0,0 +1,154 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2020-2021 CoML
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# AUTHORS
+# Rachid RIAD, Hadrien TITEUX, Léopold FAVRE
+"""
+##########
+Expected disorder cache
+##########
+
+Persistent cache of the disorders of random samples, shared by the continua whose samples are drawn
+from the same distribution.
+"""
+import hashlib
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional, Union, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .dissimilarity import AbstractDissimilarity
+    from .sampler import AbstractContinuumSampler
+
+
+class DisorderCache:
+    """
+    Disk-backed cache of the disorders of the random samples used to compute the expected disorder.
+
+    When samples are drawn from statistics of the reference continuum (as with the
+    ``StatisticalContinuumSampler``), the expected disorder only depends on these statistics and on the
+    dissimilarity : continua with (nearly) the same statistics can reuse each other's samples' disorders.
+    ``Continuum.compute_gamma`` takes the disorders cached for its statistics, only computes the samples
+    still needed to reach its number of samples (or its precision level), and adds them to the cache.
+
+    Entries are files of the cache's directory, which can be shared by several processes : the disorders added
+    to an entry are written in a new file, so that processes adding disorders to the same entry at the same time
+    don't overwrite each other's. Past ``max_size`` bytes, the least recently used files are removed.
+
+    Parameters
+    ----------
+    path: str or Path
+        directory of the cache, created if needed.
+    max_size: int, optional
+        maximum size of the cache's entries, in bytes. Defaults to 64 MB.
+    significant_digits: int, optional
+        number of significant digits of the statistics kept in the keys of the cache : continua whose
+        statistics are equal once rounded share their entry. Defaults to 2.
+    """
+    SUFFIX = ".npy"
+
+    def __init__(self, path: Union[str, Path], max_size: int = 2 ** 26, significant_digits: int = 2):
+        self.path = Path(path).expanduser()
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.significant_digits = significant_digits
+
+    def key(self,
+            sampler: 'AbstractContinuumSampler',
+            dissimilarity: 'AbstractDissimilarity',
+            alignment: str = "best") -> Optional[str]:
+        """
+        Returns the key of the samples' disorders of an initialized sampler, for the given dissimilarity and
+        kind of alignment ("best", "fast" or "soft"), or None if they can't be cached (because the samples
+        depend on the reference continuum itself, or because the dissimilarity has no compilation key).
+        Fast alignments also depend on the best window size of the reference continuum, which the samples
+        inherit.
+        """
+        sampler_key = sampler.statistics_key(self.significant_digits)
+        dissimilarity_key = dissimilarity._compilation_key
+        if sampler_key is None or dissimilarity_key is None:
+            return None
+        key = (sampler_key, dissimilarity_key, alignment)
+        if alignment == "fast":
+            key += (float(sampler._reference_continuum.best_window_size),)
+        return hashlib.sha256(repr(key).encode()).hexdigest()
+
+    def _entry_files(self, key: str) -> List[Path]:
+        # The files' names start with the time they were written at : sorting them keeps the order of the disorders
+        return sorted(self.path.glob(f"{key}-*{self.SUFFIX}"))
+
+    def get(self, key: str) -> np.ndarray:
+        """Returns the disorders cached for the given key, in the order they were added (an empty array if there
+        are none)."""
+        disorders = [np.zeros(0)]
+        for entry_file in self._entry_files(key):
+            try:
+                disorders.append(np.load(entry_file))
+                os.utime(entry_file)  # marks the file as recently used
+            except (OSError, ValueError):  # removed by another process (or unreadable)
+                continue
+        return np.concatenate(disorders)
+
+    def add(self, key: str, disorders: np.ndarray):
+        """Adds disorders to those cached for the given key, and evicts the least recently used files if
+        the cache is too big."""
+        entry_file = self.path / f"{key}-{time.time_ns():020d}-{uuid.uuid4().hex}{self.SUFFIX}"
+        # Written in a temporary file first, so that other processes never read a partial file
+        with tempfile.NamedTemporaryFile(dir=self.path, suffix=".tmp", delete=False) as file:
+            np.save(file, np.asarray(disorders, dtype=np.float64))
+        os.replace(file.name, entry_file)
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in self.path.glob("*" + self.SUFFIX):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+            size -= entry_size
+
+    def clear(self):
+        """Removes every entry of the cache."""
+        for entry in self.path.glob("*" + self.SUFFIX):
+            try:
+                entry.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        """Number of entries (i.e., of keys) of the cache."""
+        return len({entry_file.name.split("-", 1)[0] for entry_file in self.path.glob("*" + self.SUFFIX)})
@@ -29,22 +29,210 @@ Dissimilarity
 
 """
 import abc
+import logging
+import math
 import random
+import threading
 from abc import ABCMeta
+from collections import OrderedDict
+from contextlib import nullcontext
 from typing import Iterable
-from typing import TYPE_CHECKING, Tuple, Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional, NamedTuple, Hashable
 
 import numba as nb
 import numpy as np
 from sortedcontainers import SortedSet
 
-from .numba_utils import iter_tuples, extend_right_alignments, extend_right_disorders
+from .numba_utils import (index_dtype, matrices_offsets, append_row, SparseMatricesType,
+                          enumerate_valid_alignments, enumerate_valid_alignments_parallel)
 
 if TYPE_CHECKING:
     from .continuum import Continuum
     from .alignment import Alignment
 
-dissimilarity_dec = nb.njit(nb.float32(nb.float32[:], nb.float32[:]))
+# Dissimilarity functions are inlined in the kernels specialized for them (see `compile_kernels`)
+dissimilarity_dec = nb.njit(nb.float32(nb.float32[:], nb.float32[:]), inline="always")
+
+_parallel_lock = threading.Lock()
+_kernels_lock = threading.Lock()
+
+
+def _parallel_launch_lock():
+    """
+    Lock taken around the launches of the parallel kernels. Only numba's "workqueue" threading layer can't
+    be launched from concurrent python threads : with "tbb" or "omp", the jobs of a thread pool run
+    their parallel enumerations concurrently. The layer is only known once a parallel kernel has run,
+    so the launches are serialized until then.
+    """
+    try:
+        layer = nb.threading_layer()
+    except ValueError:
+        return _parallel_lock
+    return _parallel_lock if layer == "workqueue" else nullcontext()
+
+
+class DissimilarityKernels(NamedTuple):
+    precompute_matrices: Callable
+    compute_alignment_disorders: Callable
+
+
+def compile_kernels(d_mat: Callable[[np.ndarray, np.ndarray], float]) -> DissimilarityKernels:
+    """
+    Compiles the numba kernels that evaluate a dissimilarity function on many units at once. The dissimilarity
+    function is a compile-time constant of these kernels, so calls to it are direct (and inlined when it is
+    decorated with `dissimilarity_dec`), instead of going through a first-class function pointer.
+
+    - ``precompute_matrices(unit_arrays, criterium, reach)`` computes the dissimilarity matrices between the units
+      of each couple of annotators, keeping only the dissimilarities lower than the criterium, and returns them
+      in their sparse form (see `numba_utils.matrices_offsets`) along with the number of units of each annotator.
+      If ``reach`` is finite (see `AbstractDissimilarity.temporal_reach`), the dissimilarity is only evaluated
+      for the units whose start is within reach of each unit, found by a binary search in the sorted starts.
+    - ``compute_alignment_disorders(alignment_array, delta_empty)`` computes the disorder of each unitary
+      alignment of an alignment in matrix form.
+    """
+
+    @nb.njit(SparseMatricesType(nb.types.ListType(nb.float32[:, ::1]), nb.float64, nb.float64))
+    def precompute_matrices(unit_arrays: nb.typed.List, criterium: float, reach: float):
+        nb_annotators = len(unit_arrays)
+        sizes = np.empty(nb_annotators, dtype=np.int32)
+        for annotator_id in range(nb_annotators):
+            sizes[annotator_id] = len(unit_arrays[annotator_id])
+
+        # PRECOMPUTATION OF ALL INTER-ANNOTATOR COUPLES OF UNITS:
+        # This block computes the inter-annotator dissim matrices between units, one row at a time, and
+        # only stores the dissimilarities within the criterium, all matrices in a single CSR structure.
+        # Each row of a distance matrix holds the D[i,j] = dissim(AnnotatorA.Units[i], AnnotatorB.Units[j])
+        # of a unit i of annotator A. Empty units are implicit.
+        offsets, nb_rows = matrices_offsets(sizes)
+        indptr = np.zeros(nb_rows + 1, dtype=np.int64)
+        indices = np.empty(nb_rows, dtype=np.int32)
+        values = np.empty(nb_rows, dtype=np.float32)
+        for annotator_a in range(nb_annotators):
+            for annotator_b in range(annotator_a):
+                units_a, units_b = unit_arrays[annotator_a], unit_arrays[annotator_b]
+                nb_units_b = sizes[annotator_b]
+                # Columns of the units of B, sorted by their start
+                order_b = np.argsort(units_b[:, 0], kind="mergesort").astype(np.int32)
+                starts_b = units_b[order_b, 0]
+                is_sorted = True
+                for annot_b in range(nb_units_b):
+                    if order_b[annot_b] != annot_b:
+                        is_sorted = False
+                        break
+                max_duration_b = units_b[:, 2].max() if nb_units_b > 0 else 0.0
+                row_values = np.empty(nb_units_b, dtype=np.float32)
+                for annot_a in range(sizes[annotator_a]):
+                    unit_a = units_a[annot_a]
+                    first, last = 0, nb_units_b
+                    if reach < np.inf:
+                        # Maximal gap between unit a and a unit of B within reach, padded against rounding errors
+                        gap = max(reach * (unit_a[2] + max_duration_b) / 2, 0.0)
+                        gap += 1e-3 * (gap + unit_a[2] + max_duration_b) + 1e-6 * abs(unit_a[1])
+                        first = np.searchsorted(starts_b, unit_a[0] - gap - max_duration_b, side="left")
+                        last = np.searchsorted(starts_b, unit_a[1] + gap, side="right")
+                    row_columns = order_b[first:last] if is_sorted else np.sort(order_b[first:last])
+                    for entry in range(last - first):
+                        row_values[entry] = d_mat(unit_a, units_b[row_columns[entry]])
+                    row = offsets[annotator_a, annotator_b] + annot_a
+                    indices, values = append_row(indptr, indices, values, row, row_columns,
+                                                 row_values[:last - first], criterium)
+        nb_entries = indptr[nb_rows]
+        return indptr, indices[:nb_entries].copy(), values[:nb_entries].copy(), offsets, sizes
+
+    @nb.njit(nb.float32[:](nb.float32[:, :, ::1], nb.float32))
+    def compute_alignment_disorders(alignment_array: np.ndarray, delta_empty: float):
+        nb_alignments, nb_annotators, _ = alignment_array.shape
+        res = np.zeros(nb_alignments, dtype=np.float32)
+        c2n = nb_annotators * (nb_annotators - 1) // 2
+        for unitary_alignment_i in range(nb_alignments):
+            unitary_alignment = alignment_array[unitary_alignment_i]
+            for i in range(nb_annotators):
+                for j in range(i):
+                    if unitary_alignment[i, 3] == -1 or unitary_alignment[j, 3] == -1:
+                        res[unitary_alignment_i] += delta_empty
+                    else:
+                        res[unitary_alignment_i] += d_mat(unitary_alignment[i], unitary_alignment[j])
+        res /= c2n
+        return res
+
+    return DissimilarityKernels(precompute_matrices, compute_alignment_disorders)
+
+
+class CompiledDissimilarity:
+    """
+    A compiled dissimilarity function (see `AbstractDissimilarity.compile_d_mat`), along with the kernels
+    specialized for it, which are compiled at their first use. ``custom`` is set for a function that replaced
+    the one of `compile_d_mat` after the initialization of the dissimilarity.
+    """
+    def __init__(self, d_mat: Callable[[np.ndarray, np.ndarray], float], custom: bool = False):
+        self.d_mat = d_mat
+        self.custom = custom
+        self._kernels: Optional[DissimilarityKernels] = None
+
+    @property
+    def kernels(self) -> DissimilarityKernels:
+        if self._kernels is None:
+            with _kernels_lock:
+                if self._kernels is None:
+                    self._kernels = compile_kernels(self.d_mat)
+        return self._kernels
+
+
+class CompiledDissimilarityRegistry:
+    """
+    Process-wide registry of compiled dissimilarities, keyed by the parameters they were compiled with
+    (see `AbstractDissimilarity.compilation_key`). Dissimilarities created with the same parameters share
+    their compiled function and kernels, instead of compiling them (and checking them) again.
+
+    The registry is bounded : past `maxsize` entries, the least recently used one is evicted.
+
+    Parameters
+    ----------
+    maxsize: int
+        Maximum number of compiled dissimilarities kept. 0 disables the registry.
+    """
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, CompiledDissimilarity]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[CompiledDissimilarity]:
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return compiled
+
+    def put(self, key: Hashable, compiled: CompiledDissimilarity):
+        with self._lock:
+            self._entries[key] = compiled
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+compiled_dissimilarities = CompiledDissimilarityRegistry()
+
+
+def _defining_class(cls: type, attribute: str) -> type:
+    return next(klass for klass in cls.__mro__ if attribute in vars(klass))
 
 
 class AbstractDissimilarity(metaclass=ABCMeta):
@@ -67,8 +255,45 @@ class AbstractDissimilarity(metaclass=ABCMeta):
             raise ValueError("Cannot declare categorical dissimilarity with no categories.")
         self.categories = categories
 
-        self.d_mat: Callable[[np.ndarray, np.ndarray], float] = self.compile_d_mat()
-        self.check_if_dissim()
+        # A compilation key is only trusted if it was written along with (or after) the compile_d_mat it describes
+        key_owner = _defining_class(type(self), "compilation_key")
+        self._compilation_key = (self.compilation_key()
+                                 if issubclass(key_owner, _defining_class(type(self), "compile_d_mat"))
+                                 else None)
+        compiled = None
+        if self._compilation_key is not None:
+            compiled = compiled_dissimilarities.get(self._compilation_key)
+        if compiled is None:
+            compiled = CompiledDissimilarity(self.compile_d_mat())
+            self.d_mat = compiled.d_mat
+            self.check_if_dissim()
+            if self._compilation_key is not None:
+                compiled_dissimilarities.put(self._compilation_key, compiled)
+        self._compiled = compiled
+        self.d_mat: Callable[[np.ndarray, np.ndarray], float] = compiled.d_mat
+
+    def __getstate__(self):
+        # Compiled functions aren't pickled (unless d_mat was replaced after the initialization) : they are
+        # taken from the registry of the process they're unpickled in, or compiled again.
+        state = self.__dict__.copy()
+        del state["_compiled"]
+        if self.d_mat is self._compiled.d_mat and not self._compiled.custom:
+            del state["d_mat"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        compiled = None
+        if self._compilation_key is not None:
+            compiled = compiled_dissimilarities.get(self._compilation_key)
+        if compiled is None:
+            compiled = (CompiledDissimilarity(state["d_mat"], custom=True) if "d_mat" in state
+                        else CompiledDissimilarity(self.compile_d_mat()))
+            if self._compilation_key is not None and "d_mat" not in state:
+                compiled_dissimilarities.put(self._compilation_key, compiled)
+        self._compiled = compiled
+        if "d_mat" not in state:
+            self.d_mat = compiled.d_mat
 
     @abc.abstractmethod
     def compile_d_mat(self) -> Callable[[np.ndarray, np.ndarray], float]:
@@ -78,6 +303,31 @@ class AbstractDissimilarity(metaclass=ABCMeta):
         """
         raise NotImplemented()
 
+    def compilation_key(self) -> Optional[Hashable]:
+        """
+        Returns the parameters `compile_d_mat` compiles the dissimilarity function with, as a hashable key
+        (starting with the class of the dissimilarity). Dissimilarities with equal keys share their compiled
+        function and kernels (see `CompiledDissimilarityRegistry`).
+        Defaults to None, meaning that the dissimilarity is compiled again for each instance. A key given by a
+        parent class is ignored for subclasses that override `compile_d_mat`.
+        """
+        return None
+
+    @property
+    def _custom_d_mat(self) -> bool:
+        # Set if d_mat isn't the function of `compile_d_mat`, for which `temporal_reach` is given
+        return self._compiled.custom or self._compiled.d_mat is not self.d_mat
+
+    def temporal_reach(self, criterium: float) -> float:
+        """
+        Returns a factor :math:`k` such that two units separated by a gap :math:`g` (between the end of the
+        first one and the start of the second one) can only have a dissimilarity lower than ``criterium`` if
+        :math:`g \\leq k (d_1 + d_2) / 2`, where :math:`d_1` and :math:`d_2` are their durations. It is used to
+        only evaluate the dissimilarities between units that are close enough in time.
+        Defaults to infinity, i.e. every couple of units is evaluated.
+        """
+        return np.inf
+
     def check_if_dissim(self):
         nb_cat = 10000 if self.categories is None else len(self.categories)
         # random (not np.random) will be used to not mess up seeding.
@@ -114,18 +364,7 @@ class AbstractDissimilarity(metaclass=ABCMeta):
 
         assert categories.issuperset(continuum.categories)
 
-        unit_arrays = nb.typed.List()
-        for annotator_id, (annotator, units) in enumerate(continuum._annotations.items()):
-            # dim x : segment
-            # dim y : (start, end, dur, annotation)
-            unit_array = np.empty((len(units), 4), dtype=np.float32)
-            for unit_id, unit in enumerate(units):
-                unit_array[unit_id][0] = unit.segment.start
-                unit_array[unit_id][1] = unit.segment.end
-                unit_array[unit_id][2] = unit.segment.duration
-                unit_array[unit_id][3] = categories.index(unit.annotation)
-            unit_arrays.append(unit_array)
-        return unit_arrays
+        return continuum._unit_arrays(categories)
 
     def _build_arrays_alignment(self, alignment: 'Alignment') -> np.ndarray:
         """
@@ -157,102 +396,15 @@ class AbstractDissimilarity(metaclass=ABCMeta):
                     alignment_array[i, annotator_i] = np.array([-1, -1, -1, -1], dtype=np.float32)
         return alignment_array
 
-    @staticmethod
-    @nb.njit(nb.float32[:](nb.float32[:, :, ::1],
-                           nb.types.FunctionType(nb.float32(nb.float32[:],
-                                                            nb.float32[:])),
-                           nb.float32))
-    def _compute_alignment_disorders(alignment_array: np.ndarray,
-                                     d_mat: Callable[[np.ndarray, np.ndarray], float],
-                                     delta_empty: float):
+    @property
+    def kernels(self) -> 'DissimilarityKernels':
         """
-        Returns the array of the disorder of each unitary alignment of the provided
-        alignment (in matrix form) using given matrix-form disorder.
+        The numba kernels specialized for this dissimilarity (see `compile_kernels`). They are compiled at
+        their first use, and then shared by the dissimilarities compiled with the same parameters.
         """
-        nb_alignments, nb_annotators, _ = alignment_array.shape
-        res = np.zeros(nb_alignments, dtype=np.float32)
-        c2n = nb_annotators * (nb_annotators - 1) // 2
-        for unitary_alignment_i in range(nb_alignments):
-            unitary_alignment = alignment_array[unitary_alignment_i]
-            for i in range(nb_annotators):
-                for j in range(i):
-                    if unitary_alignment[i, 3] == -1 or unitary_alignment[j, 3] == -1:
-                        res[unitary_alignment_i] += delta_empty
-                    else:
-                        res[unitary_alignment_i] += d_mat(unitary_alignment[i], unitary_alignment[j])
-        res /= c2n
-        return res
-
-    @staticmethod
-    @nb.njit(nb.types.Tuple((nb.float32[:], nb.int16[:, :]))(nb.types.ListType(nb.float32[:, ::1]),
-                                                             nb.types.FunctionType(nb.float32(nb.float32[:],
-                                                                                   nb.float32[:])),
-                                                             nb.float32))
-    def _get_all_valid_alignments(unit_arrays: nb.typed.List,
-                                  d_mat: Callable[[np.ndarray, np.ndarray], float],
-                                  delta_empty: float) -> Tuple[np.ndarray, np.ndarray]:
-        chunk_size = 10000
-        nb_annotators = len(unit_arrays)
-        c2n = (nb_annotators * (nb_annotators - 1) // 2)
-        criterium = c2n * delta_empty * nb_annotators
-
-        sizes_with_null = np.empty(nb_annotators).astype(np.int16)
-        sizes = np.empty(nb_annotators).astype(np.int16)
-        for annotator_id in range(nb_annotators):
-            sizes[annotator_id] = len(unit_arrays[annotator_id])
-            sizes_with_null[annotator_id] = len(unit_arrays[annotator_id]) + 1
-
-        # PRECOMPUTATION OF ALL INTER-ANNOTATOR COUPLES OF UNITS:
-        # This block computes a nested list of lists of inter-annotator dissim matrix between units.
-        # Each distance matrix is a 2D array where
-        # D[i,j] = dissim(AnnotatorA.Units[i], AnnotatorB.Units[j])
-
-        # this is a list of lists of "placeholder" arrays as to play nice with numba
-        precomputation = nb.typed.List([nb.typed.List([np.empty((0, 0), dtype=np.float32)] * i)
-                                        for i in range(nb_annotators)])
-        for annotator_a in range(nb_annotators):
-            for annotator_b in range(annotator_a):
-                nb_annot_a, nb_annot_b = sizes[annotator_a], sizes[annotator_b]
-                matrix = np.empty((nb_annot_a + 1, nb_annot_b + 1), dtype=np.float32)  # +1 for empty units
-                for annot_a in range(nb_annot_a):
-                    for annot_b in range(nb_annot_b):
-                        matrix[annot_a, annot_b] = d_mat(unit_arrays[annotator_a][annot_a],
-                                                         unit_arrays[annotator_b][annot_b])
-                # Empty units are at index nb_annot_x, so matrix is filled with delta-empties.
-                for annot_b in range(nb_annot_b + 1):
-                    matrix[nb_annot_a, annot_b] = delta_empty
-                for annot_a in range(nb_annot_a + 1):
-                    matrix[annot_a, nb_annot_b] = delta_empty
-
-                # replacing "placeholder" array with the actual precomputation array
-                precomputation[annotator_a][annotator_b] = matrix
-
-        # Now, computing disorders for each potential alignments
-        disorders = np.empty(chunk_size, dtype=np.float32)
-        alignments = np.empty((chunk_size, nb_annotators), dtype=np.int16)
-        i_chosen = 0
-        for unitary_alignment in iter_tuples(sizes_with_null):
-            # for each tuple (corresponding to a unitary alignment), compute disorder
-            disorder = 0
-            for annot_a in range(nb_annotators):
-                for annot_b in range(annot_a):
-                    disorder += precomputation[annot_a][annot_b][unitary_alignment[annot_a],
-                                                                 unitary_alignment[annot_b]]
-            if disorder <= criterium:
-                disorders[i_chosen] = disorder
-                alignments[i_chosen] = unitary_alignment
-                i_chosen += 1
-                if i_chosen == chunk_size:
-                    # Increasing the size of the result array if full
-                    # (security, doesn't happen often since chunk size
-                    # is already decently high by default)
-                    add_size = chunk_size // 2
-                    disorders = extend_right_disorders(disorders, add_size)
-                    alignments = extend_right_alignments(alignments, add_size)
-                    chunk_size += add_size
-        disorders, alignments = disorders[:i_chosen - 1], alignments[:i_chosen - 1]  # removing empty unitary alignment
-        disorders /= c2n
-        return disorders, alignments
+        if self._compiled.d_mat is not self.d_mat:  # d_mat was replaced after the initialization
+            self._compiled = CompiledDissimilarity(self.d_mat, custom=True)
+        return self._compiled.kernels
 
     @abc.abstractmethod
     def d(self, unit1: 'Unit', unit2: 'Unit'):
@@ -261,22 +413,69 @@ class AbstractDissimilarity(metaclass=ABCMeta):
         """
         raise NotImplemented()
 
-    def valid_alignments(self, continuum: 'Continuum') -> Tuple[np.ndarray, np.ndarray]:
+    def valid_alignments(self,
+                         continuum: 'Continuum',
+                         return_counters: bool = False,
+                         n_threads: Optional[int] = None):
         """
         Returns all the unitary alignment (in matricial form), and their disorders that could
         potentially be in the best alignment of the continuum (based on the criterium detailed
         in section 5.1.1 of the gamma paper (https://aclanthology.org/J15-3003.pdf).
+        Unit indexes are stored as int16, or as int32 when an annotator has more than 32767 units. Only the
+        dissimilarities between units that are within reach of each other (lower than the criterium) are kept
+        in memory, so the memory used grows with the number of such couples of units rather than with the
+        product of the numbers of units of the annotators.
+
+        If ``return_counters`` is set, a dict counting the (partial) tuples of units that were
+        ``"visited"``, ``"pruned"`` and ``"emitted"`` during the enumeration is returned as well.
+
+        If ``n_threads`` is greater than 1, the enumeration is split between that many numba threads
+        (capped by ``numba.config.NUMBA_NUM_THREADS``). The output doesn't depend on the number of threads.
         """
         units_array = self._build_arrays_continuum(continuum)
-        res = self._get_all_valid_alignments(units_array, self.d_mat, self.delta_empty)
-        return res
+        nb_annotators = len(units_array)
+        c2n = nb_annotators * (nb_annotators - 1) // 2
+        criterium = float(c2n) * float(self.delta_empty) * nb_annotators
+        reach = np.inf if self._custom_d_mat else float(self.temporal_reach(criterium))
+        matrices = self.kernels.precompute_matrices(units_array, criterium, reach)
+        sizes = matrices[-1]
+        delta_empty = np.float32(self.delta_empty)
+        # Unit indexes are int16 unless an annotator has too many units for it
+        index_prototype = np.empty((0, 0), dtype=index_dtype(sizes))
+
+        # Now, computing disorders for each potential alignments, only walking through the tuples
+        # of units that are within reach of each other
+        if n_threads is None or n_threads <= 1:
+            disorders, alignments, counters = enumerate_valid_alignments(*matrices, delta_empty, criterium,
+                                                                         index_prototype)
+        else:
+            n_threads = min(n_threads, nb.config.NUMBA_NUM_THREADS)
+            # The number of threads is a thread-local setting of numba
+            previous_n_threads = nb.get_num_threads()
+            nb.set_num_threads(n_threads)
+            try:
+                with _parallel_launch_lock():
+                    # A few chunks per thread, for the load to be balanced when units aren't evenly spread
+                    disorders, alignments, counters = enumerate_valid_alignments_parallel(*matrices, delta_empty,
+                                                                                          criterium,
+                                                                                          index_prototype,
+                                                                                          4 * n_threads)
+            finally:
+                nb.set_num_threads(previous_n_threads)
+        disorders /= c2n
+        counters = dict(zip(("visited", "pruned", "emitted"), counters.tolist()))
+        logging.debug(f"Unitary alignments enumeration: {counters['visited']} tuples visited, "
+                      f"{counters['pruned']} pruned, {counters['emitted']} emitted.")
+        if return_counters:
+            return disorders, alignments, counters
+        return disorders, alignments
 
     def compute_disorder(self, alignment: 'Alignment') -> np.ndarray:
         """
         Returns the disorder of the given alignment.
         """
         alignment_arrays = self._build_arrays_alignment(alignment)
-        return self._compute_alignment_disorders(alignment_arrays, self.d_mat, self.delta_empty)
+        return self.kernels.compute_alignment_disorders(alignment_arrays, self.delta_empty)
 
 
 class PositionalSporadicDissimilarity(AbstractDissimilarity):
@@ -302,6 +501,15 @@ class PositionalSporadicDissimilarity(AbstractDissimilarity):
             return dist * dist * delta_empty
         return d_mat
 
+    def compilation_key(self) -> Hashable:
+        return type(self), self.delta_empty
+
+    def temporal_reach(self, criterium: float) -> float:
+        # Separated by a gap g, the units' positional dissimilarity is (1 + 2g / (d1 + d2))² * delta_empty
+        if self.delta_empty <= 0:
+            return np.inf
+        return math.sqrt(max(criterium, 0.0) / self.delta_empty) - 1
+
     def d(self, unit1: 'Unit', unit2: 'Unit'):
         pos = ((abs(unit1.segment.start - unit2.segment.start) + abs(unit1.segment.end - unit2.segment.end)) /
                (unit1.segment.duration + unit2.segment.duration))
@@ -329,6 +537,9 @@ class AbsoluteCategoricalDissimilarity(CategoricalDissimilarity):
             return (0 if unit1[3] == unit2[3] else 1) * delta_empty
         return d_mat
 
+    def compilation_key(self) -> Hashable:
+        return type(self), self.delta_empty
+
     def d(self, unit1: 'Unit', unit2: 'Unit'):
         return float(unit1.annotation != unit2.annotation) * self.delta_empty
 
@@ -353,6 +564,11 @@ class PrecomputedCategoricalDissimilarity(CategoricalDissimilarity):
             return matrix[np.int8(unit1[3]), np.int8(unit2[3])] * delta_empty
         return d_mat
 
+    def compilation_key(self) -> Hashable:
+        # The matrix is frozen in the compiled function : its content is part of the key, not its identity.
+        matrix = np.ascontiguousarray(self._matrix)
+        return type(self), self.delta_empty, matrix.dtype.str, matrix.shape, matrix.tobytes()
+
     def d(self, unit1: 'Unit', unit2: 'Unit'):
         return self._matrix[self.categories.index(unit1.annotation),
                             self.categories.index(unit2.annotation)] * self.delta_empty
@@ -393,7 +609,7 @@ class LevenshteinCategoricalDissimilarity(LambdaCategoricalDissimilarity):
         super().__init__(labels, delta_empty)
 
     @staticmethod
-    @nb.njit(nb.float32(nb.types.string, nb.types.string))
+    @nb.njit(nb.float32(nb.types.string, nb.types.string), cache=True)
     def levenshtein(str1: str, str2: str) -> float:
         n1, n2 = len(str1) + 1, len(str2) + 1
         matrix_lev = np.zeros((n1, n2), dtype=np.int16)
@@ -515,6 +731,21 @@ class CombinedCategoricalDissimilarity(AbstractDissimilarity):
                     beta * cat(unit1, unit2))
         return d_mat
 
+    def compilation_key(self) -> Optional[Hashable]:
+        pos_key = self.positional_dissim._compilation_key
+        cat_key = self.categorical_dissim._compilation_key
+        if pos_key is None or cat_key is None:
+            return None
+        # The types of the coefficients are part of the key, as they change the precision of the computation
+        return (type(self), type(self.alpha), self.alpha, type(self.beta), self.beta, self.delta_empty,
+                pos_key, cat_key)
+
+    def temporal_reach(self, criterium: float) -> float:
+        # Categorical dissimilarities are non-negative, so the positional one alone is bounded by the criterium
+        if self.alpha <= 0 or self.beta < 0 or self.positional_dissim._custom_d_mat:
+            return np.inf
+        return self.positional_dissim.temporal_reach(criterium / self.alpha)
+
     def d(self, unit1: 'Unit', unit2: 'Unit'):
         return (self.alpha * self.positional_dissim.d(unit1, unit2)
                 + self.beta * self.categorical_dissim.d(unit1, unit2))
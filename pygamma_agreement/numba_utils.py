@@ -25,9 +25,10 @@
 
 import numba as nb
 import numpy as np
+from scipy import sparse
 
 
-@nb.njit(nb.float32(nb.types.string, nb.types.string))
+@nb.njit(nb.float32(nb.types.string, nb.types.string), cache=True)
 def levenshtein(str1: str, str2: str):
     n1, n2 = len(str1) + 1, len(str2) + 1
     matrix_lev = np.empty((n1, n2), dtype=np.int16)
@@ -44,28 +45,14 @@ def levenshtein(str1: str, str2: str):
     return matrix_lev[-1, -1]
 
 
-@nb.njit(nb.int16[:, ::1](nb.int16[:, ::1], nb.int64))
-def extend_right_alignments(arr: np.ndarray, n: int):
-    i, j = arr.shape
-    new_array = np.empty((i + n, j), dtype=np.int16)
-    new_array[:i, :] = arr
-    return new_array
-
-
-@nb.njit(nb.float32[:](nb.float32[:], nb.int64))
-def extend_right_disorders(arr: np.ndarray, n: int):
-    new_array = np.empty(len(arr) + n, dtype=np.float32)
-    new_array[:len(arr)] = arr
-    return new_array
-
-
-@nb.njit()
+# Not cached : numba can't load generators from its on-disk cache
+@nb.njit
 def iter_tuples(sizes: np.ndarray):
     """
     Iterates over all the arrays of {0..sizes[0]-1} * {0..size[1]-1} * ... * {0..size[n-1]-1}
     """
     nb_annotators = len(sizes)
-    current = np.zeros(nb_annotators, dtype=np.int16)
+    current = np.zeros(nb_annotators, dtype=sizes.dtype)
     while True:
         yield current
         for i in range(nb_annotators):
@@ -77,24 +64,426 @@ def iter_tuples(sizes: np.ndarray):
             return
 
 
-@nb.njit(nb.float32[:, ::1](nb.int16[:, :],
-                            nb.int32[:]))
+# Units indexes of the possible unitary alignments are stored as int16 when every annotator has less
+# than 2^15 units (its empty unit, of index `size`, included), and as int32 otherwise.
+INDEX_TYPES = (nb.int16, nb.int32)
+
+
+def index_dtype(sizes: np.ndarray) -> np.dtype:
+    """
+    Smallest integer type (int16 or int32) that can hold the units indexes of the possible unitary
+    alignments of annotators with the given numbers of units.
+    """
+    if len(sizes) == 0 or np.max(sizes) <= np.iinfo(np.int16).max:
+        return np.dtype(np.int16)
+    return np.dtype(np.int32)
+
+
+def enumeration_type(index_type: nb.types.Integer):
+    return nb.types.Tuple((nb.float32[::1], index_type[:, ::1], nb.int64[::1]))
+
+
+# The inter-annotator dissimilarity matrices are sparse : only the dissimilarities lower than the criterium
+# (see `enumerate_valid_alignments`) can be part of a valid tuple, so they are the only ones kept. The matrices
+# of all the couples of annotators are stored in a single CSR structure (indptr, indices, values), whose rows
+# are laid out by `matrices_offsets`.
+SparseMatricesType = nb.types.Tuple((nb.int64[::1], nb.int32[::1], nb.float32[::1], nb.int64[:, ::1],
+                                     nb.int32[::1]))
+
+
+@nb.njit(nb.types.Tuple((nb.int64[:, ::1], nb.int64))(nb.int32[:]), cache=True)
+def matrices_offsets(sizes: np.ndarray):
+    """
+    Layout of the rows of the sparse inter-annotator dissimilarity matrices in a single CSR structure : the
+    row of unit i of annotator a in the matrix of annotators (a, b), with b < a, is the row offsets[a, b] + i.
+    Returns the offsets and the total number of rows. Empty units have no row nor column, their
+    dissimilarities being always delta_empty.
+    """
+    nb_annotators = len(sizes)
+    offsets = np.zeros((nb_annotators, nb_annotators), dtype=np.int64)
+    nb_rows = 0
+    for annotator_a in range(nb_annotators):
+        for annotator_b in range(annotator_a):
+            offsets[annotator_a, annotator_b] = nb_rows
+            nb_rows += sizes[annotator_a]
+    return offsets, nb_rows
+
+
+@nb.njit(nb.types.Tuple((nb.int32[::1], nb.float32[::1]))(nb.int64[::1], nb.int32[::1], nb.float32[::1],
+                                                          nb.int64, nb.int32[::1], nb.float32[::1], nb.float64),
+         cache=True)
+def append_row(indptr: np.ndarray, indices: np.ndarray, values: np.ndarray,
+               row: int, row_columns: np.ndarray, row_values: np.ndarray, criterium: float):
+    """
+    Appends to a CSR structure the entries of one of its rows that are lower than the criterium, given as
+    their (increasing) columns and their values. Rows must be appended in order. Returns the indices and
+    values, that are reallocated (with twice their capacity) when they are full.
+    """
+    start = indptr[row]
+    nb_kept = 0
+    for entry in range(len(row_values)):
+        if row_values[entry] <= criterium:
+            nb_kept += 1
+    if start + nb_kept > len(indices):
+        capacity = max(2 * len(indices), start + nb_kept)
+        new_indices = np.empty(capacity, dtype=np.int32)
+        new_values = np.empty(capacity, dtype=np.float32)
+        new_indices[:start] = indices[:start]
+        new_values[:start] = values[:start]
+        indices, values = new_indices, new_values
+    k = start
+    for entry in range(len(row_values)):
+        if row_values[entry] <= criterium:
+            indices[k] = row_columns[entry]
+            values[k] = row_values[entry]
+            k += 1
+    indptr[row + 1] = k
+    return indices, values
+
+
+@nb.njit(nb.float64(nb.int64[::1], nb.int32[::1], nb.float32[::1], nb.int64[:, ::1], nb.int32[::1],
+                    nb.float32, nb.int64, nb.int64, nb.int64, nb.int64), cache=True)
+def get_dissimilarity(indptr: np.ndarray, indices: np.ndarray, values: np.ndarray,
+                      offsets: np.ndarray, sizes: np.ndarray, delta_empty: float,
+                      annotator_a: int, annotator_b: int, unit_a: int, unit_b: int):
+    """
+    Dissimilarity between unit_a of annotator a and unit_b of annotator b (with b < a) in the sparse matrices
+    (see `matrices_offsets`) : delta_empty if one of them is empty, and infinity if it wasn't kept (because
+    it is greater than the criterium).
+    """
+    if unit_a == sizes[annotator_a] or unit_b == sizes[annotator_b]:
+        return delta_empty
+    row = offsets[annotator_a, annotator_b] + unit_a
+    low, high = indptr[row], indptr[row + 1]
+    while low < high:
+        middle = (low + high) // 2
+        if indices[middle] < unit_b:
+            low = middle + 1
+        else:
+            high = middle
+    if low < indptr[row + 1] and indices[low] == unit_b:
+        return values[low]
+    return np.inf
+
+
+@nb.njit([nb.int64[::1](nb.int64[::1], nb.int32[::1], nb.float32[::1], nb.int64[:, ::1], nb.int32[::1],
+                        nb.float32, nb.float64, nb.int64, nb.int64, nb.float32[::1], index_type[:, ::1],
+                        nb.boolean)
+          for index_type in INDEX_TYPES], cache=True)
+def enumerate_subtrees(indptr: np.ndarray,
+                       indices: np.ndarray,
+                       values: np.ndarray,
+                       offsets: np.ndarray,
+                       sizes: np.ndarray,
+                       delta_empty: float,
+                       criterium: float,
+                       first_start: int,
+                       first_stop: int,
+                       disorders: np.ndarray,
+                       alignments: np.ndarray,
+                       fill: bool):
+    """
+    Depth-first enumeration (see `enumerate_valid_alignments`) of the valid tuples whose unit of the last
+    annotator is in [first_start, first_stop), the index sizes[-1] standing for its empty unit.
+
+    The inter-annotator dissimilarity matrices are given in their sparse form (see `matrices_offsets`).
+    If `fill` is set, the tuples and their sums of dissimilarities are written in `alignments` and
+    `disorders`, that must be exactly sized (from a first, counting only, call). Returns the number of
+    (partial) tuples that were visited, pruned and emitted.
+    """
+    nb_annotators = len(sizes)
+    i_chosen = 0
+    counters = np.zeros(3, dtype=np.int64)
+
+    # Annotators are chosen from the last to the first, and for each depth :
+    # - anchors[depth] is the annotator whose row of the sparse matrices gives the candidates (-1 if every
+    #   candidate is)
+    # - partials[depth] is the sum of the dissimilarities between the units chosen so far
+    # - positions[depth] is the next candidate, ends[depth] the position of the empty unit (the last one)
+    #   and stops[depth] the last candidate (ends[depth], except for the range of the last annotator's units)
+    current = np.empty(nb_annotators, dtype=alignments.dtype)
+    anchors = np.empty(nb_annotators, dtype=np.int64)
+    partials = np.empty(nb_annotators, dtype=np.float64)
+    positions = np.empty(nb_annotators, dtype=np.int64)
+    ends = np.empty(nb_annotators, dtype=np.int64)
+    stops = np.empty(nb_annotators, dtype=np.int64)
+    depth = 0
+    anchors[0], positions[0], ends[0], stops[0] = -1, first_start, sizes[nb_annotators - 1], first_stop - 1
+    while depth >= 0:
+        annotator_b = nb_annotators - 1 - depth
+        if positions[depth] > stops[depth]:
+            depth -= 1
+            continue
+        anchor = anchors[depth]
+        if positions[depth] == ends[depth]:
+            unit_b = sizes[annotator_b]  # empty unit
+        elif anchor == -1:
+            unit_b = positions[depth]
+        else:
+            unit_b = indices[positions[depth]]
+        positions[depth] += 1
+
+        # Running sum of the dissimilarities between the candidate and the units already chosen : since
+        # they are all non-negative, exceeding the criterium discards every tuple that would extend it.
+        partial = 0.0 if depth == 0 else partials[depth - 1]
+        for annotator_a in range(annotator_b + 1, nb_annotators):
+            partial += get_dissimilarity(indptr, indices, values, offsets, sizes, delta_empty,
+                                         annotator_a, annotator_b, current[annotator_a], unit_b)
+        counters[0] += 1
+        if partial > criterium:
+            counters[1] += 1
+            continue
+        partials[depth] = partial
+        current[annotator_b] = unit_b
+
+        if annotator_b > 0:
+            # Going deeper : the candidates for the next annotator are the units within reach of the
+            # non-empty chosen unit that has the fewest of them.
+            depth += 1
+            next_annotator = annotator_b - 1
+            anchors[depth], positions[depth], ends[depth] = -1, 0, sizes[next_annotator]
+            for annotator_a in range(annotator_b, nb_annotators):
+                unit_a = current[annotator_a]
+                if unit_a == sizes[annotator_a]:
+                    continue
+                start = indptr[offsets[annotator_a, next_annotator] + unit_a]
+                end = indptr[offsets[annotator_a, next_annotator] + unit_a + 1]
+                if anchors[depth] == -1 or end - start < ends[depth] - positions[depth]:
+                    anchors[depth], positions[depth], ends[depth] = annotator_a, start, end
+            stops[depth] = ends[depth]
+            continue
+
+        # Complete tuple : computing its disorder (in the same order as the other disorder computations,
+        # for the float32 rounding to match them)
+        disorder = 0.0
+        all_empty = True
+        for annot_a in range(nb_annotators):
+            if current[annot_a] != sizes[annot_a]:
+                all_empty = False
+            for annot_b in range(annot_a):
+                disorder += get_dissimilarity(indptr, indices, values, offsets, sizes, delta_empty,
+                                              annot_a, annot_b, current[annot_a], current[annot_b])
+        if all_empty or disorder > criterium:
+            continue
+        if fill:
+            disorders[i_chosen] = disorder
+            alignments[i_chosen] = current
+        i_chosen += 1
+    counters[2] = i_chosen
+    return counters
+
+
+@nb.njit([enumeration_type(index_type)(nb.int64[::1], nb.int32[::1], nb.float32[::1], nb.int64[:, ::1],
+                                       nb.int32[::1], nb.float32, nb.float64, index_type[:, ::1])
+          for index_type in INDEX_TYPES], cache=True)
+def enumerate_valid_alignments(indptr: np.ndarray,
+                               indices: np.ndarray,
+                               values: np.ndarray,
+                               offsets: np.ndarray,
+                               sizes: np.ndarray,
+                               delta_empty: float,
+                               criterium: float,
+                               index_prototype: np.ndarray):
+    """
+    Enumerates every tuple of units (one per annotator, possibly empty) whose sum of inter-annotator
+    dissimilarities is lower than the criterium, along with that sum.
+
+    Since all dissimilarities are non-negative, every pair of units of such a tuple must itself be within
+    reach, i.e. in the sparse dissimilarity matrices. Tuples are thus built annotator by annotator
+    (depth-first), each one only being extended with the units in the row of an already chosen unit, instead
+    of walking the full cartesian product. The sum of the dissimilarities between the units chosen so far
+    is kept along the way, and a partial tuple whose sum already exceeds the criterium is cut along with
+    all of its extensions.
+
+    Tuples are returned in the same order as `iter_tuples` (the first annotator's index varying the fastest),
+    and the tuple made of empty units only is left out.
+
+    Parameters
+    ----------
+    indptr, indices, values, offsets:
+        the sparse dissimilarity matrices between the units of annotators a and b (for b < a), holding the
+        dissimilarities lower than the criterium, laid out as described in `matrices_offsets`.
+    sizes:
+        number of units of each annotator
+    delta_empty:
+        dissimilarity between any unit and an empty unit
+    criterium:
+        maximum sum of dissimilarities of a tuple
+    index_prototype:
+        empty array of shape (0, 0), whose type (see `index_dtype`) is the one of the returned tuples
+
+    Returns
+    -------
+    disorders, alignments, counters:
+        the sums of dissimilarities (float32), the tuples, and the number of (partial) tuples that
+        were visited, pruned and emitted.
+    """
+    # The enumeration is run twice : a first time to count the valid tuples, and a second time to write them
+    # in exactly sized arrays.
+    counters = enumerate_subtrees(indptr, indices, values, offsets, sizes, delta_empty, criterium,
+                                  0, sizes[-1] + 1,
+                                  np.empty(0, dtype=np.float32), index_prototype, False)
+    disorders = np.empty(counters[2], dtype=np.float32)
+    alignments = np.empty((counters[2], len(sizes)), dtype=index_prototype.dtype)
+    enumerate_subtrees(indptr, indices, values, offsets, sizes, delta_empty, criterium,
+                       0, sizes[-1] + 1, disorders, alignments, True)
+    return disorders, alignments, counters
+
+
+@nb.njit([enumeration_type(index_type)(nb.int64[::1], nb.int32[::1], nb.float32[::1], nb.int64[:, ::1],
+                                       nb.int32[::1], nb.float32, nb.float64, index_type[:, ::1], nb.int64)
+          for index_type in INDEX_TYPES],
+         parallel=True, cache=True)
+def enumerate_valid_alignments_parallel(indptr: np.ndarray,
+                                        indices: np.ndarray,
+                                        values: np.ndarray,
+                                        offsets: np.ndarray,
+                                        sizes: np.ndarray,
+                                        delta_empty: float,
+                                        criterium: float,
+                                        index_prototype: np.ndarray,
+                                        nb_chunks: int):
+    """
+    Parallel version of `enumerate_valid_alignments`, with the same output. The units of the last
+    annotator are split in `nb_chunks` contiguous ranges, whose subtrees are enumerated concurrently.
+    Each range's tuples are counted, and then written in their own slice of the output.
+    """
+    nb_annotators = len(sizes)
+    nb_first = sizes[-1] + 1
+    nb_chunks = max(1, min(nb_chunks, nb_first))
+    chunks_counters = np.zeros((nb_chunks, 3), dtype=np.int64)
+    for chunk in nb.prange(nb_chunks):
+        chunks_counters[chunk] = enumerate_subtrees(indptr, indices, values, offsets, sizes, delta_empty,
+                                                    criterium,
+                                                    chunk * nb_first // nb_chunks,
+                                                    (chunk + 1) * nb_first // nb_chunks,
+                                                    np.empty(0, dtype=np.float32),
+                                                    index_prototype,
+                                                    False)
+    chunks_offsets = np.zeros(nb_chunks + 1, dtype=np.int64)
+    chunks_offsets[1:] = np.cumsum(chunks_counters[:, 2])
+
+    disorders = np.empty(chunks_offsets[-1], dtype=np.float32)
+    alignments = np.empty((chunks_offsets[-1], nb_annotators), dtype=index_prototype.dtype)
+    for chunk in nb.prange(nb_chunks):
+        enumerate_subtrees(indptr, indices, values, offsets, sizes, delta_empty, criterium,
+                           chunk * nb_first // nb_chunks,
+                           (chunk + 1) * nb_first // nb_chunks,
+                           disorders[chunks_offsets[chunk]:chunks_offsets[chunk + 1]],
+                           alignments[chunks_offsets[chunk]:chunks_offsets[chunk + 1]],
+                           True)
+    return disorders, alignments, chunks_counters.sum(axis=0)
+
+
+@nb.njit([nb.types.Tuple((nb.int64[::1], nb.int32[::1]))(index_type[:, :], nb.int32[:])
+          for index_type in INDEX_TYPES], cache=True)
+def build_A_csc(possible_unitary_alignments: np.ndarray,
+                sizes: np.ndarray):
+    """
+    Builds the index arrays (indptr, indices) of the constraints matrix in CSC format.
+    Column p of the matrix has a 1 on the row of each non-null unit of the p-th possible unitary
+    alignment, rows being the units of every annotator, one after the other.
+    """
+    n, nb_annotators = possible_unitary_alignments.shape
+    annotator_units_start = np.zeros(nb_annotators, dtype=np.int32)
+    for annotator_id in range(1, nb_annotators):
+        annotator_units_start[annotator_id] = annotator_units_start[annotator_id - 1] + sizes[annotator_id - 1]
+
+    # First pass : number of non-null units in each column
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    for p_id in range(n):
+        nnz = 0
+        for annotator_id in range(nb_annotators):
+            if possible_unitary_alignments[p_id, annotator_id] != sizes[annotator_id]:  # Non-null unit
+                nnz += 1
+        indptr[p_id + 1] = indptr[p_id] + nnz
+
+    # Second pass : row indexes of the non-null units
+    indices = np.empty(indptr[n], dtype=np.int32)
+    for p_id in range(n):
+        k = indptr[p_id]
+        for annotator_id in range(nb_annotators):
+            unit_id = possible_unitary_alignments[p_id, annotator_id]
+            if unit_id != sizes[annotator_id]:
+                indices[k] = annotator_units_start[annotator_id] + unit_id
+                k += 1
+    return indptr, indices
+
+
 def build_A(possible_unitary_alignments: np.ndarray,
-            sizes: np.ndarray):
-    nb_units = np.sum(sizes)
-    n = len(possible_unitary_alignments)
-    A = np.zeros((nb_units, n), dtype=np.float32)
-    for p_id, unit_ids_tuple in enumerate(possible_unitary_alignments):
-        annotator_units_start = 0
-        for annotator_id, unit_id in enumerate(unit_ids_tuple):
+            sizes: np.ndarray) -> sparse.csc_matrix:
+    """
+    Builds the (sparse) constraints matrix of the best alignment linear program, of shape
+    (nb_units, nb_possible_unitary_alignments): A[u, p] is 1 if unit u is in the p-th possible
+    unitary alignment. Memory usage is proportional to the number of non-null units in the
+    possible unitary alignments, instead of nb_units * nb_possible_unitary_alignments.
+    """
+    indptr, indices = build_A_csc(possible_unitary_alignments, sizes)
+    data = np.ones(len(indices), dtype=np.float32)
+    return sparse.csc_matrix((data, indices, indptr),
+                             shape=(int(np.sum(sizes)), len(possible_unitary_alignments)))
+
+
+@nb.njit([nb.types.Tuple((nb.int32[::1], nb.int32[::1], nb.int64))(index_type[:, :], nb.int32[:], nb.int64[:])
+          for index_type in INDEX_TYPES], cache=True)
+def split_components(possible_unitary_alignments: np.ndarray,
+                     sizes: np.ndarray,
+                     units_ranks: np.ndarray):
+    """
+    Splits the best alignment problem into independent components, i.e. groups of units such that
+    no possible unitary alignment contains units from two different groups.
+
+    The units (in the same order as the rows of the constraints matrix) are swept in the order given by
+    `units_ranks` (typically, their rank when sorted by start time). Each possible unitary alignment links
+    the interval of ranks spanned by its units, and a cut is made wherever no link goes over.
+
+    Returns
+    -------
+    (alignments_components, units_components, nb_components):
+        The component of each possible unitary alignment, the component of each unit, and the number
+        of components. Components are numbered in increasing rank order.
+    """
+    n, nb_annotators = possible_unitary_alignments.shape
+    nb_units = len(units_ranks)
+    annotator_units_start = np.zeros(nb_annotators, dtype=np.int64)
+    for annotator_id in range(1, nb_annotators):
+        annotator_units_start[annotator_id] = annotator_units_start[annotator_id - 1] + sizes[annotator_id - 1]
+
+    # reach[r] : rightmost rank linked to rank r by a possible unitary alignment starting at r
+    reach = np.arange(nb_units)
+    lowest_ranks = np.empty(n, dtype=np.int64)
+    for p_id in range(n):
+        lowest, highest = nb_units, -1
+        for annotator_id in range(nb_annotators):
+            unit_id = possible_unitary_alignments[p_id, annotator_id]
             if unit_id != sizes[annotator_id]:  # Non-null unit
-                A[annotator_units_start + unit_id, p_id] = 1
-            annotator_units_start += sizes[annotator_id]
-    return A
+                rank = units_ranks[annotator_units_start[annotator_id] + unit_id]
+                lowest = min(lowest, rank)
+                highest = max(highest, rank)
+        lowest_ranks[p_id] = lowest
+        reach[lowest] = max(reach[lowest], highest)
+
+    # Sweep : a component ends when no rank before can reach further
+    ranks_components = np.empty(nb_units, dtype=np.int32)
+    component = 0
+    rightmost = -1
+    for rank in range(nb_units):
+        ranks_components[rank] = component
+        rightmost = max(rightmost, reach[rank])
+        if rightmost == rank:
+            component += 1
+
+    alignments_components = np.empty(n, dtype=np.int32)
+    for p_id in range(n):
+        alignments_components[p_id] = ranks_components[lowest_ranks[p_id]]
+    units_components = np.empty(nb_units, dtype=np.int32)
+    for unit in range(nb_units):
+        units_components[unit] = ranks_components[units_ranks[unit]]
+    return alignments_components, units_components, component
 
 
 @nb.njit(nb.float32[:, ::1](nb.int32,
-                            nb.int32[:]))
+                            nb.int32[:]), cache=True)
 def build_K(nb_units: int, sizes: np.ndarray):
     nb_annotators = len(sizes)
 
@@ -24,7 +24,7 @@
 # Rachid RIAD, Hadrien TITEUX, Léopold FAVRE
 
 from abc import ABCMeta, abstractmethod
-from typing import Optional, Iterable, List
+from typing import Optional, Iterable, List, Tuple
 
 import numpy as np
 import pyannote.core.segment
@@ -32,6 +32,8 @@ from pyannote.core import Segment
 from sortedcontainers import SortedSet
 from typing_extensions import Literal
 
+from .array_continuum import (ArrayContinuum, ContinuumArrays,
+                              annotations_arrays, coded_units_arrays, used_codes)
 from .continuum import Continuum, Annotator
 
 PivotType = Literal["float_pivot", "int_pivot"]
@@ -91,6 +93,29 @@ class AbstractContinuumSampler(metaclass=ABCMeta):
         """
         pass
 
+    def sample(self, rng: Optional[np.random.Generator] = None) -> Continuum:
+        """
+        Returns a shuffled continuum based on the reference, drawn with the given random generator.
+        Used by ``Continuum.compute_gamma``, which gives each sample its own generator so that samples
+        can be drawn in parallel, and reproducibly.
+
+        Samplers that don't override this method ignore ``rng`` and return ``sample_from_continuum``.
+
+        Parameters
+        ----------
+        rng: np.random.Generator, optional
+            source of the random draws of the sample. If not set, numpy's global random state is used.
+        """
+        return self.sample_from_continuum
+
+    def statistics_key(self, significant_digits: int = 2) -> Optional[tuple]:
+        """
+        Returns the parameters of the distribution the samples are drawn from, with floats rounded to the given
+        number of significant digits, if they determine it (see ``DisorderCache``). Defaults to None, meaning that
+        the samples depend on the reference continuum itself.
+        """
+        return None
+
 
 class ShuffleContinuumSampler(AbstractContinuumSampler):
     """
@@ -117,77 +142,89 @@ class ShuffleContinuumSampler(AbstractContinuumSampler):
             the set of annotators (from the reference) that will be considered for sampling
         """
         super().init_sampling(reference_continuum, ground_truth_annotators)
+        # Samples are built from the units of the reference in columnar form
+        if isinstance(reference_continuum, ArrayContinuum):
+            self._reference_arrays = reference_continuum.arrays
+        else:
+            self._reference_arrays = annotations_arrays(reference_continuum._annotations,
+                                                        reference_continuum.categories)
+        self._reference_categories = list(reference_continuum.categories)
+        self._annotators_indexes = np.array([self._reference_arrays.annotators.index(annotator)
+                                             for annotator in self._ground_truth_annotators], dtype=np.int64)
 
     @staticmethod
-    def _remove_pivot_segment(pivot: float, segments: List[Segment], dist: float) -> List[Segment]:
+    def _remove_pivot_segment(pivot: float, lows: np.ndarray, highs: np.ndarray,
+                              dist: float) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Returns a copy of the given list of segments, minus the segment delimited by [pivot - dist, pivot + dist].
+        Returns the given intervals (as arrays of their bounds), minus the interval [pivot - dist, pivot + dist].
         """
-        new_segments = []
-        while len(segments) > 0:
-            segment = segments.pop()
-            if segment.start >= pivot - dist:
-                if segment.end <= pivot + dist:
-                    continue
-                else:
-                    new_segments.append(Segment(pivot + dist, segment.end))
-            else:
-                if segment.end > pivot + dist:
-                    new_segments.append(Segment(segment.start, pivot - dist))
-                    new_segments.append(Segment(pivot + dist, segment.end))
-                else:
-                    new_segments.append(Segment(segment.start, pivot - dist))
-        return new_segments
+        left_highs = np.minimum(highs, pivot - dist)
+        right_lows = np.maximum(lows, pivot + dist)
+        left, right = lows < left_highs, right_lows < highs
+        return (np.concatenate((lows[left], right_lows[right])),
+                np.concatenate((left_highs[left], highs[right])))
 
-    def _random_from_segments(self, segments: List[Segment]) -> float:
+    def _random_from_segments(self, lows: np.ndarray, highs: np.ndarray, fraction: float) -> float:
         """
-        Returns a random value from the provided list of segments, by randomly choosing
-        a segment (weighted by its length) and then using uniform distribution in it.
+        Returns the value at the given fraction (between 0 and 1) of the total length of the given intervals,
+        which is uniformly distributed in them if the fraction is. Truncated to an integer with 'int_pivot'.
         """
-        segments = np.array(segments)
-        weights = np.array(list(segment.end - segment.start for segment in segments))
-        weights /= np.sum(weights)
-        try:
-            segment = np.random.choice(np.array(segments), p=weights)
-        except ValueError:
-            return 1
+        cumulated_lengths = np.cumsum(highs - lows)
+        position = fraction * cumulated_lengths[-1]
+        idx = min(int(np.searchsorted(cumulated_lengths, position, side="right")), len(lows) - 1)
+        pivot = highs[idx] - (cumulated_lengths[idx] - position)
         if self._pivot_type == 'int_pivot':
-            return int(np.random.uniform(segment.start, segment.end))
-        else:
-            return np.random.uniform(segment.start, segment.end)
+            return int(pivot)
+        return float(pivot)
 
     @property
     def sample_from_continuum(self) -> Continuum:
+        return self.sample()
+
+    def sample(self, rng: Optional[np.random.Generator] = None) -> ArrayContinuum:
         self._has_been_init()
+        if rng is None:
+            rng = np.random
         assert self._pivot_type in ('float_pivot', 'int_pivot')
         continuum = self._reference_continuum
+        arrays = self._reference_arrays
         min_dist_between_pivots = continuum.avg_length_unit / 2
         bound_inf, bound_sup = continuum.bounds
-        new_continuum = continuum.copy_flush()
-        annotators = self._ground_truth_annotators
-        while not new_continuum:  # Simple check to prevent returning an empty continuum.
-            segments_available = [Segment(bound_inf, bound_sup)]
-            for idx in range(len(annotators)):
-                if len(segments_available) != 0:
-                    pivot: float = self._random_from_segments(segments_available)
-                    segments_available = self._remove_pivot_segment(pivot, segments_available, min_dist_between_pivots)
+        nb_annotators = len(self._ground_truth_annotators)
+        new_annotators = [f'Sampled_annotation {idx}' for idx in range(nb_annotators)]
+        # Codes of the new annotators in the (alphabetical) order of their names
+        new_annotators_codes = np.argsort(np.argsort(new_annotators, kind="stable"))
+        while True:  # Simple check to prevent returning an empty continuum.
+            # Random variables of all the pivots and annotators are drawn at once
+            fractions = rng.uniform(0, 1, size=nb_annotators)
+            shuffled = rng.choice(self._annotators_indexes, size=nb_annotators)
+            lows, highs = np.array([bound_inf]), np.array([bound_sup])
+            annotator_codes, starts, ends, category_codes = [], [], [], []
+            for idx in range(nb_annotators):
+                if len(lows) != 0:
+                    pivot = self._random_from_segments(lows, highs, fractions[idx])
+                    lows, highs = self._remove_pivot_segment(pivot, lows, highs, min_dist_between_pivots)
                 else:
-                    pivot = np.random.uniform(bound_inf, bound_sup)
-                rnd_annotator = np.random.choice(annotators)
-                new_annotator = f'Sampled_annotation {idx}'
-                new_continuum.add_annotator(new_annotator)
-                for unit in continuum.iter_annotator(rnd_annotator):
-                    if unit.segment.start + pivot > bound_sup:
-                        new_continuum.add(new_annotator,
-                                          Segment(unit.segment.start + pivot + bound_inf - bound_sup,
-                                                  unit.segment.end + pivot + bound_inf - bound_sup),
-                                          unit.annotation)
-                    else:
-                        new_continuum.add(new_annotator,
-                                          Segment(unit.segment.start + pivot,
-                                                  unit.segment.end + pivot),
-                                          unit.annotation)
-
+                    pivot = bound_inf + fractions[idx] * (bound_sup - bound_inf)
+                # The units of the chosen annotator are shifted by the pivot, and wrapped around the bounds
+                units = slice(arrays.indptr[shuffled[idx]], arrays.indptr[shuffled[idx] + 1])
+                shifts = np.where(arrays.starts[units] + pivot > bound_sup, pivot + bound_inf - bound_sup, pivot)
+                starts.append(arrays.starts[units] + shifts)
+                ends.append(arrays.ends[units] + shifts)
+                category_codes.append(arrays.category_codes[units])
+                annotator_codes.append(np.full(len(shifts), new_annotators_codes[idx], dtype=np.int64))
+            if sum(len(annotator_starts) for annotator_starts in starts) > 0:
+                break
+
+        category_names, category_codes = used_codes(self._reference_categories, np.concatenate(category_codes))
+        new_arrays, new_categories = coded_units_arrays(sorted(new_annotators), np.concatenate(annotator_codes),
+                                                        np.concatenate(starts), np.concatenate(ends),
+                                                        category_names, category_codes,
+                                                        discard_invalid_rows=False)
+        new_continuum = ArrayContinuum(continuum.uri)
+        new_continuum._set_arrays(new_arrays, new_categories)
+        new_continuum.bound_inf, new_continuum.bound_sup = continuum.bound_inf, continuum.bound_sup
+        new_continuum.best_window_size = continuum.best_window_size
         return new_continuum
 
 
@@ -297,6 +334,20 @@ class StatisticalContinuumSampler(AbstractContinuumSampler):
         self._avg_unit_duration = avg_duration
         self._std_unit_duration = std_duration
 
+    def statistics_key(self, significant_digits: int = 2) -> tuple:
+        self._has_been_init()
+
+        def rounded(value: float) -> float:
+            return float(f"{value:.{significant_digits}g}")
+
+        return (type(self).__name__,
+                len(self._ground_truth_annotators),
+                rounded(self._avg_nb_units_per_annotator), rounded(self._std_nb_units_per_annotator),
+                rounded(self._avg_gap), rounded(self._std_gap),
+                rounded(self._avg_unit_duration), rounded(self._std_unit_duration),
+                tuple(self._categories.tolist()),
+                None if self._categories_weight is None else tuple(map(rounded, self._categories_weight)))
+
     def init_sampling(self, reference_continuum: Continuum,
                       ground_truth_annotators: Optional[Iterable['Annotator']] = None):
         """
@@ -317,26 +368,110 @@ class StatisticalContinuumSampler(AbstractContinuumSampler):
 
     @property
     def sample_from_continuum(self) -> Continuum:
+        return self.sample()
+
+    def sample(self, rng: Optional[np.random.Generator] = None) -> Continuum:
         self._has_been_init()
+        if rng is None:
+            rng = np.random
         new_continnum = self._reference_continuum.copy_flush()
         for annotator in self._ground_truth_annotators:
             new_continnum.add_annotator(annotator)
             last_point = 0
-            nb_units = abs(int(np.random.normal(self._avg_nb_units_per_annotator, self._std_nb_units_per_annotator)))
+            nb_units = abs(int(rng.normal(self._avg_nb_units_per_annotator, self._std_nb_units_per_annotator)))
             if not new_continnum:
                 nb_units = max(1, nb_units)
             for _ in range(nb_units):
-                gap = np.random.normal(self._avg_gap, self._std_gap)
+                gap = rng.normal(self._avg_gap, self._std_gap)
                 start = last_point + gap
 
-                end = start + abs(np.random.normal(self._avg_unit_duration, self._std_unit_duration))
+                end = start + abs(rng.normal(self._avg_unit_duration, self._std_unit_duration))
                 # Segments shorter than segment precision are illegal for pyannote
                 while end - start < pyannote.core.segment.SEGMENT_PRECISION:
-                    end = start + abs(np.random.normal(self._avg_unit_duration, self._std_unit_duration))
+                    end = start + abs(rng.normal(self._avg_unit_duration, self._std_unit_duration))
 
-                category = np.random.choice(self._categories, p=self._categories_weight)
+                category = rng.choice(self._categories, p=self._categories_weight)
 
                 new_continnum.add(annotator, Segment(start, end), category)
 
                 last_point = end
         return new_continnum
+
+    def sample_many(self, k: int, rng: Optional[np.random.Generator] = None) -> List[ArrayContinuum]:
+        """
+        Returns ``k`` samples, drawn like ``sample`` but all at once : the random variables of all the samples
+        (numbers of units, gaps, durations and categories) are drawn in a few vectorized calls, and the samples
+        are array-backed continua built without any `Unit` object.
+
+        The samples follow the same distribution as those of ``sample``, but aren't the same for a given seed.
+
+        Parameters
+        ----------
+        k: int
+            number of samples
+        rng: np.random.Generator, optional
+            source of the random draws of the samples. If not set, numpy's global random state is used.
+        """
+        self._has_been_init()
+        if rng is None:
+            rng = np.random
+        annotators = tuple(self._ground_truth_annotators)
+        nb_annotators = len(annotators)
+        nb_units = np.abs(np.trunc(rng.normal(self._avg_nb_units_per_annotator, self._std_nb_units_per_annotator,
+                                              size=(k, nb_annotators)))).astype(np.int64)
+        if nb_annotators > 0:
+            nb_units[:, 0] = np.maximum(nb_units[:, 0], 1)  # Samples can't be empty
+        # Units are drawn in the order of the samples and of their annotators
+        units_indptr = np.zeros(k * nb_annotators + 1, dtype=np.int64)
+        np.cumsum(nb_units.ravel(), out=units_indptr[1:])
+        total_units = int(units_indptr[-1])
+
+        gaps = rng.normal(self._avg_gap, self._std_gap, size=total_units)
+        durations = np.abs(rng.normal(self._avg_unit_duration, self._std_unit_duration, size=total_units))
+        # Segments shorter than segment precision are illegal for pyannote
+        too_short = np.flatnonzero(durations < pyannote.core.segment.SEGMENT_PRECISION)
+        while len(too_short) > 0:
+            durations[too_short] = np.abs(rng.normal(self._avg_unit_duration, self._std_unit_duration,
+                                                     size=len(too_short)))
+            too_short = too_short[durations[too_short] < pyannote.core.segment.SEGMENT_PRECISION]
+        categories_order = np.argsort(self._categories)
+        category_codes = np.argsort(categories_order).astype(np.int32)[
+            rng.choice(len(self._categories), size=total_units, p=self._categories_weight)]
+
+        # Each unit starts after the end of the previous unit of its annotator (plus its gap) : ends are the
+        # cumulated sums of gaps and durations of each annotator, computed row by row in a padded matrix.
+        sequences = np.repeat(np.arange(k * nb_annotators), nb_units.ravel())
+        positions = np.arange(total_units) - units_indptr[sequences]
+        padded = np.zeros((k * nb_annotators, int(nb_units.max(initial=0))))
+        padded[sequences, positions] = gaps + durations
+        previous_ends = np.where(positions > 0, np.cumsum(padded, axis=1)[sequences, positions - 1], 0.0)
+        starts = previous_ends + gaps
+        ends = starts + durations
+        # Negative gaps shuffle the starts : units are sorted by start row by row, which is much cheaper than
+        # sorting all of them at once (padding is sorted last)
+        padded.fill(np.inf)
+        padded[sequences, positions] = starts
+        order = units_indptr[sequences] + np.argsort(padded, axis=1, kind="stable")[sequences, positions]
+        starts, ends, category_codes = starts[order], ends[order], category_codes[order]
+
+        # All the samples are sorted at once, each (sample, annotator) pair being an annotator
+        arrays, _ = coded_units_arrays(list(range(k * nb_annotators)), sequences, starts, ends,
+                                       [], category_codes, discard_invalid_rows=False)
+        category_names = self._categories[categories_order].tolist()
+        reference = self._reference_continuum
+        samples = []
+        for sample_idx in range(k):
+            indptr = arrays.indptr[sample_idx * nb_annotators:(sample_idx + 1) * nb_annotators + 1]
+            first, last = indptr[0], indptr[-1]
+            # Like the samples of `sample`, each sample only has the categories of its units
+            names, codes = used_codes(category_names, arrays.category_codes[first:last])
+            indptr = indptr - first
+            indptr.flags.writeable = codes.flags.writeable = False
+            sample = ArrayContinuum(reference.uri)
+            sample._set_arrays(ContinuumArrays(annotators, indptr, arrays.starts[first:last],
+                                               arrays.ends[first:last], codes),
+                               SortedSet(names))
+            sample.bound_inf, sample.bound_sup = reference.bound_inf, reference.bound_sup
+            sample.best_window_size = reference.best_window_size
+            samples.append(sample)
+        return samples
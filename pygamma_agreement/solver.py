@@ -0,0 +1,385 @@
+# The MIT License (MIT)
+
+# Copyright (c) 2020-2021 CoML
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# AUTHORS
+# Rachid RIAD, Hadrien TITEUX, Léopold FAVRE
+"""
+##########
+Linear solvers
+##########
+
+Backends used to solve the integer linear program of the best alignment, i.e. choosing a set
+of possible unitary alignments with minimal total disorder, such that every unit of the continuum
+is in exactly one (or at least one for the soft alignment) of the chosen unitary alignments.
+"""
+import logging
+import os
+from abc import ABCMeta, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Union
+
+import numpy as np
+from scipy import sparse
+from typing_extensions import Literal
+
+SolverName = Literal["highs", "cvxpy", "cbc", "glpk", "matching"]
+
+
+class AbstractSolver(metaclass=ABCMeta):
+    """
+    Solver for the best alignment integer linear program. The program is given directly in
+    matricial form, so that no modeling layer is involved between the disorders of the
+    possible unitary alignments and the actual solver.
+    """
+    # Minimal number of possible unitary alignments in a sub-problem solved by `solve_components`
+    MIN_COMPONENT_SIZE = 1000
+
+    @abstractmethod
+    def solve(self, disorders: np.ndarray, A, soft: bool = False) -> np.ndarray:
+        """
+        Solves the problem
+
+        ``minimize disorders.T @ x  s.t.  A @ x == 1  (A @ x >= 1 if soft), x boolean``
+
+        Parameters
+        ----------
+        disorders: np.ndarray
+            1D array of the disorders of every possible unitary alignment
+        A: np.ndarray or scipy sparse matrix
+            Constraints matrix, of shape (nb_units, nb_possible_unitary_alignments). A[u, a] is 1 if
+            unit u is in the possible unitary alignment a, 0 otherwise.
+        soft: bool
+            If set, each unit must appear *at least* once in the chosen unitary alignments instead
+            of exactly once.
+
+        Returns
+        -------
+        np.ndarray:
+            the indexes of the chosen unitary alignments.
+        """
+
+    def solve_components(self,
+                         disorders: np.ndarray,
+                         A,
+                         alignments_components: np.ndarray,
+                         units_components: np.ndarray,
+                         nb_components: int,
+                         soft: bool = False) -> np.ndarray:
+        """
+        Solves the same problem as `solve`, but independently (and in parallel) on each component of the
+        problem, as given by `numba_utils.split_components`. Since no possible unitary alignment
+        links two components, the result is an optimal solution of the whole problem.
+
+        Components that are too small are grouped together (in order) until their number of possible
+        unitary alignments reaches `MIN_COMPONENT_SIZE`, so that the overhead of each solver call
+        stays negligible.
+
+        Parameters
+        ----------
+        alignments_components: np.ndarray
+            component of each possible unitary alignment (i.e. of each column of A)
+        units_components: np.ndarray
+            component of each unit (i.e. of each row of A)
+        nb_components: int
+            total number of components
+
+        Returns
+        -------
+        np.ndarray:
+            the (sorted) indexes of the chosen unitary alignments.
+        """
+        columns_order = np.argsort(alignments_components, kind="stable")
+        columns_bounds = np.searchsorted(alignments_components[columns_order], np.arange(nb_components + 1))
+        rows_order = np.argsort(units_components, kind="stable")
+        rows_bounds = np.searchsorted(units_components[rows_order], np.arange(nb_components + 1))
+
+        # Grouping consecutive components
+        groups = [0]
+        for component in range(1, nb_components):
+            if columns_bounds[component] - columns_bounds[groups[-1]] >= self.MIN_COMPONENT_SIZE:
+                groups.append(component)
+        groups.append(nb_components)
+        if len(groups) <= 2:
+            return np.sort(self.solve(disorders, A, soft=soft))
+
+        A = sparse.csc_matrix(A)[:, columns_order]
+        # position of each unit (row) once sorted by component
+        rows_positions = np.empty(len(units_components), dtype=np.int64)
+        rows_positions[rows_order] = np.arange(len(units_components))
+
+        def solve_group(group_start: int, group_end: int) -> np.ndarray:
+            col_start, col_end = columns_bounds[group_start], columns_bounds[group_end]
+            row_start, row_end = rows_bounds[group_start], rows_bounds[group_end]
+            nnz_start, nnz_end = A.indptr[col_start], A.indptr[col_end]
+            sub_A = sparse.csc_matrix((A.data[nnz_start:nnz_end],
+                                       rows_positions[A.indices[nnz_start:nnz_end]] - row_start,
+                                       A.indptr[col_start:col_end + 1] - nnz_start),
+                                      shape=(row_end - row_start, col_end - col_start))
+            sub_chosen = self.solve(disorders[columns_order[col_start:col_end]], sub_A, soft=soft)
+            return columns_order[col_start + sub_chosen]
+
+        with ThreadPoolExecutor(max_workers=min(os.cpu_count(), len(groups) - 1)) as p:
+            chosen = list(p.map(solve_group, groups[:-1], groups[1:]))
+        return np.sort(np.concatenate(chosen))
+
+
+@lru_cache(maxsize=None)
+def highs_available() -> bool:
+    """
+    Returns True if the installed scipy ships the HiGHS MILP solver (``scipy.optimize.milp``, scipy >= 1.9).
+    """
+    try:
+        from scipy.optimize import milp  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _cbc_available() -> bool:
+    # Checked once, so that the fallback warning isn't logged for every solved alignment
+    try:
+        import cylp  # noqa: F401
+    except ImportError:
+        logging.warning("CBC solver not installed. Using GLPK.")
+        return False
+    return True
+
+
+class HighsSolver(AbstractSolver):
+    """
+    Solver using the HiGHS solver, through scipy's ``scipy.optimize.linprog`` and ``scipy.optimize.milp``.
+    This backend is optional : it requires scipy >= 1.9, which isn't a dependency of pygamma-agreement
+    (and isn't available for python 3.7).
+
+    The linear relaxation of the problem is solved first: its solution is very often integral
+    (and is then the optimal alignment), in which case the costlier branch-and-bound is skipped.
+
+    Parameters
+    ----------
+    mip_rel_gap: float, optional
+        Relative optimality gap tolerated by HiGHS's branch-and-bound. Defaults to 0, i.e. the exact optimum.
+    """
+    INTEGRALITY_TOLERANCE = 1e-6
+
+    def __init__(self, mip_rel_gap: float = 0.0):
+        if not highs_available():
+            raise ImportError("The 'highs' solver requires scipy >= 1.9 (for scipy.optimize.milp).")
+        self.mip_rel_gap = mip_rel_gap
+
+    def solve(self, disorders: np.ndarray, A, soft: bool = False) -> np.ndarray:
+        from scipy.optimize import milp, linprog, LinearConstraint, Bounds
+        n = len(disorders)
+        c = disorders.astype(np.float64)
+        ones = np.ones(A.shape[0])
+        if soft:
+            relaxation = linprog(c, A_ub=-A, b_ub=-ones, bounds=(0, 1), method="highs")
+        else:
+            relaxation = linprog(c, A_eq=A, b_eq=ones, bounds=(0, 1), method="highs")
+        x = relaxation.x
+        if x is None or np.any(np.abs(x - np.round(x)) > self.INTEGRALITY_TOLERANCE):
+            result = milp(c=c,
+                          constraints=LinearConstraint(A, lb=1, ub=np.inf if soft else 1),
+                          integrality=np.ones(n, dtype=np.uint8),
+                          bounds=Bounds(0, 1),
+                          options={"mip_rel_gap": self.mip_rel_gap})
+            x = result.x
+        assert x is not None, "The linear solver couldn't find an alignment with minimal disorder " \
+                              "(likely because the amount of possible unitary alignments was too high)"
+        # compare with 0.9 as the solver returns 1.000 or small values i.e. 10e-14
+        chosen_alignments_ids, = np.where(x > 0.9)
+        return chosen_alignments_ids
+
+
+class CvxpySolver(AbstractSolver):
+    """
+    Solver that goes through the cvxpy modeling layer, which then uses the CBC (if cylp is installed) or
+    GLPK_MI solvers.
+
+    Parameters
+    ----------
+    backend: "CBC" or "GLPK_MI", optional
+        cvxpy solver to be used. If not set, CBC is used when available, and GLPK_MI otherwise.
+    """
+
+    def __init__(self, backend: Optional[Literal["CBC", "GLPK_MI"]] = None):
+        # Falling back to GLPK is only allowed if no backend was explicitly asked for
+        self._glpk_fallback = backend is None
+        if backend is None:
+            backend = "CBC" if _cbc_available() else "GLPK_MI"
+        self.backend = backend
+
+    def solve(self, disorders: np.ndarray, A, soft: bool = False) -> np.ndarray:
+        import cvxpy as cp
+        n = len(disorders)
+        x = cp.Variable(shape=(n,), boolean=True)
+        objective = cp.Minimize(disorders.T @ x)
+        backend = self.backend
+        if backend == "CBC":
+            try:
+                constraints = [A @ x >= 1] if soft else [A @ x == 1]
+                cp.Problem(objective, constraints).solve(solver=cp.CBC)
+            except cp.SolverError:
+                if not self._glpk_fallback:
+                    raise
+                logging.warning("CBC solver failed. Using GLPK.")
+                backend = "GLPK_MI"
+        if backend == "GLPK_MI":
+            matmul = A @ x
+            constraints = [1 <= matmul] if soft else [1 <= matmul, matmul <= 1]
+            cp.Problem(objective, constraints).solve(solver=cp.GLPK_MI)
+        assert x.value is not None, "The linear solver couldn't find an alignment with minimal disorder " \
+                                    "(likely because the amount of possible unitary alignments was too high)"
+        # compare with 0.9 as cvxpy returns 1.000 or small values i.e. 10e-14
+        chosen_alignments_ids, = np.where(x.value > 0.9)
+        return chosen_alignments_ids
+
+
+def solve_two_annotators(disorders: np.ndarray,
+                         possible_unitary_alignments: np.ndarray,
+                         sizes: np.ndarray) -> np.ndarray:
+    """
+    Exact, polynomial-time resolution of the best alignment problem when there are only two annotators.
+
+    In that case, an alignment is a matching between the units of the two annotators, where unmatched
+    units are aligned with an empty unit. It is found as a minimum weight full matching in a sparse
+    bipartite graph, whose only edges are the possible unitary alignments:
+
+    - left nodes are the units of the first annotator, followed by one "empty" node per unit of the second one
+    - right nodes are the units of the second annotator, followed by one "empty" node per unit of the first one
+    - unit ``i`` is linked with unit ``j`` (cost of the pair), with its own empty node (cost of ``i`` alone),
+      and the empty nodes of ``j`` and ``i`` are linked together at no cost, so that they can be matched
+      together when ``i`` and ``j`` are.
+
+    Parameters
+    ----------
+    disorders: np.ndarray
+        disorders of every possible unitary alignment
+    possible_unitary_alignments: np.ndarray
+        the possible unitary alignments, of shape (nb_possible_unitary_alignments, 2)
+    sizes: np.ndarray
+        number of units of both annotators
+
+    Returns
+    -------
+    np.ndarray:
+        the indexes of the chosen unitary alignments.
+    """
+    from scipy.sparse.csgraph import min_weight_full_bipartite_matching
+    n, m = int(sizes[0]), int(sizes[1])
+    units_1 = possible_unitary_alignments[:, 0].astype(np.int64)
+    units_2 = possible_unitary_alignments[:, 1].astype(np.int64)
+    is_pair = (units_1 != n) & (units_2 != m)
+    alone_1 = units_2 == m
+    alone_2 = units_1 == n
+    pairs, = np.where(is_pair)
+
+    rows = np.concatenate([units_1[pairs], units_1[alone_1], n + units_2[alone_2], n + units_2[pairs]])
+    cols = np.concatenate([units_2[pairs], m + units_1[alone_1], units_2[alone_2], m + units_1[pairs]])
+    alignment_ids = np.concatenate([pairs, np.where(alone_1)[0], np.where(alone_2)[0],
+                                    np.full(len(pairs), -1)])
+    # Every full matching has n + m edges, so shifting all the weights doesn't change the optimum.
+    # It ensures that no weight is zero, as zeros are not considered as edges.
+    weights = np.concatenate([disorders[pairs], disorders[alone_1], disorders[alone_2],
+                              np.zeros(len(pairs))]).astype(np.float64) + 1.0
+    graph = sparse.csr_matrix((weights, (rows, cols)), shape=(n + m, m + n))
+    matched_rows, matched_cols = min_weight_full_bipartite_matching(graph)
+
+    ids_graph = sparse.csr_matrix((alignment_ids + 2, (rows, cols)), shape=(n + m, m + n))
+    chosen_alignments_ids = np.asarray(ids_graph[matched_rows, matched_cols]).ravel() - 2
+    return np.sort(chosen_alignments_ids[chosen_alignments_ids >= 0])
+
+
+class MatchingSolver(AbstractSolver):
+    """
+    Solver that finds the best alignment of continua with two annotators as a minimum weight bipartite
+    matching (see `solve_two_annotators`), which is exact and much faster than the linear program.
+    The other problems (soft alignments, or more than two annotators) are solved by the ``fallback`` solver.
+
+    .. note::
+
+        When several alignments share the minimal disorder, the matching may not pick the same one as the
+        linear solvers, so the gamma-cat and gamma-k's can differ slightly (the gamma can't).
+
+    Parameters
+    ----------
+    fallback: "highs", "cvxpy", "cbc", "glpk" or AbstractSolver, optional
+        Solver used for the problems that aren't a matching. Defaults to cvxpy (CBC or GLPK).
+    """
+
+    def __init__(self, fallback: Union[None, SolverName, AbstractSolver] = None):
+        self.fallback = get_solver(fallback)
+
+    def solve(self, disorders: np.ndarray, A, soft: bool = False) -> np.ndarray:
+        return self.fallback.solve(disorders, A, soft)
+
+    def solve_components(self,
+                         disorders: np.ndarray,
+                         A,
+                         alignments_components: np.ndarray,
+                         units_components: np.ndarray,
+                         nb_components: int,
+                         soft: bool = False) -> np.ndarray:
+        return self.fallback.solve_components(disorders, A, alignments_components, units_components,
+                                              nb_components, soft)
+
+    def solve_matching(self,
+                       disorders: np.ndarray,
+                       possible_unitary_alignments: np.ndarray,
+                       sizes: np.ndarray) -> np.ndarray:
+        """
+        Returns the indexes of the chosen unitary alignments of a (non-soft) best alignment between two
+        annotators.
+        """
+        return solve_two_annotators(disorders, possible_unitary_alignments, sizes)
+
+
+def get_solver(solver: Union[None, SolverName, AbstractSolver] = None) -> AbstractSolver:
+    """
+    Returns the solver instance corresponding to the given name. If no solver is given, defaults to
+    cvxpy (CBC or GLPK).
+
+    .. note::
+
+        When several alignments share the minimal disorder, solvers may not pick the same one. The disorder
+        (and thus the gamma) doesn't depend on that choice, but the gamma-cat and gamma-k's can.
+
+    Parameters
+    ----------
+    solver: "highs", "cvxpy", "cbc", "glpk", "matching" or AbstractSolver, optional
+        Name of the backend, or an already instanciated solver (which is returned as is).
+    """
+    if isinstance(solver, AbstractSolver):
+        return solver
+    if solver is None or solver == "cvxpy":
+        return CvxpySolver()
+    elif solver == "highs":
+        return HighsSolver()
+    elif solver == "cbc":
+        return CvxpySolver("CBC")
+    elif solver == "glpk":
+        return CvxpySolver("GLPK_MI")
+    elif solver == "matching":
+        return MatchingSolver()
+    raise ValueError(f"Unknown solver '{solver}'. Available solvers are 'highs', 'cvxpy', 'cbc', 'glpk' "
+                     f"and 'matching'.")
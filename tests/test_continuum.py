@@ -1,8 +1,14 @@
 """Test of the Continuum class in pygamma_agreement.continuum"""
 
+import math
+
+import numpy as np
+import pytest
 from pyannote.core import Annotation, Segment
 
-from pygamma_agreement.continuum import Continuum
+from pygamma_agreement.array_continuum import ArrayContinuum
+from pygamma_agreement.continuum import Continuum, Unit
+from pygamma_agreement.dissimilarity import CombinedCategoricalDissimilarity
 
 
 def test_continuum_init():
@@ -106,3 +112,259 @@ def test_continua_eq():
     cont_a.add("maureen", Segment(0, 1))
     cont_b.add("maureen", Segment(0, 1), "C")
     assert cont_a != cont_b
+
+
+def test_continuum_from_arrays():
+    annotators = ["robin", "marvin", "robin", "marvin", "robin"]
+    starts = [3, 2, 0, 0, 3]
+    ends = [4, 3, 2, 1, 4]
+    annotations = ["C", "A", "B", None, "C"]
+    reference = Continuum()
+    for annotator, start, end, annotation in zip(annotators, starts, ends, annotations):
+        reference.add(annotator, Segment(start, end), annotation)
+
+    continuum = Continuum.from_arrays(annotators, starts, ends, annotations)
+    assert continuum == reference
+    assert continuum.categories == reference.categories
+    assert continuum.bounds == reference.bounds == (0, 4)
+
+    continuum.add_many("maureen", [-1, 5], [6, 6])
+    reference.add("maureen", Segment(-1, 6))
+    reference.add("maureen", Segment(5, 6))
+    continuum.add_many(["robin"], [1], [2], ["A"])
+    reference.add("robin", Segment(1, 2), "A")
+    assert continuum == reference
+    assert continuum.bounds == reference.bounds == (-1, 6)
+
+    with pytest.raises(ValueError):
+        continuum.add_many(["marvin", "nick"], [10, 11], [11, 11])
+    assert continuum == reference
+
+
+def test_continuum_from_csv_chunks():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    assert Continuum.from_csv("tests/data/3by100.csv", chunk_size=7) == continuum
+    assert ArrayContinuum.from_csv("tests/data/3by100.csv", chunk_size=7) == continuum
+    assert continuum.num_units == 372
+
+
+def test_continuum_from_rttm(tmp_path):
+    from pyannote.database.util import load_rttm
+    rttm = tmp_path / "turns.rttm"
+    rttm.write_text("SPEAKER alex 1 0.5 2.25 <NA> <NA> A <NA> <NA>\n"
+                    "SPEAKER paul 1 1.0 3.0 <NA> <NA> B <NA> <NA>\n"
+                    "LEXEME paul 1 1.0 0.5 <NA> <NA> C <NA> <NA>\n"
+                    "SPEAKER alex 1 3.1 0.4 <NA> <NA> B <NA> <NA>\n"
+                    "SPEAKER paul 1 0.1 0.2 <NA> <NA> A <NA> <NA>\n")
+    reference = Continuum()
+    for uri, annotation in load_rttm(str(rttm)).items():
+        for segment, _, label in annotation.itertracks(yield_label=True):
+            reference.add(uri, segment, label)
+
+    for chunk_size in (2, 100):
+        continuum = Continuum.from_rttm(rttm, chunk_size=chunk_size)
+        assert continuum == reference
+        assert continuum.categories == reference.categories == {"A", "B"}
+        assert continuum.bounds == reference.bounds
+
+
+def test_continuum_from_rttm_empty_turns(tmp_path):
+    rttm = tmp_path / "turns.rttm"
+    rttm.write_text("SPEAKER alex 1 0.5 2.25 <NA> <NA> A <NA> <NA>\n"
+                    "SPEAKER paul 1 1.0 0.0 <NA> <NA> C <NA> <NA>\n"
+                    "SPEAKER paul 1 1.0 3.0 <NA> <NA> B <NA> <NA>\n")
+    # Turns of duration 0.0 are dropped, as they were when loading through pyannote's Annotation
+    continuum = Continuum.from_rttm(rttm)
+    assert continuum.num_units == 2
+    assert continuum.categories == {"A", "B"}
+    with pytest.raises(ValueError):
+        Continuum.from_rttm(rttm, discard_invalid_rows=False)
+
+
+def test_continuum_views_and_copies():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    units = continuum["annotator_1"]
+    first = units[0]
+    assert len(units) == len(list(continuum.iter_annotator("annotator_1")))
+    assert first in units and units.index(first) == 0
+    with pytest.raises(AttributeError):
+        units.add(Unit(Segment(0, 1), "new"))
+
+    # Views and copies aren't affected by the modifications of the continuum, and the other way around
+    copy = continuum.copy()
+    assert copy == continuum and copy.categories == continuum.categories
+    continuum.remove("annotator_1", first)
+    assert units[0] == first and len(units) == len(continuum["annotator_1"]) + 1
+    assert copy["annotator_1", 0] == first
+    copy.add("annotator_2", Segment(0, 0.5), "new")
+    assert "new" not in continuum.categories
+    assert copy.num_units == continuum.num_units + 2
+    assert copy._annotations["annotator_3"] is continuum._annotations["annotator_3"]
+
+
+def test_continuum_views_copy_on_write():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    units = continuum._annotations["annotator_1"]
+    # Without any live view, modifications don't copy the units
+    continuum["annotator_1"]
+    continuum.remove("annotator_1", continuum["annotator_1", 0])
+    assert continuum._annotations["annotator_1"] is units
+    # Reads give the same view, and the units are copied at most once while it is alive
+    view = continuum["annotator_1"]
+    assert continuum["annotator_1"] is view
+    for unit in list(view)[:10]:
+        continuum.remove("annotator_1", unit)
+        assert continuum["annotator_1"] is not view
+    assert continuum._annotations["annotator_1"] is not units
+    assert len(view) == len(units) == len(continuum._annotations["annotator_1"]) + 10
+    # Interleaved reads and writes don't copy the units either
+    units = continuum._annotations["annotator_2"]
+    for _ in range(10):
+        continuum.remove("annotator_2", continuum["annotator_2"][0])
+    assert continuum._annotations["annotator_2"] is units
+
+
+def test_continuum_statistics():
+    def check_statistics(continuum: Continuum):
+        units = [unit for _, unit in continuum]
+        assert continuum.num_units == len(units)
+        assert continuum.avg_length_unit == pytest.approx(math.fsum(unit.segment.duration for unit in units)
+                                                          / len(units), rel=1e-15)
+        annotations = [unit.annotation for unit in units]
+        assert continuum.category_weights == {annotation: annotations.count(annotation) / len(units)
+                                              for annotation in set(annotations)}
+        assert continuum.avg_num_annotations_per_annotator == len(units) / continuum.num_annotators
+
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    check_statistics(continuum)
+    units = list(continuum)
+    # Units that are already in the continuum aren't counted again
+    continuum.add_many([annotator for annotator, _ in units[::3]],
+                       [unit.segment.start for _, unit in units[::3]],
+                       [unit.segment.end for _, unit in units[::3]],
+                       [unit.annotation for _, unit in units[::3]])
+    continuum.add(units[0][0], units[0][1].segment, units[0][1].annotation)
+    check_statistics(continuum)
+    for annotator, unit in units[::2]:
+        continuum.remove(annotator, unit)
+    continuum.add("annotator_4", Segment(0.1, 0.3), "new")
+    check_statistics(continuum)
+    copy = continuum.copy()
+    continuum.remove("annotator_4", Unit(Segment(0.1, 0.3), "new"))
+    check_statistics(continuum)
+    check_statistics(copy)
+    check_statistics(copy + Continuum.from_csv("tests/data/3by100.csv"))
+
+    array_continuum = ArrayContinuum.from_continuum(Continuum.from_csv("tests/data/3by100.csv"))
+    check_statistics(array_continuum)
+    for annotator, unit in units[:10]:
+        array_continuum.remove(annotator, unit)
+    array_continuum.add("annotator_4", Segment(0.1, 0.3), "new")
+    array_continuum.add("annotator_4", Segment(0.1, 0.3), "new")  # already there
+    check_statistics(array_continuum)
+    assert array_continuum.num_units == len(units) - 9
+    array_continuum.add_many(["annotator_5"] * 2, [1.0, 2.0], [1.5, 2.5], ["new", "other"])
+    check_statistics(array_continuum)
+
+
+def test_continuum_crop():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    continuum.add("annotator_1", Segment(0, 1000), "long")  # overlaps every time range
+    continuum.add_annotator("annotator_4")
+    for t0, t1 in ((0, 10), (105.5, 241), (300, 310), (2000, 2001)):
+        support = Segment(t0, t1)
+        expected = {"loose": Continuum(), "strict": Continuum(), "intersection": Continuum()}
+        for annotator, unit in continuum:
+            if unit.segment.start < t1 and unit.segment.end > t0:
+                expected["loose"].add(annotator, unit.segment, unit.annotation)
+                expected["intersection"].add(annotator, unit.segment & support, unit.annotation)
+            if unit.segment in support:
+                expected["strict"].add(annotator, unit.segment, unit.annotation)
+        for cls in (Continuum, ArrayContinuum):
+            source = cls.from_arrays(*zip(*((annotator, unit.segment.start, unit.segment.end, unit.annotation)
+                                            for annotator, unit in continuum)))
+            source.add_annotator("annotator_4")
+            for mode, expected_units in expected.items():
+                cropped = source.crop(support, mode=mode)
+                assert type(cropped) is cls
+                assert cropped.annotators == continuum.annotators
+                assert list(cropped) == list(expected_units)
+                assert cropped.num_units == expected_units.num_units
+                assert cropped.bound_inf <= t0 and cropped.bound_sup >= t1
+            assert list(source[t0:t1]) == list(expected["intersection"])
+
+    # The time index follows the modifications of the continuum
+    nb_units = continuum[0:10].num_units
+    continuum.add("annotator_2", Segment(2, 3), "new")
+    assert continuum[0:10].num_units == nb_units + 1
+    with pytest.raises(ValueError):
+        continuum.crop(Segment(0, 10), mode="unknown")
+
+
+def test_continuum_save_load(tmp_path):
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    continuum.add("annotator_4", Segment(2, 3))  # unit without annotation
+    continuum.add_annotator("annotator_5")  # annotator without units
+    continuum.uri = "3by100"
+    path = tmp_path / "3by100.continuum"
+    continuum.save(path)
+
+    for cls in (Continuum, ArrayContinuum):
+        for mmap in (True, False):
+            loaded = cls.load(path, mmap=mmap)
+            assert type(loaded) is cls
+            assert loaded == continuum
+            assert loaded.annotators == continuum.annotators
+            assert loaded.categories == continuum.categories
+            assert loaded.bounds == continuum.bounds
+            assert loaded.uri == "3by100"
+
+    loaded = ArrayContinuum.load(path)
+    assert loaded._units is None
+    assert isinstance(loaded.arrays.starts.base, np.memmap)
+    assert not loaded.arrays.starts.flags.writeable
+    loaded.save(tmp_path / "copy.continuum")
+    assert (tmp_path / "copy.continuum").read_bytes() == path.read_bytes()
+
+    Continuum().save(tmp_path / "empty.continuum")
+    assert not ArrayContinuum.load(tmp_path / "empty.continuum")
+    with pytest.raises(ValueError):
+        Continuum.load("tests/data/3by100.csv")
+
+
+def test_array_continuum():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    annotators, annotations, starts, ends = zip(*((annotator, unit.annotation, unit.segment.start, unit.segment.end)
+                                                  for annotator, unit in continuum))
+    # Shuffled and duplicated units are sorted and deduplicated, like in a Continuum
+    order = np.random.default_rng(0).permutation(2 * len(starts)) % len(starts)
+    array_continuum = ArrayContinuum.from_arrays(np.array(annotators)[order], np.array(starts)[order],
+                                                 np.array(ends)[order], np.array(annotations)[order])
+    assert array_continuum._units is None
+    assert array_continuum.num_units == continuum.num_units
+    assert array_continuum.annotators == continuum.annotators
+    assert array_continuum.categories == continuum.categories
+    assert array_continuum.bounds == continuum.bounds
+    assert array_continuum.category_weights == continuum.category_weights
+    assert array_continuum.avg_length_unit == continuum.avg_length_unit
+    assert array_continuum.max_num_annotations_per_annotator == continuum.max_num_annotations_per_annotator
+
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    for array_units, units in zip(dissim._build_arrays_continuum(array_continuum),
+                                  dissim._build_arrays_continuum(continuum)):
+        np.testing.assert_array_equal(array_units, units)
+    assert array_continuum.get_best_alignment(dissim).disorder == continuum.get_best_alignment(dissim).disorder
+    assert array_continuum._units is None  # no Unit object was needed
+    assert array_continuum == continuum
+    assert array_continuum["annotator_1", 3] == continuum["annotator_1", 3]
+
+    # Modifications go through sorted sets of units, and the arrays are built again
+    array_continuum.add("annotator_4", Segment(0, 1), "new")
+    assert array_continuum._arrays is None
+    assert array_continuum.arrays.annotators[-1] == "annotator_4"
+    assert array_continuum.categories[-1] == "new"
+    assert ArrayContinuum.from_continuum(continuum) == continuum
+
+    with pytest.raises(ValueError):
+        ArrayContinuum.from_arrays(["a", "b"], [0, 1], [1, 1])
+    assert ArrayContinuum.from_arrays(["a", "b"], [0, 1], [1, 1], discard_invalid_rows=True).annotators == {"a"}
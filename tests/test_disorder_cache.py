@@ -0,0 +1,97 @@
+"""Tests for the persistent cache of the samples' disorders"""
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pygamma_agreement import (Continuum,
+                               CombinedCategoricalDissimilarity,
+                               DisorderCache,
+                               ShuffleContinuumSampler,
+                               StatisticalContinuumSampler)
+
+
+def test_disorder_cache_compute_gamma(tmp_path):
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    cache = DisorderCache(tmp_path / "cache")
+
+    gamma_results = continuum.compute_gamma(dissim, n_samples=10, seed=4772, disorder_cache=cache)
+    assert len(cache) == 1
+    assert gamma_results.cached_disorders == []
+
+    # Continua with the same statistics reuse the cached disorders
+    gamma_results_cached = continuum.compute_gamma(dissim, n_samples=10, seed=4772, disorder_cache=cache)
+    assert gamma_results_cached.n_samples == 10
+    assert gamma_results_cached.chance_alignments == []
+    assert gamma_results_cached.gamma == pytest.approx(gamma_results.gamma)
+    with pytest.raises(ValueError):
+        gamma_results_cached.gamma_cat
+
+    # Cached disorders are topped up with new samples
+    gamma_results_more = continuum.compute_gamma(dissim, n_samples=15, seed=4772, disorder_cache=cache)
+    assert len(gamma_results_more.cached_disorders) == 10
+    assert len(gamma_results_more.chance_alignments) == 5
+    with pytest.raises(ValueError):
+        gamma_results_more.gamma_cat
+    assert len(cache) == 1
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling(continuum)
+    assert len(cache.get(cache.key(sampler, dissim))) == 15
+
+    # Results whose gamma-cat is needed only use new samples, which are still cached
+    gamma_results_alignments = continuum.compute_gamma(dissim, n_samples=10, seed=4772, disorder_cache=cache,
+                                                       need_alignments=True)
+    assert gamma_results_alignments.cached_disorders == []
+    assert len(gamma_results_alignments.chance_alignments) == 10
+    assert gamma_results_alignments.gamma_cat is not None
+    assert len(cache.get(cache.key(sampler, dissim))) == 25
+
+    # Other dissimilarities don't share the entry
+    continuum.compute_gamma(CombinedCategoricalDissimilarity(alpha=1, beta=1), n_samples=2, disorder_cache=cache)
+    assert len(cache) == 2
+    # and samples that depend on the continuum itself aren't cached
+    continuum.compute_gamma(dissim, n_samples=2, sampler=ShuffleContinuumSampler(), disorder_cache=cache)
+    assert len(cache) == 2
+
+
+def test_disorder_cache_keys_and_eviction(tmp_path):
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    cache = DisorderCache(tmp_path, max_size=2000)
+
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling(continuum)
+    key = cache.key(sampler, dissim)
+    assert key == cache.key(sampler, CombinedCategoricalDissimilarity(alpha=3, beta=1))
+    assert key != cache.key(sampler, dissim, "fast")
+    # fast alignments of the samples depend on the window size they inherit from the reference
+    fast_key = cache.key(sampler, dissim, "fast")
+    continuum.best_window_size = 5
+    assert cache.key(sampler, dissim, "fast") != fast_key
+    assert cache.key(sampler, dissim) == key
+    continuum.best_window_size = np.inf
+    assert cache.key(sampler, dissim, "fast") == fast_key
+    # nearly identical statistics share their key
+    sampler._avg_gap *= 1.0001
+    assert cache.key(sampler, dissim) == key
+    sampler._avg_gap *= 2
+    assert cache.key(sampler, dissim) != key
+    assert cache.key(ShuffleContinuumSampler(), dissim) is None
+
+    assert len(cache.get(key)) == 0
+    cache.add(key, np.arange(50, dtype=np.float64))
+    # disorders added to the same entry (e.g. by concurrent processes) are all kept, in order
+    DisorderCache(tmp_path).add(key, np.arange(50, 100, dtype=np.float64))
+    np.testing.assert_array_equal(cache.get(key), np.arange(100))
+    assert len(cache) == 1
+    # past max_size, least recently used files are evicted
+    for other_key in ("a", "b"):
+        time.sleep(0.01)
+        cache.add(other_key, np.arange(100, dtype=np.float64))
+    assert len(cache) == 2
+    assert len(cache.get(key)) == 0
+    assert len(cache.get("b")) == 100
+    cache.clear()
+    assert len(cache) == 0
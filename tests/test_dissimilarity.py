@@ -1,18 +1,28 @@
 """Test of the module pygamma_agreement.dissimilarity"""
 
+import itertools
+
+import numba as nb
 import numpy as np
 import pytest
 from pyannote.core import Annotation, Segment
 from sortedcontainers import SortedSet
 
 from pygamma_agreement.alignment import (UnitaryAlignment)
-from pygamma_agreement.continuum import Continuum, Unit
+from pygamma_agreement.continuum import Continuum, Unit, warmup
+from pygamma_agreement.numba_utils import enumerate_valid_alignments, enumerate_valid_alignments_parallel
 from pygamma_agreement.dissimilarity import (PositionalSporadicDissimilarity,
+                                             AbsoluteCategoricalDissimilarity,
                                              CombinedCategoricalDissimilarity,
                                              PrecomputedCategoricalDissimilarity,
                                              AbstractDissimilarity,
                                              CategoricalDissimilarity,
-                                             LambdaCategoricalDissimilarity)
+                                             LambdaCategoricalDissimilarity,
+                                             LevenshteinCategoricalDissimilarity,
+                                             CompiledDissimilarity,
+                                             CompiledDissimilarityRegistry,
+                                             compiled_dissimilarities,
+                                             dissimilarity_dec)
 
 
 def test_categorical_dissimilarity():
@@ -260,8 +270,199 @@ def test_custom_dissimilarity():
     assert gamma_results_1.gamma != gamma_results_2.gamma
 
 
+def test_valid_alignments_cartesian_product():
+    np.random.seed(4772)
+    continuum = Continuum()
+    for annotator in ["Alice", "Bob", "Carol"]:
+        for _ in range(12):
+            start = np.random.uniform(0, 60)
+            continuum.add(annotator, Segment(start, start + np.random.uniform(1, 10)),
+                          np.random.choice(["A", "B", "C"]))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    disorders, alignments, counters = dissim.valid_alignments(continuum, return_counters=True)
+
+    # Reference : going through the whole cartesian product of units (empty ones included),
+    # the first annotator's unit varying the fastest.
+    unit_arrays = dissim._build_arrays_continuum(continuum)
+    nb_annotators = len(unit_arrays)
+    c2n = nb_annotators * (nb_annotators - 1) // 2
+    criterium = c2n * dissim.delta_empty * nb_annotators
+    expected_disorders, expected_alignments = [], []
+    for reversed_tuple in itertools.product(*(range(len(units) + 1) for units in reversed(unit_arrays))):
+        unitary_alignment = reversed_tuple[::-1]
+        if all(unit == len(units) for unit, units in zip(unitary_alignment, unit_arrays)):
+            continue
+        disorder = 0.0
+        for a in range(nb_annotators):
+            for b in range(a):
+                if unitary_alignment[a] == len(unit_arrays[a]) or unitary_alignment[b] == len(unit_arrays[b]):
+                    disorder += np.float32(dissim.delta_empty)
+                else:
+                    disorder += dissim.d_mat(unit_arrays[a][unitary_alignment[a]],
+                                             unit_arrays[b][unitary_alignment[b]])
+        if disorder <= criterium:
+            expected_disorders.append(disorder)
+            expected_alignments.append(unitary_alignment)
+
+    assert len(expected_alignments) < 13 ** 3
+    np.testing.assert_array_equal(alignments, np.array(expected_alignments, dtype=np.int16))
+    np.testing.assert_array_equal(disorders, np.array(expected_disorders, dtype=np.float32) / c2n)
+    assert counters["emitted"] == len(alignments)
+    assert counters["pruned"] > 0
+    assert counters["visited"] < 13 ** 3
+
+
+@pytest.mark.parametrize("n_threads", [2, 3, 8])
+def test_valid_alignments_parallel(n_threads):
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    disorders, alignments, counters = dissim.valid_alignments(continuum, return_counters=True)
+    parallel_disorders, parallel_alignments, parallel_counters = dissim.valid_alignments(continuum,
+                                                                                         return_counters=True,
+                                                                                         n_threads=n_threads)
+    np.testing.assert_array_equal(parallel_alignments, alignments)
+    np.testing.assert_array_equal(parallel_disorders, disorders)
+    assert parallel_counters == counters
+
+
+def test_valid_alignments_many_units():
+    # More units than int16 indexes can hold
+    nb_units = 40000
+    continuum = Continuum()
+    for i in range(nb_units):
+        continuum.add("Alice", Segment(i * 10, i * 10 + 5), "A")
+    continuum.add("Bob", Segment((nb_units - 1) * 10, (nb_units - 1) * 10 + 5), "A")
+    dissim = PositionalSporadicDissimilarity(delta_empty=1.0)
+    disorders, alignments = dissim.valid_alignments(continuum)
+    assert alignments.dtype == np.int32
+    assert len(alignments) == nb_units + 2
+    assert [nb_units - 1, 0] in alignments.tolist()
+    assert [nb_units, 0] in alignments.tolist()
+
+    best_alignment = continuum.get_best_alignment(dissim)
+    assert best_alignment.num_unitary_alignments == nb_units
+    # Every unit of Alice is alone, except the one aligned with the single unit of Bob
+    assert best_alignment.disorder == pytest.approx((nb_units - 1) / ((nb_units + 1) / 2))
+
+    small_continuum = Continuum()
+    small_continuum.add("Alice", Segment(0, 5), "A")
+    small_continuum.add("Bob", Segment(0, 5), "A")
+    assert dissim.valid_alignments(small_continuum)[1].dtype == np.int16
+
+
+def test_valid_alignments_many_annotators_and_units():
+    # Dense matrices of the dissimilarities of 3 annotators with that many units would take 13 GB
+    nb_units = 33000
+    continuum = Continuum()
+    for shift, annotator in enumerate(["Alice", "Bob", "Carol"]):
+        for i in range(nb_units):
+            continuum.add(annotator, Segment(i * 10.0 + shift, i * 10.0 + shift + 5), "A")
+    dissim = PositionalSporadicDissimilarity(delta_empty=1.0)
+    disorders, alignments = dissim.valid_alignments(continuum)
+    assert alignments.dtype == np.int32
+    # the tuples of the units with the same index are valid
+    assert (alignments == [nb_units - 1] * 3).all(axis=1).any()
+    first = np.flatnonzero((alignments == [0, 0, 0]).all(axis=1))
+    assert len(first) == 1
+    units = [np.array([start, start + 5, 5, 0], dtype=np.float32) for start in (0, 1, 2)]
+    expected = (dissim.d_mat(units[1], units[0]) + dissim.d_mat(units[2], units[0])
+                + dissim.d_mat(units[2], units[1])) / 3
+    assert disorders[first[0]] == pytest.approx(expected)
+
+
+def test_specialized_kernels():
+    continuum = Continuum.from_csv("tests/data/AlexPaulSuzan.csv")
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    assert dissim.kernels is dissim.kernels
+
+    unit_arrays = dissim._build_arrays_continuum(continuum)
+    criterium = 3 * dissim.delta_empty * 3
+    # Only evaluating the units within temporal reach of each other doesn't change the matrices
+    for reach in (np.inf, dissim.temporal_reach(criterium)):
+        indptr, indices, values, offsets, sizes = dissim.kernels.precompute_matrices(unit_arrays, criterium, reach)
+        np.testing.assert_array_equal(sizes, [len(units) for units in unit_arrays])
+        for a in range(len(sizes)):
+            for b in range(a):
+                for i, unit_a in enumerate(unit_arrays[a]):
+                    row = slice(indptr[offsets[a, b] + i], indptr[offsets[a, b] + i + 1])
+                    # only the dissimilarities within the criterium are kept, in the order of the units
+                    expected = [(j, dissim.d_mat(unit_a, unit_b)) for j, unit_b in enumerate(unit_arrays[b])
+                                if dissim.d_mat(unit_a, unit_b) <= criterium]
+                    assert list(zip(indices[row].tolist(), values[row].tolist())) == expected
+
+
+def test_temporal_reach():
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    criterium = 3 * dissim.delta_empty * 3
+    reach = dissim.temporal_reach(criterium)
+    # Units of durations 2 and 4, separated by a gap just within (or beyond) the reach
+    for gap, within in ((reach * 3 * 0.999, True), (reach * 3 * 1.001, False)):
+        unit_a = np.array([0, 2, 2, 0], dtype=np.float32)
+        unit_b = np.array([2 + gap, 6 + gap, 4, 0], dtype=np.float32)
+        assert (dissim.d_mat(unit_a, unit_b) <= criterium) == within
+    assert AbsoluteCategoricalDissimilarity().temporal_reach(criterium) == np.inf
+    # Unsorted units of a custom continuum
+    rng = np.random.default_rng(4772)
+    unit_arrays = nb.typed.List()
+    for _ in range(3):
+        starts = rng.uniform(0, 500, size=200).astype(np.float32)
+        durations = rng.uniform(0.5, 20, size=200).astype(np.float32)
+        unit_arrays.append(np.ascontiguousarray(np.stack([starts, starts + durations, durations,
+                                                          rng.integers(0, 3, size=200)], axis=1),
+                                                dtype=np.float32))
+    full = dissim.kernels.precompute_matrices(unit_arrays, criterium, np.inf)
+    bounded = dissim.kernels.precompute_matrices(unit_arrays, criterium, reach)
+    for full_array, bounded_array in zip(full, bounded):
+        np.testing.assert_array_equal(full_array, bounded_array)
+
+
+def test_warmup():
+    dissim = CombinedCategoricalDissimilarity(
+        cat_dissim=PrecomputedCategoricalDissimilarity(SortedSet(["x", "y", "z"]),
+                                                       np.ones((3, 3)) - np.eye(3)))
+    warmup(dissim)
+    assert dissim._compiled._kernels is not None
+    assert enumerate_valid_alignments.signatures and enumerate_valid_alignments_parallel.signatures
+    warmup(PositionalSporadicDissimilarity())
+
+
+def test_compiled_dissimilarities_registry():
+    compiled_dissimilarities.clear()
+    dissim_1 = CombinedCategoricalDissimilarity(alpha=3, beta=2,
+                                                cat_dissim=LevenshteinCategoricalDissimilarity(["aa", "ab"]))
+    dissim_2 = CombinedCategoricalDissimilarity(alpha=3, beta=2,
+                                                cat_dissim=LevenshteinCategoricalDissimilarity(["aa", "ab"]))
+    assert dissim_1.d_mat is dissim_2.d_mat
+    assert dissim_1.kernels is dissim_2.kernels
+    assert compiled_dissimilarities.hits == 3  # positional, categorical and combined
+    dissim_3 = CombinedCategoricalDissimilarity(alpha=3, beta=1,
+                                                cat_dissim=LevenshteinCategoricalDissimilarity(["aa", "ab"]))
+    assert dissim_3.d_mat is not dissim_1.d_mat
+    dissim_4 = CombinedCategoricalDissimilarity(alpha=3, beta=2,
+                                                cat_dissim=LevenshteinCategoricalDissimilarity(["aa", "b"]))
+    assert dissim_4.d_mat is not dissim_1.d_mat
+
+    class ScaledPositionalDissimilarity(PositionalSporadicDissimilarity):
+        def __init__(self, scale: float):
+            self.scale = scale
+            super().__init__()
+
+        def compile_d_mat(self):
+            scale = self.scale
 
+            @dissimilarity_dec
+            def d_mat(unit1: np.ndarray, unit2: np.ndarray) -> float:
+                return abs(unit1[0] - unit2[0]) * scale
+            return d_mat
 
-
-
-
+    # the key of the parent class doesn't describe the overridden compile_d_mat
+    assert ScaledPositionalDissimilarity(1.0).d_mat is not ScaledPositionalDissimilarity(2.0).d_mat
+
+    registry = CompiledDissimilarityRegistry(maxsize=2)
+    entries = [CompiledDissimilarity(dissim.d_mat) for dissim in (dissim_1, dissim_3, dissim_4)]
+    registry.put("a", entries[0])
+    registry.put("b", entries[1])
+    assert registry.get("a") is entries[0]
+    registry.put("c", entries[2])  # evicts the least recently used entry
+    assert len(registry) == 2 and "b" not in registry
+    assert registry.get("a") is entries[0] and registry.get("c") is entries[2]
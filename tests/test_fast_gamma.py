@@ -44,3 +44,11 @@ def test_fast_gamma():
             assert abs(gamma - gamma_fast) < 0.0001
 
 
+def test_fast_alignment_threads():
+    continuum = Continuum.from_csv("tests/data/3by100.csv")
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    alignment = continuum.get_fast_alignment(dissim, window_size=10)
+    threaded_alignment = continuum.get_fast_alignment(dissim, window_size=10, n_threads=2)
+    assert threaded_alignment.disorder == alignment.disorder
+    assert ([unitary_alignment.n_tuple for unitary_alignment in threaded_alignment.unitary_alignments]
+            == [unitary_alignment.n_tuple for unitary_alignment in alignment.unitary_alignments])
@@ -1,10 +1,12 @@
 """Tests for the gamma computations"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pytest
 
-from pygamma_agreement.continuum import Continuum
+from pygamma_agreement.continuum import Continuum, SAMPLES_LOOK_AHEAD
 from pygamma_agreement.dissimilarity import (CombinedCategoricalDissimilarity,
                                              PositionalSporadicDissimilarity,
                                              NumericalCategoricalDissimilarity,
@@ -15,13 +17,12 @@ from pyannote.core import Segment
 
 
 def test_gamma_2by1000():
-    np.random.seed(4772)
     continuum = Continuum.from_csv(Path("tests/data/2by1000.csv"))
     dissim = CombinedCategoricalDissimilarity(delta_empty=1,
                                               alpha=3,
                                               beta=1)
 
-    gamma_results = continuum.compute_gamma(dissim)
+    gamma_results = continuum.compute_gamma(dissim, seed=4772)
     assert len(gamma_results.best_alignment.unitary_alignments) == 1085
 
     # Gamma:
@@ -32,7 +33,7 @@ def test_gamma_2by1000():
     assert 0.21 <= gamma_results.gamma_k('Adj') <= 0.25
     assert 0.36 <= gamma_results.gamma_k('Noun') <= 0.39
     assert 0.31 <= gamma_results.gamma_k('Prep') <= 0.35
-    assert 0.11 <= gamma_results.gamma_k('Verb') <= 0.15
+    assert 0.11 <= gamma_results.gamma_k('Verb') <= 0.16
 
 
 def test_gamma_3by100():
@@ -55,14 +56,99 @@ def test_gamma_3by100():
     assert 0.96 <= gamma_results.gamma_k('Prep')
 
 
+def test_gamma_executors():
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    gammas = []
+    for executor in ("threads", "processes", ThreadPoolExecutor(max_workers=2)):
+        np.random.seed(4772)
+        gammas.append(continuum.compute_gamma(dissim, n_samples=10, executor=executor).gamma)
+    # samples are drawn the same way whatever the executor
+    assert gammas[0] == gammas[1] == gammas[2]
+    # and only depend on the seed, not on the number of workers
+    gammas = [continuum.compute_gamma(dissim, n_samples=10, executor=ThreadPoolExecutor(max_workers=workers),
+                                      seed=4772).gamma
+              for workers in (1, 3)]
+    assert gammas[0] == gammas[1]
+    # nor on the number of threads of the enumerations
+    assert continuum.compute_gamma(dissim, n_samples=10, seed=4772, n_threads=2).gamma == gammas[0]
+    with pytest.raises(ValueError):
+        continuum.compute_gamma(dissim, n_samples=10, executor="unknown")
+
+
+def test_gamma_processes_send_context_once(monkeypatch):
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    gamma = continuum.compute_gamma(dissim, n_samples=10, seed=4772).gamma
+    pickled_continua = []
+    getstate = Continuum.__getstate__
+    monkeypatch.setattr(Continuum, "__getstate__",
+                        lambda self: pickled_continua.append(self) or getstate(self))
+    # The continuum (for its best alignment) and the sampler's reference are pickled once, whatever the
+    # number of samples, and the samples don't change
+    assert continuum.compute_gamma(dissim, n_samples=10, seed=4772, executor="processes").gamma == gamma
+    assert len(pickled_continua) == 2
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        for _ in range(2):  # workers keep the contexts of several calls
+            pickled_continua.clear()
+            assert continuum.compute_gamma(dissim, n_samples=10, seed=4772, executor=executor).gamma == gamma
+            assert len(pickled_continua) == 2
+
+
+def test_gamma_precision_level():
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    # samples are drawn until the precision level (or the maximum number of samples) is reached
+    gamma_results = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.5, seed=4772)
+    assert gamma_results.n_samples == 10
+    gamma_results = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.001, max_samples=15, seed=4772)
+    assert gamma_results.n_samples == 15
+    gamma_results = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.05, seed=4772)
+    disorders = [alignment.disorder for alignment in gamma_results.chance_alignments]
+    assert gamma_results.n_samples >= np.ceil((np.std(disorders) / np.mean(disorders) * 1.96 / 0.05) ** 2)
+    # the samples drawn only depend on the seed
+    gamma_results_threads = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.05, seed=4772,
+                                                    executor=ThreadPoolExecutor(max_workers=1))
+    assert gamma_results_threads.n_samples == gamma_results.n_samples
+    assert gamma_results_threads.gamma == gamma_results.gamma
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.futures = []
+
+    def submit(self, *args, **kwargs):
+        self.futures.append(super().submit(*args, **kwargs))
+        return self.futures[-1]
+
+
+def test_gamma_precision_level_submissions():
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    # no more samples than the maximum are submitted (with the job of the best alignment)
+    with CountingExecutor(max_workers=4) as executor:
+        gamma_results = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.001, max_samples=5,
+                                                seed=4772, executor=executor)
+        assert gamma_results.n_samples == 5
+        assert len(executor.futures) == 1 + 5
+    # samples are only submitted a few steps ahead of the required number
+    with CountingExecutor(max_workers=4) as executor:
+        gamma_results = continuum.compute_gamma(dissim, n_samples=10, precision_level=0.5, seed=4772,
+                                                executor=executor)
+        assert gamma_results.n_samples == 10
+        assert len(executor.futures) <= 1 + 10 + SAMPLES_LOOK_AHEAD
+        # the jobs that weren't cancelled are over when compute_gamma returns
+        assert all(future.done() for future in executor.futures)
+
+
 def test_gamma_alexpaulsuzan():
-    np.random.seed(4772)
     continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
     dissim = CombinedCategoricalDissimilarity(delta_empty=1,
                                               alpha=3,
                                               beta=1)
     sampler = ShuffleContinuumSampler()
-    gamma_results = continuum.compute_gamma(dissim, sampler=sampler, precision_level=0.05)
+    gamma_results = continuum.compute_gamma(dissim, sampler=sampler, precision_level=0.05, seed=4772)
     assert len(gamma_results.best_alignment.unitary_alignments) == 6
 
     assert gamma_results.best_alignment.disorder == pytest.approx(0.96, 0.01)
@@ -1,6 +1,7 @@
 """Test for the different continuum samplers"""
 from pathlib import Path
 import numpy as np
+from pygamma_agreement.array_continuum import ArrayContinuum
 from pygamma_agreement.continuum import Continuum
 
 from pygamma_agreement.dissimilarity import CombinedCategoricalDissimilarity
@@ -48,9 +49,9 @@ def test_statistical_sampler():
     assert gamma_results.gamma < 0.1
     assert gamma_results.gamma_cat < 0.1
 
-    gamma_results = continuum.compute_gamma(dissim, sampler=sampler, precision_level=0.05)
+    gamma_results = continuum.compute_gamma(dissim, sampler=sampler, precision_level=0.05, seed=4772)
     # Gamma:
-    assert 0.41 <= gamma_results.gamma <= 0.42
+    assert 0.40 <= gamma_results.gamma <= 0.42
     # Gamma-cat:
     assert 0.35 <= gamma_results.gamma_cat <= 0.38
 
@@ -71,5 +72,65 @@ def test_statistical_sampler_manual():
         gamma_k = gamma_results.gamma_k(category)
 
 
+def test_statistical_sampler_sample_many():
+    continuum = Continuum.from_csv(Path("tests/data/3by100.csv"))
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling(continuum)
+
+    samples = sampler.sample_many(200, np.random.default_rng(4772))
+    assert len(samples) == 200
+    for sample in samples[:10]:
+        assert isinstance(sample, ArrayContinuum)
+        assert sample.annotators == continuum.annotators
+        assert sample.categories.issubset(continuum.categories)
+        assert sample.bounds == continuum.bounds
+        # same units as the (sorted) continuum built from them
+        assert list(sample) == list(Continuum.from_arrays(*zip(*((annotator, unit.segment.start, unit.segment.end,
+                                                                  unit.annotation) for annotator, unit in sample))))
+    # samples follow the same distribution as those drawn one by one
+    np.random.seed(4772)
+    sequential_samples = [sampler.sample_from_continuum for _ in range(50)]
+    for statistic in ("avg_length_unit", "avg_num_annotations_per_annotator"):
+        many = np.mean([getattr(sample, statistic) for sample in samples])
+        sequential = np.mean([getattr(sample, statistic) for sample in sequential_samples])
+        assert abs(many - sequential) <= 0.1 * sequential
+    # and are reproducible
+    for sample, sample_again in zip(sampler.sample_many(3, np.random.default_rng(1)),
+                                    sampler.sample_many(3, np.random.default_rng(1))):
+        assert list(sample) == list(sample_again)
+
+    sampler = StatisticalContinuumSampler()
+    sampler.init_sampling_custom(annotators=['Martin', 'Martino'], avg_num_units_per_annotator=0,
+                                 std_num_units_per_annotator=0, avg_gap=5, std_gap=5, avg_duration=10,
+                                 std_duration=3, categories=np.array(['Verb', 'Noun']))
+    for sample in sampler.sample_many(5):
+        assert sample.num_units == 1  # samples are never empty
 
 
+def test_mathet_sampler_shifts():
+    continuum = Continuum.from_csv(Path("tests/data/AlexPaulSuzan.csv"))
+    bound_inf, bound_sup = continuum.bounds
+    for pivot_type in ('int_pivot', 'float_pivot'):
+        sampler = ShuffleContinuumSampler(pivot_type=pivot_type)
+        sampler.init_sampling(continuum)
+        for seed in range(20):
+            sample = sampler.sample(np.random.default_rng(seed))
+            assert isinstance(sample, ArrayContinuum)
+            assert sample.bounds == continuum.bounds
+            assert len(sample.annotators) == 3
+            for annotator in sample.annotators:
+                units = list(sample.iter_annotator(annotator))
+                # each sampled annotator is an annotator of the reference, shifted circularly by one pivot
+                assert any(len(units) == len(list(continuum.iter_annotator(reference_annotator)))
+                           for reference_annotator in continuum.annotators)
+                for unit in units:
+                    assert bound_inf <= unit.segment.start <= bound_sup
+                    if pivot_type == 'int_pivot':
+                        assert unit.segment.start == int(unit.segment.start)
+    # the available intervals exclude [pivot - dist, pivot + dist]
+    lows, highs = ShuffleContinuumSampler._remove_pivot_segment(5, np.array([0., 8.]), np.array([6., 20.]), 2)
+    np.testing.assert_array_equal(lows, [0., 8.])
+    np.testing.assert_array_equal(highs, [3., 20.])
+    lows, highs = ShuffleContinuumSampler._remove_pivot_segment(10, np.array([0.]), np.array([20.]), 2)
+    np.testing.assert_array_equal(lows, [0., 12.])
+    np.testing.assert_array_equal(highs, [8., 20.])
@@ -0,0 +1,159 @@
+"""Tests for the best alignment linear solvers"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pyannote.core import Segment
+
+from pygamma_agreement import (Continuum,
+                               CombinedCategoricalDissimilarity,
+                               HighsSolver,
+                               CvxpySolver,
+                               MatchingSolver)
+from pygamma_agreement.numba_utils import build_A, split_components
+from pygamma_agreement.solver import get_solver, solve_two_annotators, highs_available, _cbc_available
+
+requires_highs = pytest.mark.skipif(not highs_available(), reason="scipy >= 1.9 is required by the HiGHS solver")
+
+
+@requires_highs
+def test_solvers_same_disorder():
+    continuum = Continuum.from_csv(Path("tests/data/3by100.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+
+    highs_alignment = continuum.get_best_alignment(dissim, solver="highs")
+    cvxpy_alignment = continuum.get_best_alignment(dissim, solver=CvxpySolver())
+    highs_alignment.check(continuum)
+    assert len(highs_alignment.unitary_alignments) == 127
+    assert highs_alignment.disorder == pytest.approx(cvxpy_alignment.disorder, abs=1e-6)
+
+    highs_soft = continuum.get_best_soft_alignment(dissim, solver=HighsSolver())
+    cvxpy_soft = continuum.get_best_soft_alignment(dissim, solver="cvxpy")
+    highs_soft.check(continuum)
+    assert highs_soft.disorder == pytest.approx(cvxpy_soft.disorder, abs=1e-6)
+
+
+@requires_highs
+def test_solver_non_integral_relaxation():
+    # Odd cycle : the linear relaxation's optimum is x = (0.5, 0.5, 0.5)
+    A = np.array([[1, 0, 1, 1, 0, 0],
+                  [1, 1, 0, 0, 1, 0],
+                  [0, 1, 1, 0, 0, 1]], dtype=np.float32)
+    disorders = np.array([1, 1, 1, 1.2, 1.2, 1.2], dtype=np.float32)
+    for solver in (HighsSolver(), CvxpySolver()):
+        chosen = solver.solve(disorders, A, soft=True)
+        assert disorders[chosen].sum() == pytest.approx(2.0)
+
+
+@requires_highs
+def test_get_solver():
+    assert isinstance(get_solver(), CvxpySolver)
+    assert isinstance(get_solver("highs"), HighsSolver)
+    assert isinstance(get_solver("glpk"), CvxpySolver)
+    solver = CvxpySolver()
+    assert get_solver(solver) is solver
+    with pytest.raises(ValueError):
+        get_solver("gurobi")
+
+
+def test_sparse_constraints_matrix():
+    continuum = Continuum.from_csv(Path("tests/data/3by100.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    sizes = np.array([len(continuum[annotator]) for annotator in continuum.annotators], dtype=np.int32)
+    _, possible_unitary_alignments = dissim.valid_alignments(continuum)
+
+    A = build_A(possible_unitary_alignments, sizes)
+    assert A.shape == (continuum.num_units, len(possible_unitary_alignments))
+
+    dense = np.zeros(A.shape, dtype=np.float32)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    for p_id, unit_ids_tuple in enumerate(possible_unitary_alignments):
+        for annotator_id, unit_id in enumerate(unit_ids_tuple):
+            if unit_id != sizes[annotator_id]:
+                dense[offsets[annotator_id] + unit_id, p_id] = 1
+    assert np.array_equal(A.toarray(), dense)
+    assert A.nnz == int(dense.sum())
+
+
+@requires_highs
+def test_independent_components():
+    np.random.seed(4772)
+    continuum = Continuum()
+    for annotator in ["Martin", "Martino", "Martine"]:
+        for i in range(40):
+            start = i * 100 + np.random.uniform(0, 5)
+            continuum.add(annotator, Segment(start, start + np.random.uniform(10, 20)), "A")
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    sizes = np.array([len(continuum[annotator]) for annotator in continuum.annotators], dtype=np.int32)
+    disorders, possible_unitary_alignments = dissim.valid_alignments(continuum)
+    starts = np.array([unit.segment.start for _, unit in continuum])
+    alignments_components, units_components, nb_components = split_components(possible_unitary_alignments, sizes,
+                                                                              np.argsort(np.argsort(starts)))
+    # Units are grouped by three, far away from each other
+    assert nb_components == 40
+    assert len(np.unique(units_components)) == 40
+    for component in range(nb_components):
+        assert np.sum(units_components == component) == 3
+
+    A = build_A(possible_unitary_alignments, sizes)
+    solver = HighsSolver()
+    solver.MIN_COMPONENT_SIZE = 10
+    chosen = solver.solve_components(disorders, A, alignments_components, units_components, nb_components)
+    assert disorders[chosen].sum() == pytest.approx(disorders[solver.solve(disorders, A)].sum())
+
+    alignment = continuum.get_best_alignment(dissim, solver=solver)
+    alignment.check(continuum)
+    assert len(alignment.unitary_alignments) == 40
+
+
+@requires_highs
+def test_two_annotators_matching():
+    continuum = Continuum.from_csv(Path("tests/data/2by1000.csv"))
+    dissim = CombinedCategoricalDissimilarity(alpha=3, beta=1)
+    sizes = np.array([len(continuum[annotator]) for annotator in continuum.annotators], dtype=np.int32)
+    disorders, possible_unitary_alignments = dissim.valid_alignments(continuum)
+
+    chosen = solve_two_annotators(disorders, possible_unitary_alignments, sizes)
+    ilp_chosen = HighsSolver().solve(disorders, build_A(possible_unitary_alignments, sizes))
+    assert disorders[chosen].sum() == pytest.approx(disorders[ilp_chosen].sum())
+    # No ties in this corpus : both pick the same unitary alignments
+    np.testing.assert_array_equal(chosen, ilp_chosen)
+
+    assert isinstance(get_solver("matching"), MatchingSolver)
+    alignment = continuum.get_best_alignment(dissim, solver="matching")
+    alignment.check(continuum)
+    assert len(alignment.unitary_alignments) == 1085
+    highs_alignment = continuum.get_best_alignment(dissim, solver="highs")
+    assert alignment.disorder == pytest.approx(highs_alignment.disorder)
+    assert alignment.gamma_k_disorder(dissim, None) == pytest.approx(highs_alignment.gamma_k_disorder(dissim, None))
+
+    # An explicitly given solver is used as is, and the matching solver delegates the soft alignments
+    class CountingSolver(HighsSolver):
+        calls = 0
+
+        def solve(self, disorders, A, soft=False):
+            CountingSolver.calls += 1
+            return super().solve(disorders, A, soft)
+    continuum.get_best_alignment(dissim, solver=CountingSolver())
+    assert CountingSolver.calls > 0
+    calls = CountingSolver.calls
+    continuum.get_best_alignment(dissim, solver=MatchingSolver(CountingSolver()))
+    assert CountingSolver.calls == calls
+    continuum.get_best_soft_alignment(dissim, solver=MatchingSolver(CountingSolver()))
+    assert CountingSolver.calls > calls
+
+    # An annotator without any unit
+    continuum = Continuum()
+    continuum.add("Martin", Segment(0, 10), "A")
+    continuum.add("Martin", Segment(12, 20), "B")
+    continuum.add_annotator("Martino")
+    alignment = continuum.get_best_alignment(dissim, solver="matching")
+    alignment.check(continuum)
+    assert len(alignment.unitary_alignments) == 2
+
+
+def test_cbc_availability_checked_once(caplog):
+    _cbc_available.cache_clear()
+    for _ in range(3):
+        get_solver()
+    assert len([record for record in caplog.records if "CBC" in record.getMessage()]) <= 1